@@ -4,6 +4,9 @@ extends Node2D
 ## Test configuration
 const TEST_LEVEL_PATH: String = "res://levels/json/world_01_level_01.json"
 const TEST_TIMEOUT: float = 30.0  # Max time per test in seconds
+## Solver trace for TEST_LEVEL_PATH (scripts/utility/level_trace_solver.py -o)
+const REPLAY_PATH: String = "res://scenes/testing/replays/world_01_level_01.trace.json"
+const REPLAY_GRACE_FRAMES: int = 30  # Slack for engine vs. simulator drift
 
 ## Test results
 var tests_passed: int = 0
@@ -61,6 +64,9 @@ func run_all_tests() -> void:
 	# Test 8: Death and respawn
 	await test_death_respawn()
 	
+	# Test 9: Replay the solver's input trace to the exit
+	await test_trace_replay()
+	
 	print("\n" + "─".repeat(60))
 
 
@@ -266,6 +272,63 @@ func test_death_respawn() -> void:
 	await get_tree().create_timer(0.1).timeout
 
 
+func test_trace_replay() -> void:
+	start_test("Solver Trace Replay")
+	
+	if not player or not level:
+		fail_test("No player/level - skipping replay test")
+		return
+	
+	var file := FileAccess.open(REPLAY_PATH, FileAccess.READ)
+	if file == null:
+		fail_test("Replay fixture not found: " + REPLAY_PATH)
+		return
+	var trace = JSON.parse_string(file.get_as_text())
+	if not trace is Dictionary or not trace.has("inputs"):
+		fail_test("Invalid replay fixture: " + REPLAY_PATH)
+		return
+	
+	var exit: Area2D = level.get_node_or_null("Exit")
+	var spawn: Node = level.get_node_or_null("PlayerSpawn")
+	if not exit or not spawn:
+		fail_test("Level has no Exit or PlayerSpawn - skipping replay test")
+		return
+	
+	# Let death effects (slow motion) wear off, then start like a fresh spawn
+	await get_tree().create_timer(1.0).timeout
+	PhysicsManager.set_state("Normal")
+	player.respawn(spawn.global_position)
+	
+	var frames: int = 0
+	var reached: bool = false
+	for segment in trace.inputs:
+		for i in range(int(segment.frames)):
+			# Inputs set right after physics_frame are seen by this tick's _physics_process
+			await get_tree().physics_frame
+			_set_replay_input(int(segment.move), segment.jump and i == 0)
+			frames += 1
+			if exit.overlaps_body(player):
+				reached = true
+				break
+		if reached:
+			break
+	
+	# Allow a little drift between the simulator and the engine
+	while not reached and frames < int(trace.frames) + REPLAY_GRACE_FRAMES:
+		await get_tree().physics_frame
+		_set_replay_input(0, false)
+		frames += 1
+		reached = exit.overlaps_body(player)
+	_set_replay_input(0, false)
+	
+	if reached:
+		pass_test("Trace reached the exit in %d frames (solver: %d)" % [frames, int(trace.frames)])
+	else:
+		fail_test("Trace ended %.0f px from the exit" % player.global_position.distance_to(exit.global_position))
+	
+	await get_tree().create_timer(0.1).timeout
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -301,6 +364,22 @@ func _create_test_player() -> CharacterBody2D:
 	return test_player
 
 
+func _set_replay_input(move: int, jump: bool) -> void:
+	"""Holds move_left/move_right for move (-1, 0, 1); presses jump for one tick"""
+	if move > 0:
+		Input.action_press("move_right")
+	else:
+		Input.action_release("move_right")
+	if move < 0:
+		Input.action_press("move_left")
+	else:
+		Input.action_release("move_left")
+	if jump:
+		Input.action_press("jump")
+	else:
+		Input.action_release("jump")
+
+
 func start_test(test_name: String) -> void:
 	current_test = test_name
 	test_start_time = Time.get_ticks_msec()
@@ -1,10 +1,18 @@
 ## AnalyticsManager — Privacy-First Event Tracker (Autoload Singleton)
 ##
 ## Tracks gameplay events locally and (optionally) sends them to a backend API.
-## All data is anonymous — no PII is collected.
+## No PII is collected, but events are not anonymous: every event carries a
+## persistent install ID (player_id, random, kept across launches until the
+## player opts out) so sessions of the same install can be linked.
 ##
-## Events are queued in-memory and flushed to disk periodically.
+## Events are queued in-memory and flushed to disk periodically, appended to
+## the local cache as one JSON object per line (NDJSON), so the balancing tools
+## can tail the file instead of re-reading it. Past MAX_CACHE_BYTES the cache
+## is renamed to ROTATED_CACHE_PATH (replacing the previous one) and a new one
+## is started, so at most about twice that stays on disk.
 ## When an API endpoint is configured, queued events are uploaded in batches.
+## The cache keeps them for the tools; a persisted byte offset marks how much
+## of it was uploaded, so a launch only uploads what earlier sessions couldn't.
 ##
 ## Usage:
 ##   AnalyticsManager.track("level_start", {"world": 1, "level": 3})
@@ -23,9 +31,15 @@ const MAX_QUEUE_SIZE: int = 50
 ## Auto-flush interval in seconds.
 const FLUSH_INTERVAL: float = 60.0
 
-## Local file path for offline event storage.
+## Local file path for offline event storage (NDJSON, append-only).
 const LOCAL_CACHE_PATH: String = "user://analytics_cache.json"
 
+## Cache size in bytes past which it is rotated before the next flush.
+const MAX_CACHE_BYTES: int = 4 * 1024 * 1024
+
+## Where a full cache is moved; the tools read it next to LOCAL_CACHE_PATH.
+const ROTATED_CACHE_PATH: String = "user://analytics_cache.1.json"
+
 
 # ─── State ──────────────────────────────────────────────────────────────────
 
@@ -35,6 +49,17 @@ var _event_queue: Array[Dictionary] = []
 ## Unique anonymous session ID (regenerated each app launch).
 var _session_id: String = ""
 
+## Install ID sent with every event (random, persisted across launches so
+## day-N retention can be measured; regenerated after an opt-out).
+var _player_id: String = ""
+
+## Bytes at the start of the cache already uploaded (persisted).
+var _uploaded_bytes: int = 0
+
+## Bumped on every rotation, so an upload finishing afterwards doesn't mark
+## bytes of the new cache as sent.
+var _cache_generation: int = 0
+
 ## Session start timestamp.
 var _session_start: float = 0.0
 
@@ -54,6 +79,8 @@ func _ready() -> void:
 
 	# Load user preference
 	analytics_enabled = SaveManager.get_setting("analytics_enabled", true)
+	if analytics_enabled:
+		_player_id = _load_player_id()
 
 	# Connect to game events
 	_connect_game_events()
@@ -65,7 +92,8 @@ func _ready() -> void:
 		"version": ProjectSettings.get_setting("application/config/version", "0.1.0"),
 	})
 
-	# Load any cached offline events
+	# Convert an older cache and upload any offline events
+	_uploaded_bytes = int(SaveManager.get_setting("analytics_uploaded_bytes", 0))
 	_load_cached_events()
 
 
@@ -97,6 +125,7 @@ func track(event_name: String, properties: Dictionary = {}) -> void:
 	var event := {
 		"event": event_name,
 		"session_id": _session_id,
+		"player_id": _player_id,
 		"timestamp": Time.get_unix_time_from_system(),
 		"properties": properties,
 	}
@@ -117,11 +146,11 @@ func flush() -> void:
 		return
 
 	# Always save to local cache first
-	_save_cached_events()
+	var cached := _save_cached_events()
 
 	# If API is configured, attempt upload
 	if API_ENDPOINT != "":
-		_upload_events(_event_queue.duplicate())
+		_upload_events(_event_queue.duplicate(), cached)
 
 	_event_queue.clear()
 
@@ -132,10 +161,16 @@ func set_analytics_enabled(enabled: bool) -> void:
 	SaveManager.set_setting("analytics_enabled", enabled)
 
 	if not enabled:
-		# Clear all cached data on opt-out
+		# Clear all cached data on opt-out, including the install ID
 		_event_queue.clear()
-		if FileAccess.file_exists(LOCAL_CACHE_PATH):
-			DirAccess.remove_absolute(LOCAL_CACHE_PATH)
+		for path in [LOCAL_CACHE_PATH, ROTATED_CACHE_PATH]:
+			if FileAccess.file_exists(path):
+				DirAccess.remove_absolute(path)
+		_set_uploaded_bytes(0)
+		SaveManager.set_setting("analytics_player_id", "")
+		_player_id = ""
+	else:
+		_player_id = _load_player_id()
 
 
 ## Get a summary of tracked data for the current session (for debug/settings UI).
@@ -212,39 +247,100 @@ func _on_death_count_updated(count: int) -> void:
 
 # ─── Persistence ────────────────────────────────────────────────────────────
 
-func _save_cached_events() -> void:
-	var file := FileAccess.open(LOCAL_CACHE_PATH, FileAccess.WRITE)
+## Append the queue to the cache; returns the [start, end] byte range written,
+## or [] if the cache couldn't be opened.
+func _save_cached_events() -> Array:
+	var file: FileAccess
+	if FileAccess.file_exists(LOCAL_CACHE_PATH):
+		file = FileAccess.open(LOCAL_CACHE_PATH, FileAccess.READ_WRITE)
+		if file and file.get_length() >= MAX_CACHE_BYTES:
+			file.close()
+			_rotate_cache()
+			file = FileAccess.open(LOCAL_CACHE_PATH, FileAccess.WRITE)
+	else:
+		file = FileAccess.open(LOCAL_CACHE_PATH, FileAccess.WRITE)
 	if not file:
 		push_warning("[Analytics] Failed to save cache: %s" % FileAccess.get_open_error())
-		return
-
-	var data := JSON.stringify(_event_queue, "\t")
-	file.store_string(data)
+		return []
+
+	# Append whole lines only, so a reader never sees half an event
+	file.seek_end()
+	var start := file.get_position()
+	for event in _event_queue:
+		file.store_line(JSON.stringify(event))
+	var end := file.get_position()
 	file.close()
+	return [start, end]
+
+
+## Move the full cache aside, replacing the previous one. Events in it that
+## were never uploaded are left there for the local tools only.
+func _rotate_cache() -> void:
+	if FileAccess.file_exists(ROTATED_CACHE_PATH):
+		DirAccess.remove_absolute(ROTATED_CACHE_PATH)
+	DirAccess.rename_absolute(LOCAL_CACHE_PATH, ROTATED_CACHE_PATH)
+	_cache_generation += 1
+	_set_uploaded_bytes(0)
+
+
+## Events in cache text: NDJSON, or the JSON array older builds wrote.
+func _parse_cached_events(text: String) -> Array:
+	if text.strip_edges().begins_with("["):
+		var parsed = JSON.parse_string(text)
+		return parsed if parsed is Array else []
+
+	var events: Array = []
+	for line in text.split("\n", false):
+		var event = JSON.parse_string(line)
+		if event is Dictionary:
+			events.append(event)
+	return events
 
 
 func _load_cached_events() -> void:
 	if not FileAccess.file_exists(LOCAL_CACHE_PATH):
+		_set_uploaded_bytes(0)
 		return
 
 	var file := FileAccess.open(LOCAL_CACHE_PATH, FileAccess.READ)
 	if not file:
 		return
-
-	var json := JSON.new()
-	var err := json.parse(file.get_as_text())
+	var text := file.get_as_text()
 	file.close()
 
-	if err == OK and json.data is Array:
-		# Prepend cached events (they're older)
-		var cached: Array = json.data
-		for event in cached:
-			_event_queue.insert(0, event)
+	# Rewrite a JSON array from an older build as NDJSON so appends stay valid;
+	# older builds deleted the cache once uploaded, so none of it was sent
+	if text.strip_edges().begins_with("["):
+		file = FileAccess.open(LOCAL_CACHE_PATH, FileAccess.WRITE)
+		if file:
+			for event in _parse_cached_events(text):
+				file.store_line(JSON.stringify(event))
+			file.close()
+		_set_uploaded_bytes(0)
+
+	if API_ENDPOINT == "":
+		return
+
+	# Upload only what was cached after the last successful upload
+	file = FileAccess.open(LOCAL_CACHE_PATH, FileAccess.READ)
+	if not file:
+		return
+	var length := file.get_length()
+	if _uploaded_bytes > length:
+		_set_uploaded_bytes(0)  # Replaced since, so none of it was sent
+	file.seek(_uploaded_bytes)
+	var unsent := _parse_cached_events(
+			file.get_buffer(length - _uploaded_bytes).get_string_from_utf8())
+	file.close()
+	if not unsent.is_empty():
+		_upload_events(unsent, [_uploaded_bytes, length])
 
 
 # ─── Network ────────────────────────────────────────────────────────────────
 
-func _upload_events(events: Array) -> void:
+## Upload events; cached is the [start, end] byte range they occupy in the
+## cache ([] if unknown), marked uploaded once the server accepts them.
+func _upload_events(events: Array, cached: Array = []) -> void:
 	if API_ENDPOINT == "":
 		return
 
@@ -254,11 +350,14 @@ func _upload_events(events: Array) -> void:
 	var headers := ["Content-Type: application/json"]
 	var body := JSON.stringify({"events": events})
 
+	var generation := _cache_generation
 	http.request_completed.connect(func(_result, code, _headers, _body):
 		if code == 200 or code == 201:
-			# Clear local cache on successful upload
-			if FileAccess.file_exists(LOCAL_CACHE_PATH):
-				DirAccess.remove_absolute(LOCAL_CACHE_PATH)
+			# Keep the cache for the tools, but don't upload these again. After a
+			# failed upload the offset waits, so the next launch re-sends from there.
+			if not cached.is_empty() and generation == _cache_generation \
+					and _uploaded_bytes >= cached[0]:
+				_set_uploaded_bytes(maxi(_uploaded_bytes, cached[1]))
 		else:
 			push_warning("[Analytics] Upload failed (HTTP %d), events cached locally" % code)
 		http.queue_free()
@@ -269,6 +368,21 @@ func _upload_events(events: Array) -> void:
 
 # ─── Helpers ────────────────────────────────────────────────────────────────
 
+func _set_uploaded_bytes(value: int) -> void:
+	if value != _uploaded_bytes:
+		_uploaded_bytes = value
+		SaveManager.set_setting("analytics_uploaded_bytes", value)
+
+
+## The persisted install ID, created on first use.
+func _load_player_id() -> String:
+	var player_id: String = SaveManager.get_setting("analytics_player_id", "")
+	if player_id == "":
+		player_id = _generate_session_id()
+		SaveManager.set_setting("analytics_player_id", player_id)
+	return player_id
+
+
 func _generate_session_id() -> String:
 	var bytes := PackedByteArray()
 	for i in 16:
@@ -4,11 +4,84 @@ extends Node
 ##
 ## Watches for input (R key) to reload the current level instantly.
 ## Only active in debug builds.
+##
+## When ANALYZE_ON_RELOAD is on, each reload also runs the Python level
+## balance analyzer on the reloaded JSON and prints its report. The analyzer
+## runs on a background thread, so the game keeps running meanwhile; it caches
+## results by file content, so unchanged levels answer instantly.
+## For feedback on every save instead, keep `level_balance_analyzer.py --watch`
+## running in a terminal.
+
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+## Run level_balance_analyzer.py on the current level after every reload.
+const ANALYZE_ON_RELOAD: bool = true
+
+## Python interpreter used to run the analyzer.
+const PYTHON_EXECUTABLE: String = "python3"
+
+const ANALYZER_SCRIPT: String = "res://scripts/utility/level_balance_analyzer.py"
+
+
+# ─── State ───────────────────────────────────────────────────────────────────
+
+## Thread running the analyzer (null when none was started).
+var _analysis_thread: Thread = null
+
 
 func _process(_delta: float) -> void:
 	if not OS.is_debug_build():
 		return
-		
+
 	if Input.is_action_just_pressed("ui_cancel") and Input.is_key_pressed(KEY_R):
 		LevelManager.reload_current_level()
 		print("[LevelHotloader] Reloading current level...")
+		if ANALYZE_ON_RELOAD:
+			_analyze_current_level()
+
+
+func _exit_tree() -> void:
+	if _analysis_thread != null:
+		_analysis_thread.wait_to_finish()
+		_analysis_thread = null
+
+
+## Starts the balance analyzer on the current level's JSON in the background.
+func _analyze_current_level() -> void:
+	var json_path := "res://levels/json/world_%02d_level_%02d.json" % [
+		LevelManager.current_world, LevelManager.current_level]
+	if not FileAccess.file_exists(json_path):
+		return
+
+	var args := PackedStringArray([
+		ProjectSettings.globalize_path(ANALYZER_SCRIPT),
+		ProjectSettings.globalize_path(json_path),
+	])
+	if _analysis_thread != null:
+		if _analysis_thread.is_alive():
+			return  # Still analyzing the previous reload
+		_analysis_thread.wait_to_finish()
+	_analysis_thread = Thread.new()
+	_analysis_thread.start(_run_analyzer.bind(args))
+
+
+## Runs on _analysis_thread: waits for the analyzer, then hands its output to
+## the main thread.
+func _run_analyzer(args: PackedStringArray) -> void:
+	var output: Array = []
+	var exit_code := OS.execute(PYTHON_EXECUTABLE, args, output, true)
+	_print_analysis.call_deferred(exit_code, output)
+
+
+## Prints the analyzer's report (main thread).
+func _print_analysis(exit_code: int, output: Array) -> void:
+	if _analysis_thread != null:
+		_analysis_thread.wait_to_finish()
+		_analysis_thread = null
+	if exit_code == -1:
+		push_warning("[LevelHotloader] Could not run %s; disable ANALYZE_ON_RELOAD to silence." % PYTHON_EXECUTABLE)
+		return
+
+	for chunk in output:
+		print(chunk)
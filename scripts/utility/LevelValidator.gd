@@ -3,8 +3,22 @@ extends RefCounted
 
 ## LevelValidator — Automated Level Integrity Checking
 ##
-## Validates all JSON levels for structural issues, missing required fields,
-## and potential gameplay problems.
+## Validates all JSON levels against res://levels/schema/level_schema.json,
+## the same declarative schema the Python analyzer compiles
+## (scripts/utility/level_schema.py). Every problem in a level is reported in
+## one pass, prefixed with its JSON path, e.g.
+## "$.physics_triggers[2].state: unknown physics state 'Moon'".
+## Physics state names are checked against PhysicsManager's registry, which
+## is built from scripts/physics_states/*.gd.
+
+const SCHEMA_PATH := "res://levels/schema/level_schema.json"
+
+const TYPE_LABELS := {
+	"object": "an object", "array": "an array", "string": "a string",
+	"number": "a number", "boolean": "true or false", "vec2": "[x, y]",
+}
+
+static var _schema: Dictionary = {}
 
 static func validate_all_levels() -> Dictionary:
 	var results := {
@@ -23,7 +37,7 @@ static func validate_all_levels() -> Dictionary:
 	var file_name = dir.get_next()
 	
 	while file_name != "":
-		if file_name.ends_with(".json"):
+		if file_name.begins_with("world_") and file_name.ends_with(".json"):
 			results.total += 1
 			var validation = _validate_level_file("res://levels/json/" + file_name)
 			
@@ -77,42 +91,109 @@ static func _validate_level_file(path: String) -> Dictionary:
 		result.issues.append("JSON root must be a dictionary")
 		return result
 	
-	# 3. Check required fields
-	var required_fields = ["level_id", "player_spawn", "exit", "platforms"]
-	for field in required_fields:
-		if not data.has(field):
-			result.is_valid = false
-			result.issues.append("Missing required field: %s" % field)
-	
-	if not result.is_valid:
-		return result
-	
-	# 4. Validate player spawn
-	if typeof(data.player_spawn) != TYPE_ARRAY or data.player_spawn.size() != 2:
+	# 3. Check against the shared level schema
+	var schema := _load_schema()
+	if schema.is_empty():
 		result.is_valid = false
-		result.issues.append("player_spawn must be [x, y] array")
-	
-	# 5. Validate exit
-	if not data.exit.has("position") or typeof(data.exit.position) != TYPE_ARRAY:
-		result.is_valid = false
-		result.issues.append("exit must have position [x, y]")
-	
-	# 6. Validate platforms (at least one)
-	if typeof(data.platforms) != TYPE_ARRAY or data.platforms.size() == 0:
-		result.is_valid = false
-		result.issues.append("Must have at least one platform")
-	
-	# 7. Validate physics triggers reference valid states
-	if data.has("physics_triggers"):
-		for trigger in data.physics_triggers:
-			if trigger.has("state"):
-				var state_name = trigger.state
-				if not PhysicsManager._states.has(state_name):
-					result.is_valid = false
-					result.issues.append("Unknown physics state: %s" % state_name)
+		result.issues.append("Cannot read level schema at %s" % SCHEMA_PATH)
+		return result
 	
+	_check_node(schema, data, "$", result.issues)
+	result.is_valid = result.issues.is_empty()
 	return result
 
+
+## Loads the schema once and reuses it for every level.
+static func _load_schema() -> Dictionary:
+	if _schema.is_empty() and FileAccess.file_exists(SCHEMA_PATH):
+		var parsed = JSON.parse_string(FileAccess.get_file_as_string(SCHEMA_PATH))
+		if typeof(parsed) == TYPE_DICTIONARY:
+			_schema = parsed
+	return _schema
+
+
+## Appends every error for [param value] against schema [param node].
+static func _check_node(node: Dictionary, value, path: String, issues: Array) -> void:
+	var kind: String = node.get("type", "")
+	match kind:
+		"object":
+			if typeof(value) != TYPE_DICTIONARY:
+				_report(node, issues, path, "expected " + TYPE_LABELS[kind])
+				return
+			for key in node.get("required", []):
+				if not value.has(key):
+					_report(node, issues, "%s.%s" % [path, key], "missing required field")
+			var properties: Dictionary = node.get("properties", {})
+			for key in properties:
+				if value.has(key):
+					_check_node(properties[key], value[key], "%s.%s" % [path, key], issues)
+		"array":
+			if typeof(value) != TYPE_ARRAY:
+				_report(node, issues, path, "expected " + TYPE_LABELS[kind])
+				return
+			var min_items := int(node.get("min_items", 0))
+			if value.size() < min_items:
+				_report(node, issues, path, "needs at least %d item(s)" % min_items)
+			if node.has("items"):
+				for i in value.size():
+					_check_node(node["items"], value[i], "%s[%d]" % [path, i], issues)
+		"string":
+			if typeof(value) != TYPE_STRING:
+				_report(node, issues, path, "expected " + TYPE_LABELS[kind])
+				return
+			var min_length := int(node.get("min_length", 0))
+			if value.length() < min_length:
+				_report(node, issues, path, "must be at least %d character(s)" % min_length)
+			elif not _enum_allows(node, value):
+				var text := "unknown value '%s'" % value
+				if not node.has("enum_source") and node.get("enum", []).size() <= 5:
+					var options: Array = node["enum"].duplicate()
+					options.sort()
+					text = "'%s' is not one of %s" % [value, ", ".join(options)]
+				_report(node, issues, path, text, value)
+		"number":
+			if not _is_number(value):
+				_report(node, issues, path, "expected " + TYPE_LABELS[kind])
+			elif node.has("minimum") and value < node["minimum"]:
+				_report(node, issues, path, "must be >= %s" % node["minimum"])
+		"boolean":
+			if typeof(value) != TYPE_BOOL:
+				_report(node, issues, path, "expected " + TYPE_LABELS[kind])
+		"vec2":
+			var positive: bool = node.get("positive", false)
+			var valid: bool = typeof(value) == TYPE_ARRAY and value.size() == 2 \
+					and _is_number(value[0]) and _is_number(value[1])
+			if valid and positive:
+				valid = value[0] > 0 and value[1] > 0
+			if not valid:
+				_report(node, issues, path,
+						"must be [x, y] with both > 0" if positive else "must be [x, y]")
+		_:
+			issues.append("%s: unsupported schema type '%s'" % [path, kind])
+
+
+static func _enum_allows(node: Dictionary, value: String) -> bool:
+	if not node.has("enum") and not node.has("enum_source"):
+		return true
+	if node.has("enum") and value in node["enum"]:
+		return true
+	if node.get("enum_source", "") == "physics_states":
+		return PhysicsManager.has_state(value)
+	return false
+
+
+static func _is_number(value) -> bool:
+	return typeof(value) == TYPE_FLOAT or typeof(value) == TYPE_INT
+
+
+## Records one error, honouring the node's "message" override.
+static func _report(node: Dictionary, issues: Array, path: String, text: String, value = null) -> void:
+	if node.has("message"):
+		text = node["message"] if value == null else "%s '%s'" % [node["message"], value]
+	var prefix := "CRITICAL: " if node.get("critical", false) else ""
+	issues.append("%s%s: %s" % [prefix, path, text])
+
+
 static func print_validation_report(results: Dictionary) -> void:
 	print("\n=== Level Validation Report ===")
 	print("Total levels: %d" % results.total)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Analytics Aggregate — Mergeable Per-Level Summaries of Analytics Events
+
+An AnalyticsAggregate folds events into compact per-level counters (starts,
+clears), quantile sketches of deaths and clear times per completion, and the
+set of sessions seen. Aggregates built
+from different files merge associatively, so a directory of device caches can
+be summarized in parallel and combined in any grouping with the same result
+as reading every event in one pass.
+
+Session and player IDs are interned to dense integers (session_bitmap), and
+each level keeps bitmaps of the sessions that started and cleared it, plus
+one bitmap of active players per UTC day. funnel() and retention() answer
+"how many sessions got through these levels in order" and "how many players
+came back N days later" with bitmap intersections. Players are identified by
+the events' player_id (AnalyticsManager's persisted install ID); events
+without one count each session as its own player.
+
+Physics-state dwell time, transitions and deaths per state are rebuilt from
+the same stream by physics_timeline.PhysicsTimelines.
+"""
+
+import math
+from array import array
+from datetime import datetime, timezone
+
+from analytics_event_stream import iter_events, normalize_event
+from physics_timeline import PhysicsTimelines
+from quantile_sketch import QuantileSketch
+from session_bitmap import INDEX_TYPECODE, Bitmap, Interner
+
+DAY_SECONDS = 86400
+FUNNEL_STAGES = ("start", "complete")
+
+# ─── Per-Level Summary ───────────────────────────────────────────────────────
+
+class LevelStats:
+    """Counters for one W{world}-L{level} key."""
+
+    def __init__(self):
+        self.starts = 0
+        self.completes = 0
+        self.deaths = QuantileSketch()      # Deaths per completion
+        self.times = QuantileSketch()       # Clear time (s) per completion
+        self.death_events = 0
+        self.death_positions = array("d")   # Flat x, y pairs
+        self.started = Bitmap()             # Session numbers that started it
+        self.completed = Bitmap()           # ...and that cleared it
+
+    @property
+    def avg_deaths(self):
+        return self.deaths.mean
+
+    @property
+    def avg_time(self):
+        return self.times.mean
+
+    def sessions(self, stage):
+        """Bitmap of sessions that reached a FUNNEL_STAGES stage of the level."""
+        return self.started if stage == "start" else self.completed
+
+    def merge(self, other, session_map=None):
+        """Fold other in; session_map renumbers its sessions (see Interner.merge)."""
+        self.starts += other.starts
+        self.completes += other.completes
+        self.deaths.merge(other.deaths)
+        self.times.merge(other.times)
+        self.death_events += other.death_events
+        self.death_positions.extend(other.death_positions)
+        self.started |= _remap(other.started, session_map)
+        self.completed |= _remap(other.completed, session_map)
+        return self
+
+
+# ─── Aggregate ───────────────────────────────────────────────────────────────
+
+def level_key(data):
+    return f"W{data.get('world', '?')}-L{data.get('level', '?')}"
+
+
+def parse_position(value):
+    """(x, y) from a death event's position, or None if it is unusable.
+
+    Accepts [x, y], {"x": .., "y": ..} and Godot's str(Vector2) "(x, y)".
+    """
+    if isinstance(value, dict):
+        value = (value.get("x"), value.get("y"))
+    elif isinstance(value, str):
+        value = value.strip("() ").split(",")
+    try:
+        x, y = value
+        return float(x), float(y)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_timestamp(value):
+    """Unix seconds from a numeric or ISO-8601 timestamp (naive = UTC)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return math.nan
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return math.nan
+
+
+def day_number(timestamp):
+    """UTC day (days since the epoch) of a unix timestamp, or None."""
+    if not math.isfinite(timestamp) or timestamp < 0:
+        return None
+    return int(timestamp // DAY_SECONDS)
+
+
+def _remap(bitmap, mapping):
+    return bitmap.remap(mapping) if mapping is not None else bitmap
+
+
+class AnalyticsAggregate:
+    """Mergeable summary of any number of analytics events."""
+
+    def __init__(self):
+        self.events = 0
+        self.files = 0
+        self.sessions = Interner()                  # Session ID <-> session number
+        self.players = Interner()                   # player_id (or session ID) <-> number
+        self.session_players = array(INDEX_TYPECODE)  # Session number -> player number
+        self.anonymous_sessions = 0                 # Sessions whose events had no player_id
+        self.active_days = {}                       # UTC day -> Bitmap of player numbers
+        self.levels = {}
+        self.physics = PhysicsTimelines()
+        self.errors = []    # (path, message) for files that failed to parse
+
+    def level(self, key):
+        stats = self.levels.get(key)
+        if stats is None:
+            stats = self.levels[key] = LevelStats()
+        return stats
+
+    def add_event(self, event):
+        """Fold one event into the aggregate."""
+        self.events += 1
+        if not isinstance(event, dict):
+            return
+        normalize_event(event)
+        event_type = event.get("event", "")
+        data = event.get("data", {})
+        key = level_key(data)
+        known = len(self.sessions)
+        session = self.add_session(event.get("session_id", "unknown"), event.get("player_id"))
+        timestamp = parse_timestamp(event.get("timestamp"))
+        day = day_number(timestamp)
+        if day is not None:
+            self.active(day).add(self.session_players[session])
+        self.physics.add(session, session == known, event_type, key, data, timestamp)
+
+        if event_type == "level_start":
+            stats = self.level(key)
+            stats.starts += 1
+            stats.started.add(session)
+        elif event_type == "level_complete":
+            stats = self.level(key)
+            stats.completes += 1
+            stats.completed.add(session)
+            if "deaths" in data:
+                stats.deaths.add(data["deaths"])
+            if "time_seconds" in data:
+                stats.times.add(data["time_seconds"])
+        elif event_type == "death":
+            stats = self.level(key)
+            stats.death_events += 1
+            position = parse_position(data.get("position"))
+            if position is not None:
+                stats.death_positions.extend(position)
+
+    def add_session(self, session_id, player_id=None):
+        """Session number for an ID; a new session is tied to its player here."""
+        session = self.sessions.intern(session_id)
+        if session == len(self.session_players):
+            if not player_id:
+                self.anonymous_sessions += 1
+            self.session_players.append(self.players.intern(player_id or session_id))
+        return session
+
+    def active(self, day):
+        bitmap = self.active_days.get(day)
+        if bitmap is None:
+            bitmap = self.active_days[day] = Bitmap()
+        return bitmap
+
+    def add_file(self, path):
+        """Stream one cache file in. Parse errors are recorded, not raised.
+
+        A malformed NDJSON line is recorded and skipped. Events read before
+        an error that ends the file (unreadable, broken JSON array) are kept,
+        like a partial device dump.
+        """
+        self.files += 1
+        bad_lines = []
+        try:
+            for event in iter_events(path, errors=bad_lines):
+                self.add_event(event)
+        except (OSError, ValueError) as e:
+            bad_lines.append(str(e))
+        self.errors.extend((path, message) for message in bad_lines)
+        return self
+
+    def merge(self, other):
+        """Fold another aggregate into this one and return self."""
+        self.events += other.events
+        self.files += other.files
+
+        # Renumber other's sessions and players into ours (unless we are empty)
+        fresh = not self.sessions
+        known = len(self.sessions)
+        session_map = self.sessions.merge(other.sessions)
+        player_map = self.players.merge(other.players)
+        for other_session, session in enumerate(session_map):
+            if session == len(self.session_players):    # New to us
+                player = other.session_players[other_session]
+                self.session_players.append(player_map[player])
+                if other.players.ids[player] == other.sessions.ids[other_session]:
+                    self.anonymous_sessions += 1
+        if fresh:
+            session_map = player_map = None
+
+        for key, stats in other.levels.items():
+            self.level(key).merge(stats, session_map)
+        self.physics.merge(other.physics, session_map, known)
+        for day, bitmap in other.active_days.items():
+            active = self.active(day)
+            active |= _remap(bitmap, player_map)
+        self.errors.extend(other.errors)
+        return self
+
+    def starts(self, key):
+        stats = self.levels.get(key)
+        return stats.starts if stats else 0
+
+    def completes(self, key):
+        stats = self.levels.get(key)
+        return stats.completes if stats else 0
+
+    def levels_played(self):
+        return sum(1 for stats in self.levels.values() if stats.starts)
+
+    # ─── Funnels & Retention ─────────────────────────────────────────────
+
+    def funnel(self, steps):
+        """Sessions reaching each (level key, stage) step after all earlier ones.
+
+        Returns [{"level", "stage", "sessions"}] in step order; stage is
+        "start" or "complete".
+        """
+        rows = []
+        reached = None
+        for key, stage in steps:
+            stats = self.levels.get(key)
+            sessions = stats.sessions(stage) if stats else Bitmap()
+            reached = sessions if reached is None else reached & sessions
+            rows.append({"level": key, "stage": stage, "sessions": len(reached)})
+        return rows
+
+    def cohorts(self):
+        """(day, Bitmap of players first active that day), oldest first."""
+        seen = Bitmap()
+        cohorts = []
+        for day in sorted(self.active_days):
+            new = self.active_days[day] - seen
+            if new:
+                cohorts.append((day, new))
+                seen |= new
+        return cohorts
+
+    def retention(self, offsets):
+        """Day-N retention of first-day cohorts for each N in offsets.
+
+        A player is retained on day N if they were active exactly N days after
+        their first active day. Cohorts too recent to have reached day N (no
+        activity recorded that late) are left out of that day's rate.
+        Returns {"cohorts": [{"day", "players", "retained": {N: count or None}}],
+                 "day_n": {N: {"players", "retained", "rate"}}}.
+        """
+        last_day = max(self.active_days, default=None)
+        rows = []
+        totals = {n: {"players": 0, "retained": 0, "rate": None} for n in offsets}
+        for day, cohort in self.cohorts():
+            retained = {}
+            for n in offsets:
+                if day + n > last_day:
+                    retained[n] = None
+                    continue
+                count = len(cohort & self.active_days.get(day + n, Bitmap()))
+                retained[n] = count
+                totals[n]["players"] += len(cohort)
+                totals[n]["retained"] += count
+            rows.append({"day": day, "players": len(cohort), "retained": retained})
+        for total in totals.values():
+            if total["players"]:
+                total["rate"] = total["retained"] / total["players"]
+        return {"cohorts": rows, "day_n": totals}
+
+
+def aggregate_files(paths):
+    """Aggregate a batch of cache files (the unit of work for pool workers)."""
+    aggregate = AnalyticsAggregate()
+    for path in paths:
+        aggregate.add_file(path)
+    return aggregate
@@ -5,110 +5,578 @@ Analytics Balance Advisor — Post-Launch Level Balancing Tool
 Reads the analytics cache (user://analytics_cache.json) and suggests
 balance adjustments based on death rates and completion times.
 
+The cache may be the JSON array AnalyticsManager writes or newline-delimited
+JSON (one event per line). Either way events are streamed one at a time, so
+memory stays flat for multi-million-event dumps.
+
+Pass any mix of cache files, directories and glob patterns to merge caches
+from many devices; --jobs spreads the files over worker processes. With
+--store DIR the caches are ingested once into a columnar store
+(analytics_store.py) and later reports read the store instead of the JSON.
+--format json/ndjson prints the report as data for dashboards (see
+report_format.py); progress messages then go to stderr.
+
+--checkpoint FILE makes runs incremental: only events appended since the
+last run are read (analytics_tail.py). --follow keeps running, tailing the
+caches as the game flushes them and printing every level whose status
+changes.
+
+Retention is a funnel over per-level session bitmaps (--funnel picks any
+ordered list of level starts and clears) plus day-N retention of players
+grouped by their first active day (--retention-days).
+
+The physics section replays each session's physics_change events into
+per-state dwell time, transitions and deaths (physics_timeline.py), and
+flags states that kill players much faster than the rest of their level.
+
 Run this after collecting player data to identify problem levels.
 """
 
-import json
+import argparse
+import glob
 import os
+import pickle
 import sys
-from collections import defaultdict
+import time
+from datetime import datetime, timezone
+
+import report_format
+from analytics_aggregate import (DAY_SECONDS, FUNNEL_STAGES, AnalyticsAggregate,
+                                 LevelStats, aggregate_files)
+from analytics_event_stream import collect_cache_paths
+from analytics_store import AnalyticsStore
+from analytics_tail import Tailer
+from death_heatmap import build_heatmap
+from physics_timeline import PhysicsStats
+from synthetic_data import generate_events, write_events
 
 # Path to analytics cache (copy from device to analyze)
 DEFAULT_CACHE_PATH = os.path.expanduser(
     "~/Library/Application Support/Godot/app_userdata/"
     "Definitely Normal Physics/analytics_cache.json"
 )
+# Where AnalyticsManager moves the cache once it fills up (MAX_CACHE_BYTES)
+ROTATED_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH),
+                                  "analytics_cache.1.json")
 
 # Thresholds from LAUNCH_CHECKLIST.md
 TARGET_COMPLETION_RATE = 0.70  # > 70%
 MAX_AVG_DEATHS = 30
 TARGET_D1_RETENTION = 0.40
 
-def analyze_analytics(cache_path):
-    if not os.path.exists(cache_path):
-        print(f"Analytics cache not found at: {cache_path}")
-        print("Copy it from your device's user:// directory first.")
-        print(f"\nExpected path: {cache_path}")
+# Percentiles reported for deaths and clear time per completion
+REPORT_QUANTILES = (0.50, 0.90, 0.99)
+
+# Seeded play sessions written when no cache exists yet
+DEMO_SESSIONS = 200
+
+# Default retention funnel: start W1, clear W1, reach W2, reach W3
+DEFAULT_FUNNEL = "W1-L1,W1-L8:complete,W2-L1,W3-L1"
+RETENTION_DAYS = (1, 7, 30)
+
+# A physics state is flagged when it kills this many times faster (deaths per
+# minute) than the rest of its level, once it has at least this many deaths
+DEADLY_STATE_FACTOR = 2.0
+MIN_STATE_DEATHS = 20
+TOP_TRANSITIONS = 5
+
+# --follow checks the caches for new events this often (seconds)
+FOLLOW_INTERVAL = 2.0
+FLAGGED = ("hard", "grindy")    # Level statuses that come with a recommendation
+
+# ─── Ingestion ───────────────────────────────────────────────────────────────
+
+BATCHES_PER_WORKER = 4  # Smaller batches balance uneven file sizes across workers
+
+
+def aggregate_caches(paths, jobs=1):
+    """Aggregate every cache file, in worker processes when jobs > 1.
+
+    Each worker streams a batch of files into one partial AnalyticsAggregate;
+    the partials are merged in batch order, so the totals match a
+    single-process run.
+    """
+    if jobs <= 1 or len(paths) < 2:
+        return aggregate_files(paths)
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = min(jobs, len(paths))
+    batch_count = min(len(paths), workers * BATCHES_PER_WORKER)
+    batches = [paths[i::batch_count] for i in range(batch_count)]
+    total = AnalyticsAggregate()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(aggregate_files, batches):
+            total.merge(partial)
+    return total
+
+
+# ─── Analysis ────────────────────────────────────────────────────────────────
+
+def _notes(output):
+    """Where progress messages go: stdout for text, stderr beside JSON output."""
+    return sys.stdout if output == "text" else sys.stderr
+
+
+def parse_funnel(text):
+    """[(level key, stage)] from "W1-L1,W1-L8:complete,..." (stage defaults to start).
+
+    Raises ValueError for an empty funnel or an unknown stage.
+    """
+    steps = []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, _, stage = item.partition(":")
+        stage = stage or "start"
+        if stage not in FUNNEL_STAGES:
+            raise ValueError(f"unknown funnel stage '{stage}' in '{item}' "
+                             f"(choose from {', '.join(FUNNEL_STAGES)})")
+        steps.append((key, stage))
+    if not steps:
+        raise ValueError("the funnel needs at least one level")
+    return steps
+
+
+def analyze_analytics(cache_paths, jobs=1, show_heatmaps=False, output="text", **options):
+    if isinstance(cache_paths, str):
+        cache_paths = [cache_paths]
+    notes = _notes(output)
+    paths, missing = collect_cache_paths(cache_paths)
+    if missing and not paths:
+        cache_path = missing[0]
+        print(f"Analytics cache not found at: {cache_path}", file=notes)
+        print("Copy it from your device's user:// directory first.", file=notes)
+        print(f"\nExpected path: {cache_path}", file=notes)
         return
+    for item in missing:
+        print(f"⚠️  No analytics cache matches: {item}", file=notes)
     
-    with open(cache_path, 'r') as f:
-        events = json.load(f)
+    # Process events as they stream in
+    report(aggregate_caches(paths, jobs), show_heatmaps, output, **options)
+
+
+def analyze_store(store_dir, cache_paths=(), jobs=1, show_heatmaps=False, output="text",
+                  **options):
+    """Ingest any new caches into a columnar store, then report from it."""
+    notes = _notes(output)
+    try:
+        store = AnalyticsStore(store_dir)
+    except ValueError as e:
+        print(f"Error: {e}", file=notes)
+        return
+    if cache_paths:
+        paths, missing = collect_cache_paths(cache_paths)
+        for item in missing:
+            print(f"⚠️  No analytics cache matches: {item}", file=notes)
+        ingested, skipped, changed = store.ingest(paths, jobs)
+        for path, change in changed:
+            print(f"⚠️  {path} {change} since it was ingested; not re-read", file=notes)
+        print(f"Ingested {len(ingested)} new or appended cache file(s) into {store_dir} "
+              f"({len(skipped)} unchanged)\n", file=notes)
+    report(store.to_aggregate(), show_heatmaps, output, **options)
+
+
+def _open_tailer(checkpoint, notes):
+    """A Tailer resuming from checkpoint, or None (with a message) if unreadable."""
+    try:
+        return Tailer(checkpoint)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+        print(f"Error: can't read checkpoint {checkpoint}: {e}", file=notes)
+        return None
+
+
+def _poll_note(update):
+    files = len(update["files"])
+    note = f"+{update['events']} event(s) from {files} file(s)"
+    if update["rebuilt"]:
+        note += f" ({update['rebuilt']}: re-read every cache)"
+    return note
+
+
+def analyze_checkpoint(cache_paths, checkpoint, show_heatmaps=False, output="text",
+                       **options):
+    """Fold only the events appended since the checkpoint in, then report."""
+    notes = _notes(output)
+    paths, missing = collect_cache_paths(cache_paths)
+    for item in missing:
+        print(f"⚠️  No analytics cache matches: {item}", file=notes)
+    tailer = _open_tailer(checkpoint, notes)
+    if tailer is None:
+        return
+    update = tailer.poll(paths, finished=True)
+    tailer.save()
+    print(f"Checkpoint {checkpoint}: {_poll_note(update)}\n", file=notes)
+    report(tailer.aggregate, show_heatmaps, output, **options)
+
+
+def _status_line(level):
+    """One text line for a level whose status just changed."""
+    numbers = (f"(completion {level['completion_rate']:.0%}, "
+               f"avg deaths {level['avg_deaths']:.1f})")
+    if level["issues"]:
+        record = level["issues"][0]
+        return (f"{report_format.SEVERITY_PREFIX[record['severity']]}{level['level']} "
+                f"{level['status'].upper()}: {record['message']} {numbers}")
+    return f"✅ {level['level']} back within thresholds {numbers}"
+
+
+def follow(cache_paths, checkpoint=None, show_heatmaps=False, output="text",
+           interval=FOLLOW_INTERVAL, **options):
+    """Report once, then tail the caches and print each level whose status changes.
     
-    if not events:
-        print("No analytics events found.")
+    New events are folded into the running aggregate as the game flushes
+    them (and saved to checkpoint, when given); new cache files matching
+    cache_paths are picked up too. Runs until Ctrl+C.
+    """
+    notes = _notes(output)
+    text = output == "text"
+    tailer = _open_tailer(checkpoint, notes)
+    if tailer is None:
         return
     
-    # Process events
-    level_starts = defaultdict(int)
-    level_completes = defaultdict(int)
-    level_deaths = defaultdict(list)
-    level_times = defaultdict(list)
-    sessions = set()
-    death_positions = defaultdict(list)
-    
-    for event in events:
-        event_type = event.get("event", "")
-        data = event.get("data", {})
-        session = event.get("session_id", "unknown")
-        sessions.add(session)
-        
-        level_key = f"W{data.get('world', '?')}-L{data.get('level', '?')}"
-        
-        if event_type == "level_start":
-            level_starts[level_key] += 1
-        elif event_type == "level_complete":
-            level_completes[level_key] += 1
-            if "deaths" in data:
-                level_deaths[level_key].append(data["deaths"])
-            if "time_seconds" in data:
-                level_times[level_key].append(data["time_seconds"])
-        elif event_type == "death":
-            if "position" in data:
-                death_positions[level_key].append(data["position"])
+    paths, missing = collect_cache_paths(cache_paths)
+    for item in missing:
+        print(f"⚠️  No analytics cache matches yet: {item}", file=notes)
+    tailer.poll(paths)
+    tailer.save()
+    report(tailer.aggregate, show_heatmaps, output, **options)
+    previous = {level["level"]: level["status"] for level in build_levels(tailer.aggregate)[0]}
     
-    # ─── Report ──────────────────────────────────────────────────────────
+    if text:
+        print(f"👀 Following {len(paths)} cache file(s) — Ctrl+C to stop")
+        sys.stdout.flush()
     
-    print("=" * 60)
-    print("  ANALYTICS BALANCE ADVISOR")
-    print("=" * 60)
-    print(f"\n  Total Events: {len(events)}")
-    print(f"  Unique Sessions: {len(sessions)}")
-    print(f"  Levels Played: {len(level_starts)}")
-    print()
+    try:
+        while True:
+            time.sleep(interval)
+            paths, _ = collect_cache_paths(cache_paths)
+            update = tailer.poll(paths)
+            if not update["events"] and not update["rebuilt"]:
+                continue
+            tailer.save()
+            
+            stats = tailer.aggregate
+            levels, recommendations = build_levels(stats)
+            changed = [level for level in levels       # Newly flagged or fixed
+                       if previous.get(level["level"]) != level["status"]
+                       and (level["issues"] or previous.get(level["level"]) in FLAGGED)]
+            previous = {level["level"]: level["status"] for level in levels}
+            if text:
+                stamp = time.strftime("%H:%M:%S")
+                print(f"[{stamp}] {_poll_note(update)} — {len(stats.sessions)} sessions, "
+                      f"{len(recommendations)} recommendation(s)")
+                for level in changed:
+                    print(f"  {_status_line(level)}")
+                sys.stdout.flush()
+            else:
+                report_format.emit("update", {
+                    "events": update["events"], "files": update["files"],
+                    "rebuilt": update["rebuilt"], "total_events": stats.events,
+                    "sessions": len(stats.sessions), "levels": changed,
+                    "recommendations": recommendations,
+                })
+    except KeyboardInterrupt:
+        tailer.save()
+        if text:
+            print("\nStopped following.")
+
+
+def _quantile_record(sketch):
+    """p50/p90/p99 of a sketch as a dict, or None when it is empty."""
+    if not sketch:
+        return None
+    values = sketch.quantiles(REPORT_QUANTILES)
+    return {f"p{round(q * 100)}": v for q, v in zip(REPORT_QUANTILES, values)}
+
+
+def build_heatmaps(stats):
+    """{level key: DeathHeatmap} for every level with positioned deaths."""
+    heatmaps = {}
+    for key, level_stats in sorted(stats.levels.items()):
+        if level_stats.death_positions:
+            heatmap = build_heatmap(key, level_stats.death_positions)
+            if heatmap is not None:
+                heatmaps[key] = heatmap
+    return heatmaps
+
+
+def _day_label(day):
+    return datetime.fromtimestamp(day * DAY_SECONDS, timezone.utc).strftime("%Y-%m-%d")
+
+
+def build_retention(stats, funnel=None, retention_days=RETENTION_DAYS):
+    """Funnel and day-N retention records for an AnalyticsAggregate."""
+    steps = stats.funnel(funnel or parse_funnel(DEFAULT_FUNNEL))
+    first = steps[0]["sessions"]
+    previous = first
+    for step in steps:
+        step["of_first"] = step["sessions"] / max(first, 1)
+        step["of_previous"] = step["sessions"] / max(previous, 1)
+        previous = step["sessions"]
     
-    # Per-level analysis
-    print(f"{'Level':<10} {'Starts':>7} {'Clears':>7} {'Rate':>7} {'Avg Deaths':>11} {'Status':<10}")
-    print("-" * 60)
+    retention = stats.retention(retention_days)
+    day_n = [{"day": n, **retention["day_n"][n]} for n in retention_days]
+    cohorts = [{"date": _day_label(row["day"]), "players": row["players"],
+                "retained": {f"d{n}": count for n, count in row["retained"].items()}}
+               for row in retention["cohorts"]]
     
-    problem_levels = []
+    issues = []
+    tracked = stats.anonymous_sessions < len(stats.sessions)   # Some events have player_id
+    for record in day_n:
+        if tracked and record["day"] == 1 and record["rate"] is not None \
+                and record["rate"] < TARGET_D1_RETENTION:
+            issues.append(report_format.issue(
+                "warning", "low-d1-retention",
+                f"D1 retention {record['rate']:.0%} is below the "
+                f"{TARGET_D1_RETENTION:.0%} target",
+                rate=record["rate"], target=TARGET_D1_RETENTION))
     
+    return {
+        "sessions": len(stats.sessions),
+        "players": len(stats.players),
+        "anonymous_sessions": stats.anonymous_sessions,
+        "funnel": steps,
+        "day_n": day_n,
+        "cohorts": cohorts,
+        "issues": issues,
+    }
+
+
+def _state_records(physics):
+    """Per-state records for a PhysicsStats, deadliest (per minute) first."""
+    total = sum(physics.dwell.values())
+    records = []
+    for state in physics.states():
+        seconds = physics.dwell.get(state, 0.0)
+        deaths = physics.deaths.get(state, 0)
+        records.append({
+            "state": state, "seconds": seconds, "share": seconds / total if total else 0.0,
+            "deaths": deaths,
+            "deaths_per_minute": deaths * 60 / seconds if seconds else None,
+        })
+    records.sort(key=lambda r: (r["deaths_per_minute"] is None, -(r["deaths_per_minute"] or 0)))
+    return records
+
+
+def _transition_records(physics):
+    return [{"from": source, "to": target, "count": count}
+            for (source, target), count in sorted(physics.transitions.items(),
+                                                  key=lambda item: -item[1])]
+
+
+def build_physics(stats):
+    """Physics-state dwell, transition and death records for an AnalyticsAggregate."""
+    level_stats = stats.physics.level_stats()
+    totals = PhysicsStats()
+    levels = []
+    issues = []
+    for world in range(1, 4):
+        for number in range(1, 9):
+            key = f"W{world}-L{number}"
+            physics = level_stats.get(key)
+            if physics is None:
+                continue
+            totals.merge(physics)
+            states = _state_records(physics)
+            deaths = sum(physics.deaths.values())
+            seconds = sum(physics.dwell.values())
+            for record in states:
+                other_deaths = deaths - record["deaths"]
+                other_seconds = seconds - record["seconds"]
+                if record["deaths"] < MIN_STATE_DEATHS or other_seconds <= 0 \
+                        or record["deaths_per_minute"] is None:
+                    continue
+                baseline = other_deaths * 60 / other_seconds
+                if record["deaths_per_minute"] >= DEADLY_STATE_FACTOR * max(baseline, 1e-9):
+                    issues.append(report_format.issue(
+                        "warning", "deadly-physics-state",
+                        f"{key}: {record['state']} kills {record['deaths_per_minute']:.1f}/min "
+                        f"vs {baseline:.1f}/min in the rest of the level",
+                        level=key, state=record["state"],
+                        deaths_per_minute=record["deaths_per_minute"],
+                        baseline=baseline))
+            levels.append({"level": key, "states": states,
+                           "transitions": _transition_records(physics)})
+    
+    return {
+        "states": _state_records(totals),
+        "transitions": _transition_records(totals),
+        "levels": levels,
+        "issues": issues,
+    }
+
+
+def build_levels(stats):
+    """Per-level records and recommendations for an AnalyticsAggregate."""
+    levels = []
+    recommendations = []
     for world in range(1, 4):
-        for level in range(1, 9):
-            key = f"W{world}-L{level}"
-            starts = level_starts.get(key, 0)
-            completes = level_completes.get(key, 0)
+        for number in range(1, 9):
+            key = f"W{world}-L{number}"
+            level = stats.levels.get(key) or LevelStats()
+            starts = level.starts
+            completes = level.completes
             
             rate = completes / max(starts, 1)
-            avg_deaths = (sum(level_deaths.get(key, [0])) / 
-                         max(len(level_deaths.get(key, [1])), 1))
+            avg_deaths = level.avg_deaths
             
-            status = "✅"
-            suggestion = ""
+            status = "ok"
+            issues = []
             
             if starts > 0:
                 if rate < TARGET_COMPLETION_RATE:
-                    status = "❌ HARD"
-                    suggestion = "Reduce hazards or add checkpoint"
-                    problem_levels.append((key, rate, avg_deaths, suggestion))
+                    status = "hard"
+                    issues.append(report_format.issue(
+                        "error", "low-completion", "Reduce hazards or add checkpoint",
+                        completion_rate=rate, target=TARGET_COMPLETION_RATE))
                 elif avg_deaths > MAX_AVG_DEATHS:
-                    status = "⚠️ GRINDY"
-                    suggestion = "Reduce death traps"
-                    problem_levels.append((key, rate, avg_deaths, suggestion))
+                    status = "grindy"
+                    issues.append(report_format.issue(
+                        "warning", "high-deaths", "Reduce death traps",
+                        avg_deaths=avg_deaths, target=MAX_AVG_DEATHS))
             else:
-                status = "—"
+                status = "unplayed"
             
-            if starts > 0:
-                print(f"{key:<10} {starts:>7} {completes:>7} {rate:>6.0%} {avg_deaths:>11.1f} {status:<10}")
+            deaths = _quantile_record(level.deaths)
+            times = _quantile_record(level.times)
+            if starts == 0 and deaths is None and times is None:
+                continue
+            levels.append({
+                "level": key, "world": world, "number": number,
+                "starts": starts, "completes": completes,
+                "completion_rate": rate, "avg_deaths": avg_deaths,
+                "status": status, "issues": issues,
+                "deaths": deaths, "time_seconds": times,
+            })
+            for record in issues:
+                recommendations.append({"level": key, "suggestion": record["message"],
+                                        "completion_rate": rate, "avg_deaths": avg_deaths})
+    
+    return levels, recommendations
+
+
+def build_report(stats, heatmaps=None, funnel=None, retention_days=RETENTION_DAYS):
+    """The balance report for an AnalyticsAggregate as plain data."""
+    if heatmaps is None:
+        heatmaps = build_heatmaps(stats)
+    errors = [report_format.issue("warning", "cache-parse",
+                                  f"Could not parse analytics cache {path}: {message}",
+                                  path=path)
+              for path, message in stats.errors]
+    
+    levels, recommendations = build_levels(stats)
+    
+    kill_zones = [{"level": key, "deaths": heatmap.total, "zones": heatmap.kill_zones()}
+                  for key, heatmap in heatmaps.items()]
+    
+    retention = build_retention(stats, funnel, retention_days)
+    physics = build_physics(stats)
+    
+    return {
+        "errors": errors,
+        "files": stats.files,
+        "events": stats.events,
+        "sessions": len(stats.sessions),
+        "levels_played": stats.levels_played(),
+        "thresholds": {"completion_rate": TARGET_COMPLETION_RATE,
+                       "max_avg_deaths": MAX_AVG_DEATHS},
+        "levels": levels,
+        "kill_zones": kill_zones,
+        "recommendations": recommendations,
+        "retention": retention,
+        "physics": physics,
+    }
+
+
+def report(stats, show_heatmaps=False, output="text", funnel=None,
+           retention_days=RETENTION_DAYS):
+    """Print the balance report for an AnalyticsAggregate.
+    
+    output is "text", "json" (one document) or "ndjson" (one record per
+    level and kill-zone list, then a summary; see report_format).
+    """
+    heatmaps = build_heatmaps(stats)
+    doc = build_report(stats, heatmaps, funnel, retention_days)
+    if output == "json":
+        report_format.write_json(report_format.document("analytics_balance_advisor", **doc))
+    elif output == "ndjson":
+        for record in doc["errors"]:
+            report_format.emit("error", record)
+        for record in doc["levels"]:
+            report_format.emit("level", record)
+        for record in doc["kill_zones"]:
+            report_format.emit("kill_zones", record)
+        summary = {key: value for key, value in doc.items()
+                   if key not in ("errors", "levels", "kill_zones")}
+        report_format.emit("summary", summary)
+    else:
+        print_report(doc, heatmaps, show_heatmaps)
+
+
+def print_report(doc, heatmaps, show_heatmaps=False):
+    """The text balance report for a build_report() document."""
+    for record in doc["errors"]:
+        print(report_format.format_issue(record))
+    
+    if not doc["events"]:
+        print("No analytics events found.")
+        return
+    
+    # ─── Report ──────────────────────────────────────────────────────────
+    
+    print("=" * 60)
+    print("  ANALYTICS BALANCE ADVISOR")
+    print("=" * 60)
+    if doc["files"] > 1:
+        print(f"\n  Cache Files: {doc['files']}")
+    print(f"\n  Total Events: {doc['events']}")
+    print(f"  Unique Sessions: {doc['sessions']}")
+    print(f"  Levels Played: {doc['levels_played']}")
+    print()
+    
+    # Per-level analysis
+    print(f"{'Level':<10} {'Starts':>7} {'Clears':>7} {'Rate':>7} {'Avg Deaths':>11} {'Status':<10}")
+    print("-" * 60)
+    
+    labels = {"ok": "✅", "hard": "❌ HARD", "grindy": "⚠️ GRINDY"}
+    for level in doc["levels"]:
+        if level["starts"] > 0:
+            print(f"{level['level']:<10} {level['starts']:>7} {level['completes']:>7} "
+                  f"{level['completion_rate']:>6.0%} {level['avg_deaths']:>11.1f} "
+                  f"{labels[level['status']]:<10}")
+    
+    # ─── Long Tail ────────────────────────────────────────────────────
+    
+    print()
+    print("=" * 60)
+    print("  DEATHS & CLEAR TIMES PER COMPLETION")
+    print("=" * 60)
+    print(f"\n{'Level':<10} {'Deaths p50':>10} {'p90':>5} {'p99':>5} "
+          f"{'Time p50':>10} {'p90':>7} {'p99':>7}")
+    print("-" * 60)
+    
+    for level in doc["levels"]:
+        if level["deaths"] is None and level["time_seconds"] is None:
+            continue
+        deaths = _format_quantiles(level["deaths"], "{:.0f}", (10, 5, 5))
+        times = _format_quantiles(level["time_seconds"], "{:.1f}", (10, 7, 7))
+        print(f"{level['level']:<10} {deaths} {times}")
+    
+    # ─── Kill Zones ───────────────────────────────────────────────────
+    
+    if doc["kill_zones"]:
+        print()
+        print("=" * 60)
+        print("  KILL ZONES")
+        print("=" * 60)
+        for record in doc["kill_zones"]:
+            key = record["level"]
+            print(f"\n  {key}: {record['deaths']} deaths with positions")
+            if show_heatmaps:
+                for row in heatmaps[key].render().splitlines():
+                    print(f"    |{row}|")
+            for zone in record["zones"]:
+                print(f"    {zone['rank']}. ({zone['x']:.0f}, {zone['y']:.0f}) "
+                      f"{zone['share']:>4.0%} of deaths — {zone['label']}")
     
     # ─── Recommendations ──────────────────────────────────────────────
     
@@ -117,11 +585,12 @@ def analyze_analytics(cache_path):
     print("  RECOMMENDATIONS")
     print("=" * 60)
     
-    if problem_levels:
+    if doc["recommendations"]:
         print()
-        for key, rate, deaths, suggestion in problem_levels:
-            print(f"  🔧 {key}: {suggestion}")
-            print(f"     Completion: {rate:.0%} | Avg Deaths: {deaths:.1f}")
+        for rec in doc["recommendations"]:
+            print(f"  🔧 {rec['level']}: {rec['suggestion']}")
+            print(f"     Completion: {rec['completion_rate']:.0%} | "
+                  f"Avg Deaths: {rec['avg_deaths']:.1f}")
             print()
     else:
         print("\n  ✅ All levels within target thresholds!")
@@ -134,71 +603,182 @@ def analyze_analytics(cache_path):
     print("  RETENTION ANALYSIS")
     print("=" * 60)
     
-    total_sessions = len(sessions)
-    w1_players = level_starts.get("W1-L1", 0)
-    w1_completers = level_completes.get("W1-L8", 0)
-    w2_players = level_starts.get("W2-L1", 0)
-    w3_players = level_starts.get("W3-L1", 0)
-    
-    print(f"\n  Sessions: {total_sessions}")
-    print(f"  Started W1: {w1_players}")
-    print(f"  Finished W1: {w1_completers} ({w1_completers/max(w1_players,1):.0%})")
-    print(f"  Started W2: {w2_players} ({w2_players/max(w1_players,1):.0%} retention)")
-    print(f"  Started W3: {w3_players} ({w3_players/max(w1_players,1):.0%} retention)")
+    retention = doc["retention"]
+    print(f"\n  Sessions: {retention['sessions']}")
+    print(f"  Players: {retention['players']}")
+    if retention["anonymous_sessions"] == retention["sessions"]:
+        print("  (no player_id in these events: each session counts as a player,")
+        print("   so day-N retention only sees sessions that run past midnight)")
+    elif retention["anonymous_sessions"]:
+        print(f"  ({retention['anonymous_sessions']} session(s) without a player_id "
+              f"count as their own player)")
+    
+    print(f"\n  {'Funnel step':<20} {'Sessions':>9} {'Of first':>9} {'Of prev':>8}")
+    print("  " + "-" * 48)
+    for step in retention["funnel"]:
+        label = f"{step['level']} {'clear' if step['stage'] == 'complete' else 'start'}"
+        print(f"  {label:<20} {step['sessions']:>9} {step['of_first']:>9.0%} "
+              f"{step['of_previous']:>8.0%}")
+    
+    print(f"\n  {'Day':<6} {'Cohort':>8} {'Retained':>9} {'Rate':>6}")
+    print("  " + "-" * 32)
+    for record in retention["day_n"]:
+        if record["rate"] is None:
+            print(f"  {'D' + str(record['day']):<6} {'—':>8} {'—':>9} {'—':>6}")
+        else:
+            print(f"  {'D' + str(record['day']):<6} {record['players']:>8} "
+                  f"{record['retained']:>9} {record['rate']:>6.0%}")
+    for record in retention["issues"]:
+        print(f"\n  {report_format.format_issue(record)}")
+    print()
+    
+    # ─── Physics States ─────────────────────────────────────────────────
+    
+    print("=" * 60)
+    print("  PHYSICS STATES")
+    print("=" * 60)
+    
+    physics = doc["physics"]
+    if not physics["states"]:
+        print("\n  No physics state timelines (no level_start or physics_change")
+        print("  events with timestamps; the columnar store doesn't keep them).")
+        print()
+        return
+    
+    print(f"\n  {'State':<18} {'Minutes':>9} {'Share':>6} {'Deaths':>7} {'Per min':>8}")
+    print("  " + "-" * 52)
+    for record in physics["states"]:
+        rate = record["deaths_per_minute"]
+        print(f"  {record['state']:<18} {record['seconds'] / 60:>9.1f} {record['share']:>6.0%} "
+              f"{record['deaths']:>7} {(f'{rate:.2f}' if rate is not None else '—'):>8}")
+    
+    print("\n  Deadliest state per level:")
+    for level in physics["levels"]:
+        deadliest = level["states"][0]
+        if deadliest["deaths_per_minute"] is None or len(level["states"]) < 2:
+            continue
+        deaths = sum(record["deaths"] for record in level["states"])
+        print(f"    {level['level']:<8} {deadliest['state']:<18} "
+              f"{deadliest['deaths_per_minute']:.2f}/min — "
+              f"{deadliest['deaths'] / max(deaths, 1):.0%} of deaths in "
+              f"{deadliest['share']:.0%} of the time")
+    
+    print("\n  Most common transitions:")
+    for record in physics["transitions"][:TOP_TRANSITIONS]:
+        print(f"    {record['from']} → {record['to']}: {record['count']}")
+    for record in physics["issues"]:
+        print(f"\n  {report_format.format_issue(record)}")
     print()
 
 
-def main():
-    cache_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CACHE_PATH
+def _format_quantiles(quantiles, fmt, widths):
+    """p50/p90/p99 from _quantile_record as right-aligned columns ('—' when empty)."""
+    values = list(quantiles.values()) if quantiles else [None] * len(widths)
+    return " ".join(
+        f"{(fmt.format(v) if v is not None else '—'):>{w}}"
+        for v, w in zip(values, widths)
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Suggest level balance changes from analytics caches.")
+    parser.add_argument(
+        "caches", nargs="*", metavar="CACHE",
+        help="cache files, directories or glob patterns "
+             f"(default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, metavar="N",
+        help="read cache files in N worker processes (0 = one per CPU)")
+    parser.add_argument(
+        "--store", metavar="DIR",
+        help="columnar analytics store: CACHE arguments are ingested into it "
+             "first, then the report is built from the store")
+    parser.add_argument(
+        "--checkpoint", metavar="FILE",
+        help="read only events appended since the last run with this checkpoint "
+             "(offsets and running totals are saved to FILE)")
+    parser.add_argument(
+        "--follow", action="store_true",
+        help="keep running: tail the caches and print levels whose status changes")
+    parser.add_argument(
+        "--interval", type=float, default=FOLLOW_INTERVAL, metavar="SECONDS",
+        help=f"how often --follow checks for new events (default: {FOLLOW_INTERVAL})")
+    parser.add_argument(
+        "--heatmaps", action="store_true",
+        help="print an ASCII death heatmap above each level's kill zones")
+    parser.add_argument(
+        "--format", choices=report_format.FORMATS, default="text",
+        help="text report (default), one JSON document, or NDJSON records")
+    parser.add_argument(
+        "--funnel", default=DEFAULT_FUNNEL, metavar="STEPS",
+        help="comma-separated funnel steps, LEVEL or LEVEL:complete "
+             f"(default: {DEFAULT_FUNNEL})")
+    parser.add_argument(
+        "--retention-days", default=",".join(map(str, RETENTION_DAYS)), metavar="N,N",
+        help="days after a player's first day to report retention for "
+             f"(default: {','.join(map(str, RETENTION_DAYS))})")
+    args = parser.parse_args(argv)
+    try:
+        args.funnel = parse_funnel(args.funnel)
+    except ValueError as e:
+        parser.error(f"--funnel: {e}")
+    try:
+        args.retention_days = tuple(int(n) for n in args.retention_days.split(",") if n.strip())
+    except ValueError:
+        parser.error("--retention-days must be comma-separated whole numbers")
+    if not args.retention_days or min(args.retention_days) < 1:
+        parser.error("--retention-days needs days >= 1")
+    if args.store and (args.follow or args.checkpoint):
+        parser.error("--store can't be combined with --follow or --checkpoint")
+    if args.follow and args.format == "json":
+        parser.error("--follow never finishes a document; use --format ndjson")
+    if args.interval <= 0:
+        parser.error("--interval must be > 0")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    notes = _notes(args.format)
+    if args.store:
+        print(f"Reading analytics from store: {args.store}\n", file=notes)
+        analyze_store(args.store, args.caches, args.jobs, args.heatmaps, args.format,
+                      funnel=args.funnel, retention_days=args.retention_days)
+        return
     
-    print(f"Reading analytics from: {cache_path}\n")
+    caches = args.caches or [DEFAULT_CACHE_PATH]
+    if not args.caches and os.path.exists(ROTATED_CACHE_PATH):
+        caches.insert(0, ROTATED_CACHE_PATH)
     
-    if not os.path.exists(cache_path):
+    print(f"Reading analytics from: {', '.join(caches)}\n", file=notes)
+    
+    if len(caches) == 1 and not os.path.exists(caches[0]) and not glob.has_magic(caches[0]) \
+            and not args.follow:
         # Generate sample data for demonstration
-        print("No analytics data found. Generating sample data for demo...\n")
-        _generate_sample_data(cache_path)
+        print("No analytics data found. Generating sample data for demo...\n", file=notes)
+        _generate_sample_data(caches[0])
+        print(f"Sample data written to: {caches[0]}\n", file=notes)
     
-    analyze_analytics(cache_path)
+    options = {"funnel": args.funnel, "retention_days": args.retention_days}
+    if args.follow:
+        follow(caches, args.checkpoint, args.heatmaps, args.format, args.interval, **options)
+    elif args.checkpoint:
+        analyze_checkpoint(caches, args.checkpoint, args.heatmaps, args.format, **options)
+    else:
+        analyze_analytics(caches, args.jobs, args.heatmaps, args.format, **options)
 
 
 def _generate_sample_data(path):
     """Generate sample analytics data for testing the advisor."""
-    import random
-    
-    events = []
-    session_id = "demo-session-001"
-    
-    for world in range(1, 4):
-        for level in range(1, 9):
-            # Simulate multiple play attempts
-            attempts = random.randint(1, 5)
-            for _ in range(attempts):
-                events.append({
-                    "event": "level_start",
-                    "data": {"world": world, "level": level},
-                    "session_id": session_id,
-                    "timestamp": "2026-02-12T12:00:00"
-                })
-            
-            # Some complete, some don't
-            if random.random() < (0.9 - world * 0.15):
-                deaths = random.randint(0, 10 * world)
-                time_s = random.uniform(20, 120 * world)
-                events.append({
-                    "event": "level_complete",
-                    "data": {
-                        "world": world, "level": level,
-                        "deaths": deaths, "time_seconds": time_s
-                    },
-                    "session_id": session_id,
-                    "timestamp": "2026-02-12T12:05:00"
-                })
-    
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump(events, f, indent=2)
-    
-    print(f"Sample data written to: {path}\n")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_events(path, generate_events(DEMO_SESSIONS))
 
 
 if __name__ == "__main__":
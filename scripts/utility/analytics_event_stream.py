@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Analytics Event Stream — Constant-Memory Reader for Analytics Caches
+
+AnalyticsManager appends its cache as newline-delimited JSON (one event
+object per line); older builds wrote one (indented) JSON array. iter_events()
+reads either format one event at a time, so memory stays flat no matter how
+many events a file holds. Given an errors list, it skips NDJSON lines that
+don't parse and records them there, so one bad flush costs one event rather
+than the rest of the file; a broken array can't be resynced and still raises.
+collect_cache_paths() expands files, directories and globs to cache files.
+
+normalize_event() maps AnalyticsManager.gd's event shape (payload under
+"properties", deaths named "player_death") onto the one the tools read
+("data", "death"); every consumer of events calls it before reading one.
+"""
+
+import glob
+import json
+import os
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+CHUNK_SIZE = 1 << 16    # Characters read per refill of the array decoder
+
+FORMAT_ARRAY = "array"
+FORMAT_NDJSON = "ndjson"
+
+CACHE_EXTENSIONS = (".json", ".ndjson", ".jsonl")
+
+# AnalyticsManager.track() event names -> the names the tools use
+EVENT_ALIASES = {"player_death": "death"}
+
+
+# ─── Event Shape ─────────────────────────────────────────────────────────────
+
+def normalize_event(event):
+    """The event with its payload under "data" and tool event names, in place.
+
+    AnalyticsManager.track() writes {"event", "session_id", "player_id",
+    "timestamp", "properties"}; synthetic_data writes "data". Non-dicts are
+    returned unchanged.
+    """
+    if not isinstance(event, dict):
+        return event
+    if "data" not in event and "properties" in event:
+        event["data"] = event.pop("properties")
+    name = EVENT_ALIASES.get(event.get("event"))
+    if name is not None:
+        event["event"] = name
+    return event
+
+
+# ─── Format Detection ────────────────────────────────────────────────────────
+
+def detect_format(f):
+    """Peek at the first non-whitespace character without consuming it.
+
+    Returns FORMAT_ARRAY for '[', FORMAT_NDJSON otherwise (including empty
+    files, which then yield no events).
+    """
+    start = f.tell()
+    while True:
+        ch = f.read(1)
+        if not ch or not ch.isspace():
+            break
+    f.seek(start)
+    return FORMAT_ARRAY if ch == "[" else FORMAT_NDJSON
+
+
+# ─── Readers ─────────────────────────────────────────────────────────────────
+
+def _iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array, decoding one at a time."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    opened = False
+    expect_value = True
+
+    while True:
+        # Skip whitespace, refilling the buffer as needed
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("Unexpected end of file inside JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        ch = buf[pos]
+        if not opened:
+            if ch != "[":
+                raise ValueError("Expected a JSON array of events")
+            opened = True
+            pos += 1
+            continue
+        if ch == "]":
+            return
+        if not expect_value:
+            if ch != ",":
+                raise ValueError(f"Expected ',' or ']' between events near offset {pos}")
+            expect_value = True
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            value, end = None, None
+        # A value touching the end of the buffer may be cut short (e.g. a
+        # number split across chunks): read more and decode again.
+        if end is None or (end == len(buf) and not eof):
+            if eof:
+                raise ValueError(f"Malformed JSON array element near offset {pos}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        yield value
+        expect_value = False
+        pos = end
+        # Drop consumed text so the buffer never outgrows a chunk or two
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _iter_ndjson(f, errors=None):
+    """Yield one event per non-blank line; bad lines go to errors if given."""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError as e:
+            if errors is None:
+                raise ValueError(f"Line {line_number}: {e}") from None
+            errors.append(f"Line {line_number}: {e}")
+            continue
+        yield event
+
+
+def iter_events(path, chunk_size=CHUNK_SIZE, errors=None):
+    """Yield events from a JSON-array or NDJSON analytics cache file.
+
+    With an errors list, malformed NDJSON lines are skipped and described
+    there instead of raising ValueError.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if detect_format(f) == FORMAT_ARRAY:
+            yield from _iter_json_array(f, chunk_size)
+        else:
+            yield from _iter_ndjson(f, errors)
+
+
+# ─── Cache Discovery ─────────────────────────────────────────────────────────
+
+def collect_cache_paths(inputs):
+    """Expand files, directories (recursively) and glob patterns to cache files.
+
+    Returns (paths, missing) with paths sorted and de-duplicated.
+    """
+    paths = set()
+    missing = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, f) for f in files
+                             if f.endswith(CACHE_EXTENSIONS))
+        elif os.path.isfile(item):
+            paths.add(item)
+        elif glob.has_magic(item):
+            matches = [p for p in glob.glob(item, recursive=True) if os.path.isfile(p)]
+            if matches:
+                paths.update(matches)
+            else:
+                missing.append(item)
+        else:
+            missing.append(item)
+    return sorted(paths), missing
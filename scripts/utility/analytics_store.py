@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Analytics Store — Columnar On-Disk Store for Analytics Events
+
+Re-parsing verbose JSON event caches on every advisor run is slow. This
+module ingests caches once into a compact columnar layout, partitioned by
+level, and reads it back through memory maps:
+
+    STORE/
+      manifest.json          row counts, ingested sources, totals
+      sessions.txt           session id dictionary (row n = session index n)
+      sessions.player.u32    player index of each session
+      players.txt            player dictionary (player_id, or the session id)
+      activity.session.u32   activity.day.u32   (session, UTC day) it had events on
+      W1-L1/
+        start.session.u32    start.ts.f64
+        complete.session.u32 complete.ts.f64 complete.deaths.f64 complete.time.f64
+        death.session.u32    death.ts.f64    death.x.f64         death.y.f64
+
+Columns are little-endian typed arrays; missing values (a clear without a
+time, a death without a position) are NaN. Ingesting appends to the columns.
+Each source records how many bytes were read and a hash of its first bytes
+and of those just before that offset, so a cache the game appended to since
+is read on from there, and one it rotated (renamed) is followed by inode.
+Rows can't be taken back out: a cache rewritten any other way is reported
+and left as ingested. The manifest is written last,
+so a crash mid-ingest leaves extra trailing rows that readers ignore and the
+next ingest truncates. Stores of an older version are rejected; ingest the
+caches into a new store instead.
+
+Usage:
+    python3 analytics_store.py STORE CACHE [CACHE ...] [--jobs N]
+    python3 analytics_balance_advisor.py --store STORE
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from array import array
+
+from analytics_aggregate import (AnalyticsAggregate, day_number, level_key, parse_position,
+                                 parse_timestamp)
+from analytics_event_stream import collect_cache_paths, iter_events, normalize_event
+from analytics_tail import EDGE_BYTES, READ_SIZE
+from session_bitmap import Bitmap, Interner
+
+try:
+    import numpy as np
+except ImportError:  # Columns are read as memoryviews instead
+    np = None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+STORE_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+SESSIONS_FILE = "sessions.txt"
+PLAYERS_FILE = "players.txt"
+SESSION_PLAYERS_FILE = "sessions.player.u32"
+
+SESSION_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+# Event kind -> {field: array typecode}
+COLUMNS = {
+    "start": {"session": SESSION_TYPECODE, "ts": "d"},
+    "complete": {"session": SESSION_TYPECODE, "ts": "d", "deaths": "d", "time": "d"},
+    "death": {"session": SESSION_TYPECODE, "ts": "d", "x": "d", "y": "d"},
+}
+ACTIVITY_COLUMNS = {"session": SESSION_TYPECODE, "day": SESSION_TYPECODE}
+EVENT_KINDS = {"level_start": "start", "level_complete": "complete", "death": "death"}
+FILE_SUFFIXES = {SESSION_TYPECODE: "u32", "d": "f64"}
+NUMPY_DTYPES = {SESSION_TYPECODE: "<u4", "d": "<f8"}
+
+NAN = float("nan")
+
+
+# ─── Event Parsing ───────────────────────────────────────────────────────────
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _partition_dir(key):
+    """Filesystem-safe directory name for a level key ("W?-L?" -> "W_-L_")."""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", key)
+
+
+class ColumnBatch:
+    """Columns for a batch of cache files, with a batch-local session table.
+
+    This is what ingest workers send back; AnalyticsStore.append() maps the
+    local session and player indices onto the store's dictionaries.
+    """
+
+    def __init__(self):
+        self.session_ids = []
+        self._session_index = {}
+        self.players = Interner()
+        self.session_players = array(SESSION_TYPECODE)  # Local session -> local player
+        self.activity = set()   # (local session, UTC day) pairs
+        self.partitions = {}    # level key -> kind -> field -> array
+        self.events = 0
+        self.sources = {}       # path -> source record (see add_file)
+
+    def _session(self, session_id, player_id):
+        index = self._session_index.get(session_id)
+        if index is None:
+            index = self._session_index[session_id] = len(self.session_ids)
+            self.session_ids.append(session_id)
+            self.session_players.append(self.players.intern(str(player_id or session_id)))
+        return index
+
+    def _columns(self, key, kind):
+        kinds = self.partitions.setdefault(key, {})
+        columns = kinds.get(kind)
+        if columns is None:
+            columns = kinds[kind] = {f: array(t) for f, t in COLUMNS[kind].items()}
+        return columns
+
+    def add_event(self, event):
+        self.events += 1
+        if not isinstance(event, dict):
+            return
+        normalize_event(event)
+        data = event.get("data", {})
+        session = self._session(str(event.get("session_id", "unknown")), event.get("player_id"))
+        timestamp = parse_timestamp(event.get("timestamp"))
+        day = day_number(timestamp)
+        if day is not None:
+            self.activity.add((session, day))
+        kind = EVENT_KINDS.get(event.get("event", ""))
+        if kind is None:
+            return
+
+        columns = self._columns(level_key(data), kind)
+        columns["session"].append(session)
+        columns["ts"].append(timestamp)
+        if kind == "complete":
+            columns["deaths"].append(_number(data.get("deaths")))
+            columns["time"].append(_number(data.get("time_seconds")))
+        elif kind == "death":
+            position = parse_position(data.get("position")) or (NAN, NAN)
+            columns["x"].append(position[0])
+            columns["y"].append(position[1])
+
+    def add_file(self, path, source=None):
+        """Ingest one cache file, or what was appended since its source record.
+
+        Parse errors are recorded, not raised. Malformed NDJSON lines are
+        skipped; the source's error then counts them and quotes the first.
+        The file's record is {"size", "mtime", "identity", "array", "offset",
+        "edge", "events", "error"}.
+        """
+        before = self.events
+        record = {"size": None, "mtime": None, "identity": None, "array": False,
+                  "offset": source["offset"] if source else 0, "edge": None}
+        error = None
+        bad_lines = []
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                record.update(size=st.st_size, mtime=st.st_mtime,
+                              identity=[st.st_dev, st.st_ino])
+                if source is None and _is_array(f):
+                    record["array"] = True
+                    record["offset"] = st.st_size
+                    for event in iter_events(path):
+                        self.add_event(event)
+                else:
+                    record["offset"] = self._add_lines(f, record["offset"], bad_lines)
+                record["edge"] = _edge(f, record["offset"])
+        except (OSError, ValueError) as e:
+            error = str(e)
+        if bad_lines and error is None:
+            error = f"skipped {len(bad_lines)} malformed line(s) ({bad_lines[0]})"
+        record["events"] = self.events - before + (source["events"] if source else 0)
+        record["error"] = error or (source["error"] if source else None)
+        self.sources[os.path.abspath(path)] = record
+
+    def _add_lines(self, f, offset, errors):
+        """Add the NDJSON events from offset on; return the offset read to.
+
+        Ingest is one-shot, so a last line without a newline is read when it
+        parses, as a plain read would; one that doesn't is left for later.
+        """
+        f.seek(offset)
+        pending = b""
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                self._add_line(line, offset, errors)
+                offset += len(line) + 1
+        if pending.strip():
+            try:
+                event = json.loads(pending)
+            except ValueError:
+                return offset
+            self.add_event(event)
+            offset += len(pending)
+        return offset
+
+    def _add_line(self, line, offset, errors):
+        if not line.strip():
+            return
+        try:
+            event = json.loads(line)
+        except ValueError as e:
+            errors.append(f"Byte {offset}: {e}")
+            return
+        self.add_event(event)
+
+
+def _is_array(f):
+    f.seek(0)
+    return f.read(EDGE_BYTES).lstrip()[:1] == b"["
+
+
+def _edge(f, offset):
+    """Hash of a file's first bytes and the bytes just before offset."""
+    f.seek(0)
+    head = f.read(min(EDGE_BYTES, offset))
+    start = max(0, offset - EDGE_BYTES)
+    f.seek(start)
+    return hashlib.sha256(head + f.read(offset - start)).hexdigest()
+
+
+def source_change(path, source):
+    """How path differs from its source record.
+
+    None if unchanged, "appended" if it only grew past the record's offset,
+    otherwise why it can't be read on from there.
+    """
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if source.get("array"):
+                if [st.st_size, st.st_mtime] != [source["size"], source["mtime"]]:
+                    return "is a JSON array and changed"
+                return None
+            offset = source.get("offset")
+            if offset is None or st.st_size < offset:
+                return "shrank"
+            if _edge(f, offset) != source.get("edge"):
+                return "was rewritten"
+    except OSError:
+        return "disappeared"
+    return "appended" if st.st_size > offset else None
+
+
+def ingest_files(files):
+    """Parse a batch of (path, source record or None) pairs into columns.
+
+    This is the unit of work for workers.
+    """
+    batch = ColumnBatch()
+    for path, source in files:
+        batch.add_file(path, source)
+    return batch
+
+
+# ─── Store ───────────────────────────────────────────────────────────────────
+
+class AnalyticsStore:
+    """A directory of per-level column files plus a JSON manifest."""
+
+    def __init__(self, root):
+        self.root = root
+        self.manifest = {
+            "version": STORE_VERSION,
+            "events": 0,
+            "sessions": 0,
+            "sessions_bytes": 0,
+            "players": 0,
+            "players_bytes": 0,
+            "anonymous_sessions": 0,
+            "activity_rows": 0,
+            "sources": {},
+            "partitions": {},
+        }
+        path = os.path.join(root, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported analytics store version in {path}; "
+                                 f"ingest the caches into a new store")
+            self.manifest = manifest
+        self._session_index = None
+        self._players = None
+
+    # ─── Writing ─────────────────────────────────────────────────────────
+
+    def _column_path(self, key, kind, field):
+        partition = self.manifest["partitions"][key]
+        suffix = FILE_SUFFIXES[COLUMNS[kind][field]]
+        return os.path.join(self.root, partition["dir"], f"{kind}.{field}.{suffix}")
+
+    def _load_session_index(self):
+        if self._session_index is None:
+            self._session_index = {s: i for i, s in enumerate(self.session_ids())}
+        return self._session_index
+
+    def _load_players(self):
+        if self._players is None:
+            self._players = Interner(self.player_ids())
+        return self._players
+
+    def _append_bytes(self, path, valid_bytes, payload):
+        """Append payload after the first valid_bytes bytes of path."""
+        mode = "r+b" if os.path.exists(path) else "wb"
+        with open(path, mode) as f:
+            f.truncate(valid_bytes)
+            f.seek(valid_bytes)
+            f.write(payload)
+
+    def append(self, batch):
+        """Add a ColumnBatch's rows, sessions and sources to the store."""
+        os.makedirs(self.root, exist_ok=True)
+        manifest = self.manifest
+
+        # Map batch-local session indices onto the store's dictionary
+        session_index = self._load_session_index()
+        new_sessions = []
+        remap = array(SESSION_TYPECODE)
+        for session_id in batch.session_ids:
+            index = session_index.get(session_id)
+            if index is None:
+                index = session_index[session_id] = len(session_index)
+                new_sessions.append(session_id)
+            remap.append(index)
+        if new_sessions:
+            self._append_players(batch, remap, manifest["sessions"])
+            payload = "".join(f"{s}\n" for s in new_sessions).encode("utf-8")
+            self._append_bytes(os.path.join(self.root, SESSIONS_FILE),
+                               manifest["sessions_bytes"], payload)
+            manifest["sessions"] += len(new_sessions)
+            manifest["sessions_bytes"] += len(payload)
+
+        for key, kinds in batch.partitions.items():
+            partition = manifest["partitions"].get(key)
+            if partition is None:
+                partition = manifest["partitions"][key] = {
+                    "dir": _partition_dir(key), "rows": {}}
+            os.makedirs(os.path.join(self.root, partition["dir"]), exist_ok=True)
+            for kind, columns in kinds.items():
+                rows = partition["rows"].get(kind, 0)
+                columns = dict(columns)
+                columns["session"] = array(
+                    SESSION_TYPECODE, (remap[i] for i in columns["session"]))
+                for field, values in columns.items():
+                    if sys.byteorder == "big":
+                        values = array(values.typecode, values)
+                        values.byteswap()
+                    self._append_bytes(self._column_path(key, kind, field),
+                                       rows * values.itemsize, values.tobytes())
+                partition["rows"][kind] = rows + len(columns["session"])
+
+        if batch.activity:
+            self._append_activity(batch, remap)
+
+        manifest["events"] += batch.events
+        manifest["sources"].update(batch.sources)
+
+    def _append_players(self, batch, remap, known_sessions):
+        """Record the players of the batch's sessions that are new to the store."""
+        manifest = self.manifest
+        players = self._load_players()
+        known_players = len(players)
+        session_players = array(SESSION_TYPECODE)
+        for local, index in enumerate(remap):
+            if index >= known_sessions:     # New session
+                player = batch.session_players[local]
+                session_players.append(players.intern(batch.players.ids[player]))
+                if batch.players.ids[player] == batch.session_ids[local]:
+                    manifest["anonymous_sessions"] += 1
+        if len(players) > known_players:
+            payload = "".join(f"{p}\n" for p in players.ids[known_players:]).encode("utf-8")
+            self._append_bytes(os.path.join(self.root, PLAYERS_FILE),
+                               manifest["players_bytes"], payload)
+            manifest["players"] = len(players)
+            manifest["players_bytes"] += len(payload)
+        if sys.byteorder == "big":
+            session_players.byteswap()
+        self._append_bytes(os.path.join(self.root, SESSION_PLAYERS_FILE),
+                           known_sessions * session_players.itemsize,
+                           session_players.tobytes())
+
+    def _append_activity(self, batch, remap):
+        rows = self.manifest["activity_rows"]
+        pairs = sorted((remap[session], day) for session, day in batch.activity)
+        for i, field in enumerate(ACTIVITY_COLUMNS):
+            values = array(ACTIVITY_COLUMNS[field], (pair[i] for pair in pairs))
+            if sys.byteorder == "big":
+                values.byteswap()
+            self._append_bytes(self._activity_path(field), rows * values.itemsize,
+                               values.tobytes())
+        self.manifest["activity_rows"] = rows + len(pairs)
+
+    def _activity_path(self, field):
+        suffix = FILE_SUFFIXES[ACTIVITY_COLUMNS[field]]
+        return os.path.join(self.root, f"activity.{field}.{suffix}")
+
+    def save(self):
+        """Write the manifest atomically; call after the last append()."""
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def ingest(self, paths, jobs=1):
+        """Ingest cache files that are new or were appended to since.
+
+        Returns (ingested, skipped, changed): changed lists (path, reason)
+        for known caches rewritten other than by appending, whose new
+        contents are not read.
+        """
+        sources = self.manifest["sources"]
+        todo = []       # (path, source record to read on from, or None)
+        skipped = []
+        unmatched = []
+        for path in paths:
+            source = sources.get(os.path.abspath(path))
+            change = source_change(path, source) if source else "new"
+            if change is None:
+                skipped.append(path)
+            elif change == "appended":
+                todo.append((path, source))
+            else:
+                unmatched.append((path, change))
+
+        # A cache renamed by rotation keeps its inode; read on from its record
+        by_identity = {tuple(source["identity"]): key for key, source in sources.items()
+                       if source.get("identity") and not source.get("array")}
+        matched = {os.path.abspath(path) for path, _ in todo}
+        moved = set()
+        rest = []
+        for path, change in unmatched:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            key = st and by_identity.get((st.st_dev, st.st_ino))
+            if (key and key not in matched and key not in moved
+                    and source_change(path, sources[key]) in (None, "appended")):
+                moved.add(key)
+                todo.append((path, sources[key]))
+            else:
+                rest.append((path, change))
+        changed = []
+        for path, change in rest:
+            if change == "new" or os.path.abspath(path) in moved:
+                todo.append((path, None))   # Its record moved with the renamed file
+            else:
+                changed.append((path, change))
+        for key in moved:
+            del sources[key]
+        for path, change in changed:
+            if os.path.abspath(path) in sources:
+                sources[os.path.abspath(path)]["error"] = (
+                    f"{change} since it was ingested; ingest the caches into a new "
+                    f"store to read it again")
+
+        if jobs <= 1 or len(todo) < 2:
+            if todo:
+                self.append(ingest_files(todo))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            workers = min(jobs, len(todo))
+            batch_count = min(len(todo), workers * 4)
+            batches = [todo[i::batch_count] for i in range(batch_count)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for batch in pool.map(ingest_files, batches):
+                    self.append(batch)
+        if todo or changed or not os.path.exists(os.path.join(self.root, MANIFEST_FILE)):
+            self.save()
+        return [path for path, _ in todo], skipped, changed
+
+    # ─── Reading ─────────────────────────────────────────────────────────
+
+    def session_ids(self):
+        """The session dictionary, in index order."""
+        path = os.path.join(self.root, SESSIONS_FILE)
+        if not self.manifest["sessions"]:
+            return []
+        with open(path, "rb") as f:
+            data = f.read(self.manifest["sessions_bytes"])
+        return data.decode("utf-8").splitlines()
+
+    def player_ids(self):
+        """The player dictionary, in index order."""
+        if not self.manifest["players"]:
+            return []
+        with open(os.path.join(self.root, PLAYERS_FILE), "rb") as f:
+            data = f.read(self.manifest["players_bytes"])
+        return data.decode("utf-8").splitlines()
+
+    def session_players(self):
+        """Player index of every session."""
+        return self._map_file(os.path.join(self.root, SESSION_PLAYERS_FILE),
+                              SESSION_TYPECODE, self.manifest["sessions"])
+
+    def rows(self, key, kind):
+        partition = self.manifest["partitions"].get(key)
+        return partition["rows"].get(kind, 0) if partition else 0
+
+    def column(self, key, kind, field):
+        """Memory-mapped column: a NumPy array, or a memoryview without NumPy."""
+        return self._map_file(self._column_path(key, kind, field),
+                              COLUMNS[kind][field], self.rows(key, kind))
+
+    def _map_file(self, path, typecode, rows):
+        if not rows:
+            return np.empty(0, NUMPY_DTYPES[typecode]) if np is not None else array(typecode)
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if np is not None:
+            return np.frombuffer(mapped, dtype=NUMPY_DTYPES[typecode], count=rows)
+        view = memoryview(mapped)[:rows * array(typecode).itemsize].cast(typecode)
+        if sys.byteorder == "big":
+            values = array(typecode, view)
+            values.byteswap()
+            return values
+        return view
+
+    def level_keys(self):
+        return list(self.manifest["partitions"])
+
+    def to_aggregate(self):
+        """Build the advisor's AnalyticsAggregate straight from the columns."""
+        aggregate = AnalyticsAggregate()
+        aggregate.events = self.manifest["events"]
+        aggregate.files = len(self.manifest["sources"])
+        aggregate.sessions = Interner(self.session_ids())
+        session_players = self.session_players()
+        aggregate.players = Interner(self.player_ids())
+        aggregate.anonymous_sessions = self.manifest["anonymous_sessions"]
+        aggregate.session_players = array(SESSION_TYPECODE, session_players)
+        aggregate.errors = [(path, source["error"])
+                            for path, source in self.manifest["sources"].items()
+                            if source.get("error")]
+
+        for key in self.level_keys():
+            stats = aggregate.level(key)
+            stats.starts = self.rows(key, "start")
+            stats.completes = self.rows(key, "complete")
+            stats.death_events = self.rows(key, "death")
+            stats.deaths.add_many(_present(self.column(key, "complete", "deaths")))
+            stats.times.add_many(_present(self.column(key, "complete", "time")))
+            stats.started = Bitmap(self.column(key, "start", "session"))
+            stats.completed = Bitmap(self.column(key, "complete", "session"))
+
+            xs = self.column(key, "death", "x")
+            ys = self.column(key, "death", "y")
+            if np is not None:
+                keep = ~(np.isnan(xs) | np.isnan(ys))
+                stats.death_positions.frombytes(
+                    np.column_stack((xs[keep], ys[keep])).tobytes())
+            else:
+                for x, y in zip(xs, ys):
+                    if not (math.isnan(x) or math.isnan(y)):
+                        stats.death_positions.extend((x, y))
+
+        rows = self.manifest["activity_rows"]
+        columns = [self._map_file(self._activity_path(field), typecode, rows)
+                   for field, typecode in ACTIVITY_COLUMNS.items()]
+        _add_active_days(aggregate, *columns, session_players)
+        return aggregate
+
+
+def _add_active_days(aggregate, sessions, days, session_players):
+    """Mark the player of each row's session active on the row's day."""
+    if np is not None:
+        if not len(days):
+            return
+        days = np.asarray(days, dtype=np.int64)
+        players = np.asarray(session_players)[np.asarray(sessions)].astype(np.int64)
+        order = np.argsort(days, kind="stable")
+        days, players = days[order], players[order]
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for day, day_players in zip(days[np.r_[0, bounds]].tolist(), np.split(players, bounds)):
+            aggregate.active(day).update(day_players)
+        return
+    for session, day in zip(sessions, days):
+        aggregate.active(day).add(session_players[session])
+
+
+def _present(values):
+    """Drop NaN (missing) entries from a float column."""
+    if np is not None:
+        return values[~np.isnan(values)]
+    return [v for v in values if not math.isnan(v)]
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ingest analytics caches into a columnar store.")
+    parser.add_argument("store", help="store directory (created if missing)")
+    parser.add_argument("caches", nargs="+", metavar="CACHE",
+                        help="cache files, directories or glob patterns")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="parse cache files in N worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    jobs = args.jobs or os.cpu_count() or 1
+
+    paths, missing = collect_cache_paths(args.caches)
+    for item in missing:
+        print(f"⚠️  No analytics cache matches: {item}")
+
+    store = AnalyticsStore(args.store)
+    ingested, skipped, changed = store.ingest(paths, jobs)
+    for path in ingested:
+        error = store.manifest["sources"][os.path.abspath(path)]["error"]
+        if error:
+            print(f"⚠️  Could not parse analytics cache {path}: {error}")
+    for path, change in changed:
+        print(f"⚠️  {path} {change} since it was ingested; not re-read")
+    print(f"Ingested {len(ingested)} new or appended file(s), skipped {len(skipped)} "
+          f"unchanged in {args.store} ({store.manifest['events']} events total)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
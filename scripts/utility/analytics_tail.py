@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Analytics Tail — Incremental Ingestion of Growing Analytics Caches
+
+AnalyticsManager appends NDJSON to its cache on every flush. A Tailer keeps
+a byte offset per cache file next to an AnalyticsAggregate of everything
+read so far, and poll() folds in only the complete lines appended since the
+last poll; a line still being written waits for its newline. A malformed
+line is recorded as an error and skipped, so one bad flush doesn't stall
+the file.
+
+A one-shot run polls with finished=True: the files are taken as done, so a
+last line without a newline is read too when it parses as JSON, the same
+event a plain read counts. Following never does that, since the line may
+still be growing; one that doesn't parse yet waits for the next poll.
+
+With a checkpoint path the offsets and the aggregate are saved after every
+poll that read something, so a restarted advisor continues where it stopped
+instead of re-reading every cache from the start.
+
+An aggregate can't take events back out. When a file can't simply have
+been appended to — it shrank, was replaced (opt-out, upload, rotation),
+its first bytes or the bytes just before the offset changed, it
+disappeared, or it is a JSON array (older builds) that changed — poll()
+rebuilds the aggregate from every file and says why, so the result always
+matches reading the current files in one pass.
+
+Checkpoints are pickles, like the aggregates pool workers send back; only
+load checkpoints this tool wrote.
+"""
+
+import json
+import os
+import pickle
+
+from analytics_aggregate import AnalyticsAggregate
+from analytics_event_stream import iter_events
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+CHECKPOINT_VERSION = 2
+EDGE_BYTES = 256        # Bytes at the start and before the offset compared to
+                        # spot a file that was rewritten rather than appended to
+READ_SIZE = 1 << 20     # Bytes read per chunk while tailing
+
+
+# ─── Tailing ─────────────────────────────────────────────────────────────────
+
+class TailedFile:
+    """How far one cache file has been read."""
+
+    __slots__ = ("identity", "offset", "head", "tail", "array", "stamp")
+
+    def __init__(self):
+        self.identity = None    # (st_dev, st_ino)
+        self.offset = 0         # Bytes consumed (complete lines only)
+        self.head = b""         # First EDGE_BYTES bytes read
+        self.tail = b""         # Last EDGE_BYTES bytes read (ending at offset)
+        self.array = False      # JSON array: read whole, never tailed
+        self.stamp = None       # (size, mtime) of an array file when read
+
+
+def _read_head(f):
+    f.seek(0)
+    return f.read(EDGE_BYTES)
+
+
+def _read_tail(f, offset):
+    start = max(0, offset - EDGE_BYTES)
+    f.seek(start)
+    return f.read(offset - start)
+
+
+def _is_array(head):
+    return head.lstrip()[:1] == b"["
+
+
+class Tailer:
+    """Per-file read offsets plus the aggregate of everything read so far."""
+
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+        self.files = {}     # Absolute path -> TailedFile
+        self.aggregate = AnalyticsAggregate()
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+
+    # ─── Checkpoints ─────────────────────────────────────────────────────
+
+    def _load(self):
+        with open(self.checkpoint, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported tail checkpoint version in {self.checkpoint}")
+        self.files = state["files"]
+        self.aggregate = state["aggregate"]
+
+    def save(self):
+        """Write the checkpoint atomically (no-op without a checkpoint path)."""
+        if not self.checkpoint:
+            return
+        directory = os.path.dirname(self.checkpoint)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": CHECKPOINT_VERSION, "files": self.files,
+                         "aggregate": self.aggregate}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint)
+
+    # ─── Polling ─────────────────────────────────────────────────────────
+
+    def _replaced(self, path, tailed):
+        """Why a known file can no longer be read on from its offset, or None."""
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                head = _read_head(f)
+                tail = _read_tail(f, tailed.offset)
+        except OSError:
+            return f"{path} disappeared"
+        if (st.st_dev, st.st_ino) != tailed.identity:
+            return f"{path} was replaced"
+        if tailed.array:
+            if (st.st_size, st.st_mtime) != tailed.stamp:
+                return f"{path} is a JSON array and changed"
+            return None
+        if st.st_size < tailed.offset:
+            return f"{path} shrank"
+        if head[:len(tailed.head)] != tailed.head[:len(head)] or tail != tailed.tail:
+            return f"{path} was rewritten"
+        return None
+
+    def poll(self, paths, finished=False):
+        """Fold in whatever was appended to paths since the last poll.
+
+        finished=True also reads a last line that has no newline yet, if
+        it parses (see the module docstring). Returns {"events": events read, "files": paths that had new events,
+        "rebuilt": why everything was re-read, or None}.
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        wanted = set(paths)
+        rebuilt = None
+        for path, tailed in self.files.items():
+            reason = self._replaced(path, tailed) if path in wanted else f"{path} was removed"
+            if reason:
+                rebuilt = reason
+                self.files = {}
+                self.aggregate = AnalyticsAggregate()
+                break
+
+        before = self.aggregate.events
+        changed = []
+        for path in paths:
+            tailed = self.files.get(path)
+            new = tailed is None
+            if new:
+                tailed = TailedFile()
+            try:
+                count = self._read(path, tailed, finished)
+            except OSError:
+                continue    # Deleted or mid-replace; the next poll sees it
+            if new:
+                self.files[path] = tailed
+                self.aggregate.files += 1
+            if count:
+                changed.append(path)
+        return {"events": self.aggregate.events - before, "files": changed,
+                "rebuilt": rebuilt}
+
+    def _read(self, path, tailed, finished=False):
+        """Read new complete events from one file; return how many."""
+        aggregate = self.aggregate
+        before = aggregate.events
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if tailed.identity is None:
+                tailed.identity = (st.st_dev, st.st_ino)
+                tailed.array = _is_array(_read_head(f))
+            if tailed.array:
+                if tailed.stamp is None:
+                    tailed.stamp = (st.st_size, st.st_mtime)
+                    try:
+                        for event in iter_events(path):
+                            aggregate.add_event(event)
+                    except ValueError as e:
+                        aggregate.errors.append((path, str(e)))
+                return aggregate.events - before
+
+            if st.st_size <= tailed.offset:
+                return 0
+            f.seek(tailed.offset)
+            pending = b""
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()   # No newline yet: maybe still being written
+                for line in lines:
+                    self._add_line(path, tailed.offset, line)
+                    tailed.offset += len(line) + 1
+            if finished and pending.strip():
+                try:
+                    event = json.loads(pending)
+                except ValueError:
+                    pass    # Maybe still being written; the next poll retries
+                else:
+                    aggregate.add_event(event)
+                    tailed.offset += len(pending)
+            if len(tailed.head) < EDGE_BYTES:
+                tailed.head = _read_head(f)[:tailed.offset]
+            tailed.tail = _read_tail(f, tailed.offset)
+        return aggregate.events - before
+
+    def _add_line(self, path, offset, line):
+        if not line.strip():
+            return
+        try:
+            event = json.loads(line)
+        except ValueError as e:
+            self.aggregate.errors.append((path, f"Byte {offset}: {e}"))
+            return
+        self.aggregate.add_event(event)
@@ -0,0 +1,848 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite — Performance Checks for the Python Tools
+
+Sections:
+  analyzer  level balance analyzer on the shipped levels and on seeded
+            synthetic levels of growing size (scaling regressions), plus
+            time and peak memory of each derived value and rule
+  advisor   analytics balance advisor on seeded synthetic play sessions:
+            time, peak memory and events/s for generation, aggregation,
+            store ingest, store read, the report, a 24-level funnel with
+            day-N retention and the physics-state summary, plus checks
+            that caches in AnalyticsManager.gd's event shape read the same
+            and that a store fed appended and rotated caches matches one
+            ingest
+  audio     NumPy vs per-sample placeholder audio synthesis, including a
+            byte-for-byte comparison of the deterministic wave types
+  quantiles accuracy of the analytics quantile sketch against exact
+            percentiles, and merged-vs-single-pass equality
+  simulator batch bot playthroughs of a shipped level at growing agent
+            counts, plus a same-seed determinism check (needs NumPy)
+  schema    compiled level-schema throughput on generated levels, and
+            seeded broken levels reporting the expected JSON paths
+  binary    binary level size and decode time against JSON parsing, with
+            a round-trip check of every shipped and synthetic level
+  difficulty feature extraction and batch scoring of generated levels, and
+            a fit against known synthetic difficulties (fitting needs NumPy)
+  diff      level_diff entity matching on generated levels with a share of
+            entities moved and shuffled, checking every move is found
+
+Usage:
+    python3 benchmark_suite.py
+    python3 benchmark_suite.py analyzer --sizes 1000 5000 10000 --seed 7
+    python3 benchmark_suite.py advisor --sessions 20000
+    python3 benchmark_suite.py audio
+    python3 benchmark_suite.py quantiles
+    python3 benchmark_suite.py simulator
+    python3 benchmark_suite.py schema
+    python3 benchmark_suite.py binary
+    python3 benchmark_suite.py difficulty
+    python3 benchmark_suite.py diff
+    python3 benchmark_suite.py --json before.json
+    python3 benchmark_suite.py --json after.json --compare before.json
+
+Synthetic levels and events come from synthetic_data.py; the same --seed
+always produces the same inputs, so --json files from different commits
+compare like for like. Peak memory is what tracemalloc sees allocated by
+Python during one run of a stage.
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import analytics_balance_advisor as advisor
+import generate_audio_assets as audio
+import level_balance_analyzer as analyzer
+import level_binary
+import level_diff
+import level_difficulty_model
+import level_rules
+import level_schema
+import level_simulator
+from analytics_event_stream import iter_events
+from analytics_store import AnalyticsStore
+from analytics_tail import Tailer
+from quantile_sketch import QuantileSketch
+from synthetic_data import generate_events, generate_level, write_events
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+DEFAULT_SIZES = [100, 1000, 2500, 5000, 10000]
+DEFAULT_SEED = 1234
+REPEATS = 3
+
+SECTIONS = ["analyzer", "advisor", "audio", "quantiles", "simulator", "schema", "binary",
+            "difficulty", "diff"]
+
+RESULTS_FORMAT = 1
+DEFAULT_TOLERANCE = 0.25    # --compare flags metrics this much worse than the baseline
+MIN_COMPARE_SECONDS = 0.001 # Timings below this are too noisy to compare
+
+DEFAULT_SESSIONS = 5000     # Synthetic play sessions for the advisor section
+
+# (name, frequency, duration, wave type): a short SFX and a 5 s music loop
+# per deterministic wave type, like generate_audio_assets.main()
+AUDIO_CASES = [
+    ("jump", 440.0, 0.1, "sine"),
+    ("death", 55.0, 0.4, "saw"),
+    ("level_complete", 500.0, 1.0, "square"),
+    ("menu_theme", 220.0, 5.0, "sine"),
+    ("level_theme_2", 280.0, 5.0, "square"),
+    ("boss_theme", 110.0, 5.0, "saw"),
+]
+
+SKETCH_SAMPLES = 100_000
+SKETCH_PARTS = 16   # Split for the merge check, like per-device partials
+SKETCH_QUANTILES = [0.0, 0.01, 0.1, 0.5, 0.9, 0.99, 0.999, 1.0]
+
+# Value distributions shaped like the advisor's inputs
+SKETCH_DISTRIBUTIONS = {
+    "deaths (geometric)": lambda rng: int(rng.expovariate(0.15)),
+    "deaths (mostly 0)": lambda rng: 0 if rng.random() < 0.6 else rng.randint(1, 200),
+    "time (lognormal)": lambda rng: rng.lognormvariate(4.0, 0.8),
+    "time (pareto tail)": lambda rng: 20 * rng.paretovariate(1.2),
+    "constant": lambda rng: 42.0,
+}
+
+SIM_LEVEL = "world_01_level_01.json"
+SIM_AGENTS = [100, 1000, 4000]
+
+SCHEMA_LEVELS = 10_000
+SCHEMA_ENTITIES = 40    # Shipped levels hold 10-40 entities
+SCHEMA_TARGET = 10_000  # Levels per second the generator pipeline needs
+
+# Broken copies of a generated level: (edit, JSON path the schema must report)
+SCHEMA_BREAKAGES = [
+    (lambda d: d.pop("level_id"), "$.level_id"),
+    (lambda d: d["platforms"][1].update(position=[10]), "$.platforms[1].position"),
+    (lambda d: d["physics_triggers"][0].update(state="Moon"), "$.physics_triggers[0].state"),
+    (lambda d: d["physics_triggers"][0].update(delay=-1), "$.physics_triggers[0].delay"),
+    (lambda d: d["exit"].pop("position"), "$.exit.position"),
+    (lambda d: d.update(platforms=[]), "$.platforms"),
+]
+
+BINARY_SIZES = [1000, 10000]     # Synthetic levels added to the shipped ones
+
+DIFFICULTY_LEVELS = 2000
+DIFFICULTY_ENTITIES = 40
+DIFFICULTY_MIN_R2 = 0.9     # Fit must explain known synthetic targets this well
+
+DIFF_SIZES = [1000, 10000, 20000]
+DIFF_MOVED = 0.1        # Share of platforms and hazards nudged between versions
+DIFF_NUDGE = 30         # Largest nudge per axis (px), well inside MATCH_RADIUS
+
+# ─── Timing ──────────────────────────────────────────────────────────────────
+
+def _best_of(fn, repeats=REPEATS):
+    """Best wall time of several runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _measure(fn, repeats=REPEATS):
+    """Best untraced wall time plus the peak traced allocation of one run."""
+    seconds = _best_of(fn, repeats)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def _write_level(tmp_dir, data):
+    path = os.path.join(tmp_dir, f"{data['level_id']}.json")
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def bench_shipped_levels():
+    """Time analyze_level over every shipped world_XX_level_YY.json."""
+    levels_dir = os.path.normpath(analyzer.LEVELS_DIR)
+    paths = [os.path.join(levels_dir, f) for f in sorted(os.listdir(levels_dir))
+             if f.startswith("world_") and f.endswith(".json")]
+    seconds = _best_of(lambda: [analyzer.analyze_level(p) for p in paths])
+    return {"levels": len(paths), "seconds": seconds}
+
+
+def bench_scaling(sizes, seed, tmp_dir):
+    """Time analyze_level on one synthetic level per requested size."""
+    rows = []
+    for size in sizes:
+        path = _write_level(tmp_dir, generate_level(size, seed))
+        seconds = _best_of(lambda: analyzer.analyze_level(path))
+        rows.append({"entities": size, "seconds": seconds})
+    return rows
+
+
+def bench_analyzer_stages(size, seed):
+    """Time and memory of each derived value and rule on one synthetic level."""
+    data = generate_level(size, seed)
+    text = json.dumps(data)
+    context = level_rules.LevelContext(analyzer.RULES, data)
+    stages = [("parse", lambda: json.loads(text))]
+    for name, derived in analyzer.RULES.derived.items():
+        kwargs = {need: context.get(need) for need in derived.needs}
+        stages.append((f"derive {name}", functools.partial(derived.fn, data, **kwargs)))
+    for rule in analyzer.RULES.rules.values():
+        kwargs = {need: context.get(need) for need in rule.needs}
+        stages.append((rule.name, functools.partial(rule.fn, data, **kwargs)))
+    stages.append(("difficulty", lambda: analyzer.calculate_difficulty_score(data)))
+    return [{"stage": name, **_measure(fn)} for name, fn in stages]
+
+
+def as_game_event(event):
+    """A synthetic event in AnalyticsManager.track()'s exact shape."""
+    event = dict(event)
+    event["properties"] = event.pop("data")
+    if event["event"] == "death":
+        event["event"] = "player_death"
+    return event
+
+
+def check_game_shape(path, tmp_dir):
+    """True if the cache at path reads the same rewritten in the game's shape,
+    through the aggregate, the tailer and the store."""
+    game_path = os.path.join(tmp_dir, "advisor_events_game.ndjson")
+    write_events(game_path, (as_game_event(e) for e in iter_events(path)))
+    expected = advisor.aggregate_caches([path])
+    tailer = Tailer()
+    tailer.poll([game_path], finished=True)
+    store = AnalyticsStore(tempfile.mkdtemp(dir=tmp_dir))
+    store.ingest([game_path])
+    store_expected = AnalyticsStore(tempfile.mkdtemp(dir=tmp_dir))
+    store_expected.ingest([path])
+    return (advisor.build_levels(advisor.aggregate_caches([game_path]))
+            == advisor.build_levels(tailer.aggregate) == advisor.build_levels(expected)
+            and advisor.build_physics(tailer.aggregate) == advisor.build_physics(expected)
+            and expected.physics.levels
+            and advisor.build_levels(store.to_aggregate())
+            == advisor.build_levels(store_expected.to_aggregate()))
+
+
+def check_store_appends(path, tmp_dir):
+    """True if a store fed the cache at path in three flushes, rotating it
+    before the last one, reads the same as one ingest of the whole file."""
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    thirds = [lines[:len(lines) // 3], lines[len(lines) // 3:2 * len(lines) // 3],
+              lines[2 * len(lines) // 3:]]
+    cache = os.path.join(tmp_dir, "advisor_cache.ndjson")
+    rotated = os.path.join(tmp_dir, "advisor_cache.1.ndjson")
+    store = AnalyticsStore(tempfile.mkdtemp(dir=tmp_dir))
+    with open(cache, "wb") as f:
+        f.writelines(thirds[0])
+    store.ingest([cache])
+    with open(cache, "ab") as f:
+        f.writelines(thirds[1])
+    store.ingest([cache])
+    os.replace(cache, rotated)
+    with open(cache, "wb") as f:
+        f.writelines(thirds[2])
+    ingested, _, changed = store.ingest([cache, rotated])
+    expected = AnalyticsStore(tempfile.mkdtemp(dir=tmp_dir))
+    expected.ingest([path])
+    return (len(ingested) == 2 and not changed
+            and store.manifest["events"] == expected.manifest["events"]
+            and advisor.build_levels(store.to_aggregate())
+            == advisor.build_levels(expected.to_aggregate()))
+
+
+def bench_advisor(sessions, seed, tmp_dir):
+    """Time and memory of each advisor stage on a synthetic event cache."""
+    path = os.path.join(tmp_dir, "advisor_events.ndjson")
+    count = 0
+
+    def generate():
+        nonlocal count
+        count = write_events(path, generate_events(sessions, seed))
+
+    def ingest():
+        store_dir = tempfile.mkdtemp(dir=tmp_dir)
+        AnalyticsStore(store_dir).ingest([path])
+        return store_dir
+
+    def report():
+        with contextlib.redirect_stdout(io.StringIO()):
+            advisor.report(stats)
+
+    def retention():
+        every_level = [(f"W{w}-L{n}", "start") for w in range(1, 4) for n in range(1, 9)]
+        advisor.build_retention(stats, every_level)
+
+    rows = [{"stage": "generate", **_measure(generate, repeats=1)}]
+    rows.append({"stage": "aggregate", **_measure(lambda: advisor.aggregate_caches([path]))})
+    rows.append({"stage": "store ingest", **_measure(ingest, repeats=1)})
+    store = AnalyticsStore(ingest())
+    rows.append({"stage": "store read", **_measure(store.to_aggregate)})
+    stats = advisor.aggregate_caches([path])
+    rows.append({"stage": "report", **_measure(report)})
+    rows.append({"stage": "funnel + retention", **_measure(retention)})
+    rows.append({"stage": "physics states", **_measure(lambda: advisor.build_physics(stats))})
+    return {"events": count, "bytes": os.path.getsize(path), "stages": rows,
+            "game_shape": check_game_shape(path, tmp_dir),
+            "store_appends": check_store_appends(path, tmp_dir)}
+
+
+def bench_audio(tmp_dir):
+    """Time both synthesis paths per asset and check their output matches."""
+    rows = []
+    for name, freq, duration, wave_type in AUDIO_CASES:
+        loop_path = os.path.join(tmp_dir, f"{name}_loop.wav")
+        fast_path = os.path.join(tmp_dir, f"{name}_numpy.wav")
+        with contextlib.redirect_stdout(io.StringIO()):
+            loop_s = _best_of(lambda: audio.generate_tone_loop(
+                loop_path, freq, duration, wave_type), repeats=1)
+            fast_s = _best_of(lambda: audio.generate_tone(
+                fast_path, freq, duration, wave_type))
+        with open(loop_path, "rb") as a, open(fast_path, "rb") as b:
+            identical = a.read() == b.read()
+        rows.append({"asset": name, "wave": wave_type, "loop_seconds": loop_s,
+                     "numpy_seconds": fast_s, "identical": identical})
+    return rows
+
+
+def _exact_quantile(sorted_values, q):
+    """Lower nearest rank, the definition QuantileSketch.quantile() follows."""
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+
+def bench_quantiles(seed):
+    """Compare sketch quantiles to exact ones; check split-and-merge equality."""
+    rows = []
+    for name, draw in SKETCH_DISTRIBUTIONS.items():
+        rng = random.Random(seed)
+        values = [draw(rng) for _ in range(SKETCH_SAMPLES)]
+
+        sketch = QuantileSketch()
+        start = time.perf_counter()
+        for v in values:
+            sketch.add(v)
+        add_s = time.perf_counter() - start
+
+        merged = QuantileSketch()
+        for i in range(SKETCH_PARTS):
+            part = QuantileSketch()
+            for v in values[i::SKETCH_PARTS]:
+                part.add(v)
+            merged.merge(part)
+
+        exact = sorted(values)
+        worst = 0.0
+        for q in SKETCH_QUANTILES:
+            truth = _exact_quantile(exact, q)
+            estimate = sketch.quantile(q)
+            error = abs(estimate - truth) / truth if truth else abs(estimate)
+            worst = max(worst, error)
+
+        rows.append({
+            "distribution": name,
+            "worst_error": worst,
+            "buckets": len(sketch.buckets),
+            "ns_per_add": add_s * 1e9 / SKETCH_SAMPLES,
+            "merge_equal": (merged.buckets == sketch.buckets
+                            and merged.quantiles(SKETCH_QUANTILES)
+                            == sketch.quantiles(SKETCH_QUANTILES)),
+        })
+    return rows
+
+
+def bench_simulator(seed):
+    """Time simulate_level at each SIM_AGENTS count; check same-seed reruns match."""
+    path = os.path.join(os.path.normpath(analyzer.LEVELS_DIR), SIM_LEVEL)
+    with open(path) as f:
+        data = json.load(f)
+    table = level_simulator.StateTable()
+    rows = []
+    for agents in SIM_AGENTS:
+        start = time.perf_counter()
+        result = level_simulator.simulate_level(data, agents, seed=seed, table=table)
+        rows.append({"agents": agents, "seconds": time.perf_counter() - start,
+                     "frames": result["frames"],
+                     "completion_rate": result["completion_rate"]})
+    first = level_simulator.simulate_level(data, SIM_AGENTS[0], seed=seed, table=table)
+    again = level_simulator.simulate_level(data, SIM_AGENTS[0], seed=seed, table=table)
+    return rows, first == again
+
+
+def bench_schema(seed):
+    """Time the compiled schema over generated levels; check seeded breakages."""
+    schema = level_schema.default_schema()
+    levels = [generate_level(SCHEMA_ENTITIES, seed + i) for i in range(SCHEMA_LEVELS)]
+    start = time.perf_counter()
+    invalid = sum(1 for data in levels if schema.validate(data))
+    seconds = time.perf_counter() - start
+
+    cases = []
+    for edit, path in SCHEMA_BREAKAGES:
+        data = json.loads(json.dumps(levels[0]))
+        edit(data)
+        paths = [e["path"] for e in schema.validate(data)]
+        cases.append({"path": path, "reported": paths})
+    return {"levels": len(levels), "seconds": seconds, "invalid": invalid,
+            "cases": cases}
+
+
+def bench_binary(sizes, seed):
+    """JSON vs binary size and parse time per level; checks every round trip."""
+    levels_dir = os.path.normpath(analyzer.LEVELS_DIR)
+    cases = []
+    for name in sorted(os.listdir(levels_dir)):
+        if name.startswith("world_") and name.endswith(".json"):
+            with open(os.path.join(levels_dir, name), "rb") as f:
+                cases.append(("shipped", f.read()))
+    for size in sizes:
+        cases.append((f"synthetic {size}",
+                      json.dumps(generate_level(size, seed), indent="\t").encode("utf-8")))
+
+    rows = {}
+    for group, raw in cases:
+        data = json.loads(raw)
+        encoded = level_binary.encode_level(data)
+        row = rows.setdefault(group, {"group": group, "levels": 0, "json_bytes": 0,
+                                      "binary_bytes": 0, "json_seconds": 0.0,
+                                      "binary_seconds": 0.0, "round_trip": True})
+        row["levels"] += 1
+        row["json_bytes"] += len(raw)
+        row["binary_bytes"] += len(encoded)
+        row["json_seconds"] += _best_of(lambda: json.loads(raw))
+        row["binary_seconds"] += _best_of(lambda: level_binary.decode_level(encoded))
+        row["round_trip"] = row["round_trip"] and level_binary.decode_level(encoded) == data
+    return list(rows.values())
+
+
+def bench_diff(sizes, seed):
+    """level_diff matching time per size; checks every nudged entity comes back moved."""
+    rows = []
+    for size in sizes:
+        old = generate_level(size, seed)
+        new = json.loads(json.dumps(old))
+        rng = random.Random(seed)
+        moved = 0
+        for kind in ("platforms", "hazards"):
+            for entity in new[kind]:
+                if rng.random() < DIFF_MOVED:
+                    x, y = entity["position"]
+                    entity["position"] = [x + rng.randint(1, DIFF_NUDGE),
+                                          y + rng.randint(-DIFF_NUDGE, DIFF_NUDGE)]
+                    moved += 1
+            rng.shuffle(new[kind])
+        changes = level_diff.diff_entities(old, new)
+        found = sum(len(change["moved"]) for change in changes.values())
+        leftovers = sum(len(change["added"]) + len(change["removed"])
+                        for change in changes.values())
+        rows.append({"entities": size, "moved": moved, "found": found,
+                     "exact": found == moved and not leftovers,
+                     "seconds": _best_of(lambda: level_diff.diff_entities(old, new))})
+    return rows
+
+
+def bench_difficulty(seed):
+    """Time feature extraction and scoring; fit a known linear target.
+
+    Synthetic targets are a fixed linear function of a few features plus
+    noise, so a working fit must recover most of their variance.
+    """
+    rng = random.Random(seed)
+    levels = [generate_level(rng.randint(10, DIFFICULTY_ENTITIES), seed + i)
+              for i in range(DIFFICULTY_LEVELS)]
+
+    start = time.perf_counter()
+    matrix = level_difficulty_model.feature_matrix(levels)
+    extract_seconds = time.perf_counter() - start
+
+    column = {name: i for i, name in enumerate(level_difficulty_model.FEATURES)}
+    targets = []
+    for row in (matrix.tolist() if hasattr(matrix, "tolist") else matrix):
+        failure = (0.1 + 0.02 * row[column["hazards"]] + 0.0005 * row[column["gap_max"]]
+                   - 0.03 * row[column["checkpoints"]] + rng.gauss(0, 0.01))
+        deaths = (0.2 + 0.03 * row[column["hazards"]] + 0.002 * row[column["rise_max"]]
+                  + rng.gauss(0, 0.01))
+        targets.append((failure, deaths))
+
+    result = {"levels": len(levels), "extract_seconds": extract_seconds}
+    if level_difficulty_model.load_numpy() is None:
+        return result
+
+    model = level_difficulty_model.fit_model(matrix, targets)
+    start = time.perf_counter()
+    batch = model.score_matrix(matrix)
+    result["batch_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    single = [model.score(data) for data in levels]
+    result["single_seconds"] = time.perf_counter() - start
+    result["same_scores"] = batch.tolist() == single
+    result["r2"] = model.info["r2"]
+    return result
+
+
+# ─── Reports ─────────────────────────────────────────────────────────────────
+
+def report_analyzer(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Level Balance Analyzer")
+    print("=" * 60)
+
+    shipped = bench_shipped_levels()
+    print(f"\n  Shipped levels: {shipped['levels']} files in "
+          f"{shipped['seconds'] * 1000:.1f} ms")
+
+    rows = bench_scaling(args.sizes, args.seed, tmp_dir)
+
+    print(f"\n  {'Entities':>9} {'Time (ms)':>11} {'µs/entity':>10} {'Scale':>7}")
+    print("  " + "-" * 40)
+    base = None
+    for row in rows:
+        per_entity = row["seconds"] * 1e6 / row["entities"]
+        base = base or per_entity
+        print(f"  {row['entities']:>9} {row['seconds'] * 1000:>11.2f} "
+              f"{per_entity:>10.2f} {per_entity / base:>6.2f}x")
+
+    # Near-linear scaling keeps µs/entity roughly flat as levels grow.
+    stages = bench_analyzer_stages(max(args.sizes), args.seed)
+    print(f"\n  Stages on the {max(args.sizes)}-entity level:\n")
+    print(f"  {'Stage':<24} {'Time (ms)':>11} {'Peak (KB)':>10}")
+    print("  " + "-" * 47)
+    for row in stages:
+        print(f"  {row['stage']:<24} {row['seconds'] * 1000:>11.2f} "
+              f"{row['peak_bytes'] / 1024:>10.1f}")
+    print()
+
+    metrics = {"shipped.seconds": shipped["seconds"]}
+    metrics.update({f"scaling.{row['entities']}.seconds": row["seconds"] for row in rows})
+    for row in stages:
+        metrics[f"stage.{row['stage']}.seconds"] = row["seconds"]
+        metrics[f"stage.{row['stage']}.peak_bytes"] = row["peak_bytes"]
+    return 0, metrics
+
+
+def report_advisor(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Analytics Balance Advisor")
+    print("=" * 60)
+
+    result = bench_advisor(args.sessions, args.seed, tmp_dir)
+    events = result["events"]
+    print(f"\n  {args.sessions} synthetic sessions: {events} events, "
+          f"{result['bytes'] / 1e6:.1f} MB NDJSON\n")
+    print(f"  {'Stage':<20} {'Time (ms)':>11} {'Peak (MB)':>10} {'Events/s':>11}")
+    print("  " + "-" * 55)
+    metrics = {"events": events}
+    for row in result["stages"]:
+        rate = events / row["seconds"] if row["seconds"] else 0.0
+        print(f"  {row['stage']:<20} {row['seconds'] * 1000:>11.1f} "
+              f"{row['peak_bytes'] / 1e6:>10.2f} {rate:>11.0f}")
+        metrics[f"stage.{row['stage']}.seconds"] = row["seconds"]
+        metrics[f"stage.{row['stage']}.peak_bytes"] = row["peak_bytes"]
+    print()
+    same = result["game_shape"]
+    print(f"  AnalyticsManager event shape: {'same report' if same else 'DIFFERENT ❌'}")
+    appended = result["store_appends"]
+    print(f"  Store fed by appends and a rotation: "
+          f"{'same report' if appended else 'DIFFERENT ❌'}")
+    print()
+    return (0 if same and appended else 1), metrics
+
+
+def report_audio(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Placeholder Audio Synthesis")
+    print("=" * 60)
+
+    if audio.np is None:
+        print("\n  NumPy not installed; only the per-sample loop is available.\n")
+        return 0, {}
+
+    rows = bench_audio(tmp_dir)
+    print(f"\n  {'Asset':<16} {'Wave':<7} {'Loop (ms)':>10} {'NumPy (ms)':>11} "
+          f"{'Speedup':>8} {'Bytes':>6}")
+    print("  " + "-" * 62)
+    for row in rows:
+        speedup = row["loop_seconds"] / max(row["numpy_seconds"], 1e-9)
+        print(f"  {row['asset']:<16} {row['wave']:<7} {row['loop_seconds'] * 1000:>10.1f} "
+              f"{row['numpy_seconds'] * 1000:>11.2f} {speedup:>7.0f}x "
+              f"{'same' if row['identical'] else 'DIFF':>6}")
+    print()
+    metrics = {}
+    for row in rows:
+        metrics[f"{row['asset']}.loop_seconds"] = row["loop_seconds"]
+        metrics[f"{row['asset']}.numpy_seconds"] = row["numpy_seconds"]
+    return (0 if all(row["identical"] for row in rows) else 1), metrics
+
+
+def report_quantiles(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Quantile Sketch Accuracy")
+    print("=" * 60)
+
+    limit = QuantileSketch().relative_accuracy
+    rows = bench_quantiles(args.seed)
+    print(f"\n  {SKETCH_SAMPLES} values each; quantiles {SKETCH_QUANTILES}")
+    print(f"  Allowed relative error: {limit:.1%}\n")
+    print(f"  {'Distribution':<20} {'Worst err':>10} {'Buckets':>8} {'ns/add':>7} {'Merge':>6}")
+    print("  " + "-" * 55)
+    ok = True
+    for row in rows:
+        passed = row["worst_error"] <= limit + 1e-12 and row["merge_equal"]
+        ok = ok and passed
+        print(f"  {row['distribution']:<20} {row['worst_error']:>9.3%} "
+              f"{row['buckets']:>8} {row['ns_per_add']:>7.0f} "
+              f"{'same' if row['merge_equal'] else 'DIFF':>6}{'' if passed else '  ❌'}")
+    print()
+    metrics = {}
+    for row in rows:
+        metrics[f"{row['distribution']}.worst_error"] = row["worst_error"]
+        metrics[f"{row['distribution']}.add_seconds"] = row["ns_per_add"] * 1e-9
+    return (0 if ok else 1), metrics
+
+
+def report_simulator(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Batch Level Simulator")
+    print("=" * 60)
+
+    if not level_simulator.AVAILABLE:
+        print("\n  Skipped: the simulator needs NumPy.\n")
+        return 0, {}
+
+    rows, deterministic = bench_simulator(args.seed)
+    print(f"\n  {SIM_LEVEL}, seed {args.seed}\n")
+    print(f"  {'Agents':>7} {'Time (ms)':>11} {'Frames':>7} {'ms/1k bots':>11} {'Cleared':>8}")
+    print("  " + "-" * 48)
+    for row in rows:
+        print(f"  {row['agents']:>7} {row['seconds'] * 1000:>11.1f} {row['frames']:>7} "
+              f"{row['seconds'] * 1e6 / row['agents']:>11.1f} "
+              f"{row['completion_rate']:>7.0%}")
+
+    # Vectorized stepping makes ms/1k bots fall as the batch grows.
+    print(f"\n  Same seed, same result: {'yes' if deterministic else 'NO  ❌'}")
+    print()
+    metrics = {f"agents.{row['agents']}.seconds": row["seconds"] for row in rows}
+    return (0 if deterministic else 1), metrics
+
+
+def report_schema(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Compiled Level Schema")
+    print("=" * 60)
+
+    result = bench_schema(args.seed)
+    rate = result["levels"] / max(result["seconds"], 1e-9)
+    print(f"\n  {result['levels']} generated levels, {SCHEMA_ENTITIES} entities each")
+    print(f"  {result['seconds'] * 1000:.1f} ms, {rate:,.0f} levels/s "
+          f"(target {SCHEMA_TARGET:,}/s){'' if rate >= SCHEMA_TARGET else '  ⚠️'}")
+    print(f"  Flagged as invalid: {result['invalid']}{'' if not result['invalid'] else '  ❌'}")
+
+    print(f"\n  {'Broken field':<32} {'Reported':>8}")
+    print("  " + "-" * 41)
+    ok = not result["invalid"]
+    for case in result["cases"]:
+        found = case["reported"] == [case["path"]]
+        ok = ok and found
+        print(f"  {case['path']:<32} {'yes' if found else 'NO  ❌':>8}")
+    print()
+    return (0 if ok else 1), {"validate.seconds": result["seconds"],
+                              "validate.levels_per_second": rate}
+
+
+def report_binary(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Binary Level Format")
+    print("=" * 60)
+
+    rows = bench_binary(BINARY_SIZES, args.seed)
+    print(f"\n  {'Levels':<16} {'JSON KB':>8} {'Bin KB':>7} {'Size':>5} "
+          f"{'JSON ms':>8} {'Bin ms':>7} {'Trip':>5}")
+    print("  " + "-" * 61)
+    for row in rows:
+        label = f"{row['group']} ×{row['levels']}" if row["levels"] > 1 else row["group"]
+        print(f"  {label:<16} {row['json_bytes'] / 1024:>8.1f} "
+              f"{row['binary_bytes'] / 1024:>7.1f} "
+              f"{row['binary_bytes'] / row['json_bytes']:>5.0%} "
+              f"{row['json_seconds'] * 1000:>8.2f} {row['binary_seconds'] * 1000:>7.2f} "
+              f"{'same' if row['round_trip'] else 'DIFF':>5}")
+    print()
+    metrics = {}
+    for row in rows:
+        metrics[f"{row['group']}.json_seconds"] = row["json_seconds"]
+        metrics[f"{row['group']}.binary_seconds"] = row["binary_seconds"]
+        metrics[f"{row['group']}.binary_bytes"] = row["binary_bytes"]
+    return (0 if all(row["round_trip"] for row in rows) else 1), metrics
+
+
+def report_difficulty(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Difficulty Model")
+    print("=" * 60)
+
+    result = bench_difficulty(args.seed)
+    n = result["levels"]
+    print(f"\n  {n} generated levels, {len(level_difficulty_model.FEATURES)} features")
+    print(f"  Feature extraction: {result['extract_seconds'] * 1000:>8.1f} ms "
+          f"({result['extract_seconds'] * 1e6 / n:.1f} µs/level)")
+    if "r2" not in result:
+        print("\n  NumPy not installed; fitting and batch scoring skipped.\n")
+        return 0, {"extract.seconds": result["extract_seconds"]}
+
+    print(f"  Batch scoring:      {result['batch_seconds'] * 1000:>8.2f} ms")
+    print(f"  Per-level scoring:  {result['single_seconds'] * 1000:>8.2f} ms "
+          f"(incl. extraction; {'same' if result['same_scores'] else 'DIFF  ❌'})")
+    ok = result["same_scores"]
+    for target, r2 in result["r2"].items():
+        passed = r2 >= DIFFICULTY_MIN_R2
+        ok = ok and passed
+        print(f"  Fit R² {target:<14} {r2:>6.3f}{'' if passed else '  ❌'}")
+    print()
+    metrics = {"extract.seconds": result["extract_seconds"],
+               "batch.seconds": result["batch_seconds"],
+               "single.seconds": result["single_seconds"]}
+    metrics.update({f"r2.{target}": r2 for target, r2 in result["r2"].items()})
+    return (0 if ok else 1), metrics
+
+
+def report_diff(args, tmp_dir):
+    print("=" * 60)
+    print("  BENCHMARK SUITE — Level Diff Matching")
+    print("=" * 60)
+
+    rows = bench_diff(DIFF_SIZES, args.seed)
+    print(f"\n  {'Entities':>9} {'Moved':>7} {'Found':>7} {'Time (ms)':>10} {'µs/entity':>10} "
+          f"{'Check':>6}")
+    print("  " + "-" * 54)
+    for row in rows:
+        print(f"  {row['entities']:>9} {row['moved']:>7} {row['found']:>7} "
+              f"{row['seconds'] * 1000:>10.1f} {row['seconds'] * 1e6 / row['entities']:>10.1f} "
+              f"{'ok' if row['exact'] else 'MISS':>6}")
+    print()
+    metrics = {f"{row['entities']}.seconds": row["seconds"] for row in rows}
+    return (0 if all(row["exact"] for row in rows) else 1), metrics
+
+
+# ─── Results ─────────────────────────────────────────────────────────────────
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def results_document(args, sections):
+    """Machine-readable results for --json, tagged with where they came from."""
+    np = level_simulator.np
+    return {
+        "format": RESULTS_FORMAT,
+        "commit": _git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "seed": args.seed,
+        "sections": sections,
+    }
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Timing and memory metrics more than `tolerance` worse than the baseline.
+
+    Returns (section, metric, baseline value, current value) tuples. Metrics
+    missing from either side and timings too short to measure are skipped.
+    """
+    regressions = []
+    for section, metrics in current["sections"].items():
+        before = baseline.get("sections", {}).get(section, {})
+        for name, value in metrics.items():
+            old = before.get(name)
+            if old is None or not name.endswith(("seconds", "peak_bytes")):
+                continue
+            if name.endswith("seconds") and max(old, value) < MIN_COMPARE_SECONDS:
+                continue
+            if value > old * (1 + tolerance):
+                regressions.append((section, name, old, value))
+    return regressions
+
+
+def report_comparison(current, baseline_path, tolerance):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_results(current, baseline, tolerance)
+    print("=" * 60)
+    print(f"  COMPARISON — against {baseline.get('commit') or baseline_path}")
+    print("=" * 60)
+    if not regressions:
+        print(f"\n  ✅ No metric regressed by more than {tolerance:.0%}\n")
+        return 0
+    print()
+    for section, name, old, value in regressions:
+        change = f" ({value / old - 1:+.0%})" if old else ""
+        print(f"  ❌ {section}.{name}: {old:.6g} → {value:.6g}{change}")
+    print()
+    return 1
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sections", nargs="*", metavar="section",
+                        help=f"sections to run: {', '.join(SECTIONS)} (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="synthetic level sizes (entity counts) to time")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS,
+                        help="synthetic play sessions for the advisor section")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write machine-readable results to PATH")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="flag regressions against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown/growth before --compare fails "
+                             f"(default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args(argv)
+    for section in args.sections:
+        if section not in SECTIONS:
+            parser.error(f"unknown section '{section}' (choose from {', '.join(SECTIONS)})")
+
+    reports = {"analyzer": report_analyzer, "advisor": report_advisor, "audio": report_audio,
+               "quantiles": report_quantiles, "simulator": report_simulator, "schema": report_schema,
+               "binary": report_binary, "difficulty": report_difficulty, "diff": report_diff}
+    status = 0
+    sections = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for section in args.sections or SECTIONS:
+            section_status, metrics = reports[section](args, tmp_dir)
+            status |= section_status
+            sections[section] = metrics
+
+    results = results_document(args, sections)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.json}")
+    if args.compare:
+        status |= report_comparison(results, args.compare, args.tolerance)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
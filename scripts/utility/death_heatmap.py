@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Death Heatmap — Kill Zones from Player Death Positions
+
+Bins death positions into a 2D histogram over a level's bounds (taken from
+levels/json/world_XX_level_YY.json), finds the densest clusters, and ties
+each one to the nearest hazard, physics trigger or platform through the
+shared LevelIndex. Deaths below the lowest platform are reported as falls,
+unless a hazard or trigger down there is close enough to blame.
+
+Binning is one NumPy bincount over all points when NumPy is installed, so
+millions of deaths cost milliseconds; without NumPy it falls back to a
+plain loop. Kill-zone detection only looks at occupied bins.
+
+Geometry uses the game's convention: positions are entity centres
+(see LevelLoader.gd).
+"""
+
+import json
+import math
+import os
+import re
+
+from level_spatial_index import CENTER, ENTITY_KINDS, LevelIndex, entity_rect
+
+try:
+    import numpy as np
+except ImportError:  # Per-point binning fallback
+    np = None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "..", "..", "levels", "json")
+
+BIN_SIZE = 64           # World units per heatmap cell (two player widths)
+MARGIN = 128            # Padding around the level geometry
+ZONE_RADIUS = 1         # Kill zone = peak cell plus this many cells around it
+MAX_KILL_ZONES = 5
+MIN_ZONE_SHARE = 0.05   # Ignore zones with under 5% of the level's deaths
+BLAME_REACH = BIN_SIZE  # Below the floor, a hazard/trigger this close beats "fall"
+
+# Attribution candidates, in tie-break order
+ATTRIBUTION_KINDS = ("hazards", "physics_triggers", "platforms")
+BELOW_FLOOR_KINDS = ("hazards", "physics_triggers")    # Pits can hold these
+
+HEAT_RAMP = " .:-=+*#%@"
+
+_LEVEL_KEY_RE = re.compile(r"^W(\d+)-L(\d+)$")
+
+
+# ─── Level Geometry ──────────────────────────────────────────────────────────
+
+def level_path_for(key, levels_dir=LEVELS_DIR):
+    """levels/json path for an advisor key like "W1-L2", or None."""
+    match = _LEVEL_KEY_RE.match(key)
+    if not match:
+        return None
+    world, level = (int(g) for g in match.groups())
+    return os.path.normpath(os.path.join(
+        levels_dir, f"world_{world:02d}_level_{level:02d}.json"))
+
+
+def load_level(key, levels_dir=LEVELS_DIR):
+    """Parsed level JSON for a level key, or None if it is missing/invalid."""
+    path = level_path_for(key, levels_dir)
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def level_bounds(data, index):
+    """(x0, y0, x1, y1) covering every entity, the spawn and the exit."""
+    rects = [index.rect(kind, i) for kind in ENTITY_KINDS
+             for i in range(index.count(kind))]
+    rects = [r for r in rects if r is not None]
+    exit_rect = entity_rect(data.get("exit"), CENTER, kind="exit")
+    if exit_rect:
+        rects.append(exit_rect)
+    spawn = data.get("player_spawn")
+    if isinstance(spawn, (list, tuple)) and len(spawn) == 2:
+        rects.append((spawn[0], spawn[1], spawn[0], spawn[1]))
+    if not rects:
+        return (0.0, 0.0, float(BIN_SIZE), float(BIN_SIZE))
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+# ─── Heatmap ─────────────────────────────────────────────────────────────────
+
+class DeathHeatmap:
+    """Histogram of death positions over one level."""
+
+    def __init__(self, data, bin_size=BIN_SIZE, margin=MARGIN):
+        self.data = data
+        self.index = LevelIndex(data, anchor=CENTER)
+        self.bin_size = bin_size
+        x0, y0, x1, y1 = level_bounds(data, self.index)
+        self.x0, self.y0 = x0 - margin, y0 - margin
+        self.nx = max(1, math.ceil((x1 + margin - self.x0) / bin_size))
+        self.ny = max(1, math.ceil((y1 + margin - self.y0) / bin_size))
+        self.counts = {}        # (ix, iy) -> deaths, occupied cells only
+        self.total = 0
+        self.outside = 0        # Deaths clamped in from beyond the bounds
+
+        platform_rects = [self.index.rect("platforms", i)
+                          for i in range(self.index.count("platforms"))]
+        self.floor_y = max((r[3] for r in platform_rects if r), default=y1)
+
+    def add_positions(self, positions):
+        """Add deaths from a flat [x0, y0, x1, y1, ...] sequence (e.g. array('d'))."""
+        if np is not None:
+            if hasattr(positions, "typecode") and len(positions):
+                points = np.frombuffer(positions, dtype=np.float64)  # No copy
+            else:
+                points = np.asarray(positions, dtype=np.float64)
+            points = points.reshape(-1, 2)
+            self.add_points(points[:, 0], points[:, 1])
+        else:
+            self.add_points(positions[0::2], positions[1::2])
+
+    def add_points(self, xs, ys):
+        """Add deaths at parallel x and y coordinate sequences."""
+        if np is not None:
+            xs = np.asarray(xs, dtype=np.float64)
+            ys = np.asarray(ys, dtype=np.float64)
+            ix = np.floor((xs - self.x0) / self.bin_size).astype(np.int64)
+            iy = np.floor((ys - self.y0) / self.bin_size).astype(np.int64)
+            inside = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+            self.outside += int(xs.size - np.count_nonzero(inside))
+            np.clip(ix, 0, self.nx - 1, out=ix)
+            np.clip(iy, 0, self.ny - 1, out=iy)
+            cells = np.bincount(iy * self.nx + ix, minlength=self.nx * self.ny)
+            for flat in np.flatnonzero(cells).tolist():
+                cell = (flat % self.nx, flat // self.nx)
+                self.counts[cell] = self.counts.get(cell, 0) + int(cells[flat])
+            self.total += int(xs.size)
+            return
+
+        for x, y in zip(xs, ys):
+            ix = math.floor((x - self.x0) / self.bin_size)
+            iy = math.floor((y - self.y0) / self.bin_size)
+            if not (0 <= ix < self.nx and 0 <= iy < self.ny):
+                self.outside += 1
+                ix = min(max(ix, 0), self.nx - 1)
+                iy = min(max(iy, 0), self.ny - 1)
+            self.counts[(ix, iy)] = self.counts.get((ix, iy), 0) + 1
+            self.total += 1
+
+    def cell_center(self, ix, iy):
+        return (self.x0 + (ix + 0.5) * self.bin_size,
+                self.y0 + (iy + 0.5) * self.bin_size)
+
+    # ─── Kill Zones ──────────────────────────────────────────────────────
+
+    def _neighbourhood(self, ix, iy):
+        r = ZONE_RADIUS
+        for dy in range(-r, r + 1):
+            for dx in range(-r, r + 1):
+                count = self.counts.get((ix + dx, iy + dy))
+                if count:
+                    yield ix + dx, iy + dy, count
+
+    def _is_peak(self, ix, iy, count):
+        """Local maximum; plateaus keep only their first cell in scan order."""
+        for nx, ny, other in self._neighbourhood(ix, iy):
+            if (nx, ny) == (ix, iy):
+                continue
+            earlier = (ny, nx) < (iy, ix)
+            if other > count or (other == count and earlier):
+                return False
+        return True
+
+    def kill_zones(self, limit=MAX_KILL_ZONES, min_share=MIN_ZONE_SHARE):
+        """Ranked clusters of deaths, each attributed to the nearest entity.
+
+        Zones are picked greedily: each time the peak whose neighbourhood
+        holds the most deaths no earlier zone claimed, so ranks follow the
+        deaths each zone reports. Returns dicts with rank, x/y (death-weighted centre), deaths, share,
+        cause ("hazards", "physics_triggers", "platforms" or "fall"), index
+        of the blamed entity, label and distance to it.
+        """
+        if not self.total:
+            return []
+
+        candidates = []
+        for (ix, iy), count in self.counts.items():
+            if self._is_peak(ix, iy, count):
+                cells = list(self._neighbourhood(ix, iy))
+                candidates.append((sum(c for _, _, c in cells), ix, iy, cells))
+
+        zones = []
+        claimed = set()
+        while candidates and len(zones) < limit:
+            remaining = []
+            for _, ix, iy, cells in candidates:
+                cells = [(cx, cy, c) for cx, cy, c in cells if (cx, cy) not in claimed]
+                deaths = sum(c for _, _, c in cells)
+                if deaths:
+                    remaining.append((deaths, ix, iy, cells))
+            if not remaining:
+                break
+            best = min(remaining, key=lambda c: (-c[0], c[2], c[1]))
+            deaths, ix, iy, cells = best
+            if deaths / self.total < min_share:
+                break   # The best left is too small, so is every other
+            candidates = [c for c in remaining if c is not best]
+            claimed.update((cx, cy) for cx, cy, _ in cells)
+
+            x = sum(self.cell_center(cx, cy)[0] * c for cx, cy, c in cells) / deaths
+            y = sum(self.cell_center(cx, cy)[1] * c for cx, cy, c in cells) / deaths
+            zone = {"rank": len(zones) + 1, "x": x, "y": y, "deaths": deaths,
+                    "share": deaths / self.total}
+            zone.update(self.attribute(x, y))
+            zones.append(zone)
+        return zones
+
+    def attribute(self, x, y):
+        """Blame the nearest hazard/trigger/platform, or a fall below the floor.
+
+        Below the floor only a hazard or trigger within BLAME_REACH is
+        blamed (spikes in a pit); anything further away is a fall.
+        """
+        if y > self.floor_y:
+            best_kind, best_i, best_d = self._nearest(BELOW_FLOOR_KINDS, x, y)
+            if best_d > BLAME_REACH:
+                i, d = self.index.nearest("platforms", x, self.floor_y)
+                label = f"fall near platform #{i}" if i is not None else "fall"
+                return {"cause": "fall", "index": i, "label": label, "distance": d}
+        else:
+            best_kind, best_i, best_d = self._nearest(ATTRIBUTION_KINDS, x, y)
+        if best_kind is None:
+            return {"cause": None, "index": None, "label": "open space",
+                    "distance": math.inf}
+
+        entity = self.index.entities(best_kind)[best_i]
+        if best_kind == "hazards":
+            label = f"{entity.get('type', 'hazard')} hazard #{best_i}"
+        elif best_kind == "physics_triggers":
+            label = f"{entity.get('state', '?')} trigger #{best_i}"
+        else:
+            label = f"{entity.get('type', 'normal')} platform #{best_i}"
+        return {"cause": best_kind, "index": best_i, "label": label,
+                "distance": best_d}
+
+    def _nearest(self, kinds, x, y):
+        """(kind, index, distance) of the nearest entity of kinds; ties go to
+        the earlier kind. (None, None, inf) when there are none."""
+        best_kind, best_i, best_d = None, None, math.inf
+        for kind in kinds:
+            i, d = self.index.nearest(kind, x, y)
+            if i is not None and d < best_d:
+                best_kind, best_i, best_d = kind, i, d
+        return best_kind, best_i, best_d
+
+    # ─── Rendering ───────────────────────────────────────────────────────
+
+    def render(self, max_width=60):
+        """ASCII heatmap, downsampled to at most max_width columns."""
+        step = max(1, math.ceil(self.nx / max_width))
+        width = math.ceil(self.nx / step)
+        height = math.ceil(self.ny / step)
+        grid = [[0] * width for _ in range(height)]
+        for (ix, iy), count in self.counts.items():
+            grid[iy // step][ix // step] += count
+        peak = max((max(row) for row in grid), default=0) or 1
+        top = len(HEAT_RAMP) - 1
+        return "\n".join(
+            "".join(HEAT_RAMP[math.ceil(c / peak * top)] for c in row)
+            for row in grid
+        )
+
+
+def build_heatmap(key, positions, levels_dir=LEVELS_DIR):
+    """DeathHeatmap for a level key filled with flat x, y positions, or None."""
+    data = load_level(key, levels_dir)
+    if data is None:
+        return None
+    heatmap = DeathHeatmap(data)
+    heatmap.add_positions(positions)
+    return heatmap
@@ -4,8 +4,46 @@ import os
 import random
 import struct
 
-def generate_tone(filepath, frequency, duration, wave_type='sine', volume=0.5):
-    sample_rate = 44100
+try:
+    import numpy as np
+except ImportError:  # Fall back to the per-sample loop
+    np = None
+
+SAMPLE_RATE = 44100
+
+
+def synthesize_samples(frequency, duration, wave_type='sine', volume=0.5):
+    """Build the whole tone as one int16 array (NumPy path).
+
+    Mirrors the per-sample loop operation for operation, so the deterministic
+    wave types produce byte-identical PCM.
+    """
+    n_frames = int(SAMPLE_RATE * duration)
+    i = np.arange(n_frames, dtype=np.float64)
+    t = i / SAMPLE_RATE
+
+    if wave_type == 'sine':
+        value = np.sin(2 * math.pi * frequency * t)
+    elif wave_type == 'square':
+        value = np.where(np.sin(2 * math.pi * frequency * t) > 0, 1.0, -1.0)
+    elif wave_type == 'saw':
+        value = 2.0 * (t * frequency - np.floor(t * frequency + 0.5))
+    elif wave_type == 'noise':
+        value = np.random.default_rng().uniform(-1, 1, n_frames)
+    else:
+        value = np.zeros(n_frames)
+
+    # Envelope (fade out)
+    envelope = 1.0 - (i / n_frames)
+    value = value * volume * envelope
+
+    # Convert to 16-bit PCM (int() truncates toward zero, as does astype)
+    return (value * 32767.0).astype('<i2')
+
+
+def generate_tone_loop(filepath, frequency, duration, wave_type='sine', volume=0.5):
+    """Reference implementation: one sample and one write per frame."""
+    sample_rate = SAMPLE_RATE
     n_frames = int(sample_rate * duration)
     
     try:
@@ -37,6 +75,21 @@ def generate_tone(filepath, frequency, duration, wave_type='sine', volume=0.5):
     except Exception as e:
         print(f"Error generating {filepath}: {e}")
 
+def generate_tone(filepath, frequency, duration, wave_type='sine', volume=0.5):
+    if np is None:
+        generate_tone_loop(filepath, frequency, duration, wave_type, volume)
+        return
+    
+    try:
+        samples = synthesize_samples(frequency, duration, wave_type, volume)
+        with wave.open(filepath, 'w') as wav_file:
+            wav_file.setparams((1, 2, SAMPLE_RATE, len(samples), 'NONE', 'not compressed'))
+            wav_file.writeframes(samples.tobytes())
+        
+        print(f"Generated: {filepath}")
+    except Exception as e:
+        print(f"Error generating {filepath}: {e}")
+
 def main():
     base_dir = "/Users/rajkrish0608/PROJECT DETAILS/Definitely Normal Physics/assets/audio"
     music_dir = os.path.join(base_dir, "music")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Level Analysis Cache — On-Disk Results Cache for the Level Balance Analyzer
+
+Stores one analyze_level result per level, keyed by the SHA-256 of the file's
+bytes plus the analyzer's rules fingerprint. Unchanged levels skip both JSON
+parsing and every check; editing a rule (or bumping RULES_VERSION) changes
+the fingerprint and invalidates everything at once.
+
+Entries are small JSON files, written atomically so parallel workers can share
+a cache directory. prune() keeps the directory under a size cap by evicting
+the least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "definitely-normal-physics", "level-analyzer",
+)
+
+MAX_ENTRIES = 4096              # Evict beyond this many cached results
+MAX_BYTES = 32 * 1024 * 1024    # ...or beyond this much disk
+
+
+# ─── Cache ───────────────────────────────────────────────────────────────────
+
+class AnalysisCache:
+    """Content-addressed store of analyzer results."""
+
+    def __init__(self, fingerprint, cache_dir=DEFAULT_CACHE_DIR,
+                 max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.fingerprint = fingerprint
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content):
+        """Cache key for a level file's raw bytes."""
+        digest = hashlib.sha256(self.fingerprint.encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Refresh the access time so prune() evicts cold entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store a result. Failures are silent: the cache is best-effort."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def prune(self):
+        """Evict least recently used entries until under both caps.
+
+        Returns the number of entries removed.
+        """
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        except OSError:
+            return 0
+
+        entries = []
+        total = 0
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()  # Oldest first
+        removed = 0
+        count = len(entries)
+        for _, size, path in entries:
+            if count - removed <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            total -= size
+        return removed
+
+    def clear(self):
+        """Remove every cached entry."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".json") or name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -2,96 +2,179 @@
 """
 Level Balance Analyzer — Automated Pre-Flight QA for Definitely Normal Physics
 Scans all 24 JSON levels and reports balance, structural, and reachability issues.
+With --simulate, bot playthroughs add completion rates and time-to-exit;
+with --par, the trace solver adds each level's fastest clear time.
+--rules and --skip pick which registered checks run (--list-rules);
+--profile ranks the checks by time spent; --trace also writes a trace file.
+--watch keeps running and re-analyzes each level the moment it is saved.
+Overlapping entities are found in one sweep (level_overlaps.py), which also
+prints how much of each level's path each physics state covers.
+--format json/ndjson prints results as data, issues carrying severity codes
+(see report_format.py); ndjson streams one record per level as it completes.
 """
 
+import argparse
+import functools
+import hashlib
 import json
 import os
 import sys
 import math
+import time
+from datetime import datetime
+
+import level_binary
+import level_difficulty_model
+import level_overlaps
+import level_profiler
+import level_reachability
+import level_rules
+import level_schema
+import level_spatial_index
+import physics_state_catalog
+import report_format
+from level_analysis_cache import AnalysisCache, DEFAULT_CACHE_DIR
+from level_reachability import solve_reachability
+from level_spatial_index import CENTER, LevelIndex
 
 # ─── Configuration ───────────────────────────────────────────────────────────
 
 LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
                           "..", "..", "levels", "json")
 
-# Physics constants matching PlayerController.gd
-MAX_JUMP_HEIGHT = 200   # Approximate max jump height in pixels
-MAX_JUMP_DISTANCE = 400 # Approximate max horizontal jump distance
-PLAYER_SIZE = 32        # Player collision height
-
-# Valid physics states (must match PhysicsManager registered states)
-VALID_PHYSICS_STATES = [
-    "Normal", "LowGravity", "HighGravity", "ReverseGravity",
-    "ZeroFriction", "SuperFriction", "BouncyPhysics",
-    "SlowMotion", "FastForward", "TeleportJump", "DoubleJump",
-    "InvertedControls", "DelayedInput", "RandomDirection",
-    "SizeChange", "Underwater", "WindForce", "PhaseThrough",
-    "MagnetPlatforms", "WallWalk"
-]
+# Bump when a rule changes meaning without its source changing (e.g. a
+# threshold moved into data). Cached results from other versions are ignored.
+RULES_VERSION = "1"
 
-# ─── Validation Functions ────────────────────────────────────────────────────
+# Modules whose source feeds the cache fingerprint
+RULE_MODULES = [__file__, level_spatial_index.__file__, level_reachability.__file__,
+                level_rules.__file__, physics_state_catalog.__file__, level_schema.__file__,
+                level_difficulty_model.__file__, level_overlaps.__file__,
+                report_format.__file__, level_binary.__file__,
+                level_schema.SCHEMA_PATH] + physics_state_catalog.source_files()
 
-def validate_structure(data, filename):
-    """Check required fields and data types."""
-    issues = []
-    
-    required = ["level_id", "player_spawn", "platforms", "exit"]
-    for field in required:
-        if field not in data:
-            issues.append(f"❌ CRITICAL: Missing required field '{field}'")
-    
-    if "player_spawn" in data:
-        spawn = data["player_spawn"]
-        if not isinstance(spawn, list) or len(spawn) != 2:
-            issues.append("❌ player_spawn must be [x, y]")
-    
-    if "exit" in data:
-        if "position" not in data["exit"]:
-            issues.append("❌ exit must have 'position' field")
+# Every check below registers here; --rules and --skip pick from it
+RULES = level_rules.RuleRegistry()
+
+# A hazard counts as buried once this share of it is inside a platform
+EMBED_SHARE = 0.5
+
+# Overlap issues reported per code before the rest are summed up in one
+OVERLAP_REPORT_LIMIT = 10
+
+# Run verdicts (summarize_results) that fail the run
+BLOCKING_RESULTS = ("critical", "errors")
+
+# --watch polls the level files this often (seconds)
+WATCH_INTERVAL = 0.05
+
+# Errors a half-edited level can raise from the checks; --watch reports
+# them and keeps going
+WATCH_ANALYSIS_ERRORS = (KeyError, IndexError, TypeError, AttributeError, ValueError,
+                         ZeroDivisionError)
+
+# Level keys each piece of derived data reads (see level_rules)
+ENTITY_KEYS = level_spatial_index.ENTITY_KINDS
+
+# ─── Derived Data ────────────────────────────────────────────────────────────
+
+@RULES.derive("index", keys=ENTITY_KEYS)
+def build_index(data):
+    """Spatial index over the entity rectangles the checks read (top-left)."""
+    return LevelIndex(data)
+
+
+@RULES.derive("center_index", keys=ENTITY_KEYS)
+def build_center_index(data):
+    """Spatial index with LevelLoader.gd's centred, in-game entity sizes."""
+    return LevelIndex(data, anchor=CENTER)
+
+
+def _has_route(data):
+    return bool(data.get("platforms")) and "player_spawn" in data and "exit" in data
+
+
+@RULES.derive("reachability", needs=("center_index",), entities="platforms",
+              keys=("platforms", "physics_triggers", "player_spawn", "exit"))
+def derive_reachability(data, center_index):
+    """Reachability search from spawn (None when spawn, exit or platforms are missing)."""
+    if not _has_route(data):
+        return None
+    return solve_reachability(data, center_index)
+
+
+@RULES.derive("safe_points", entities="checkpoints",
+              keys=("player_spawn", "checkpoints", "exit"))
+def derive_safe_points(data):
+    """x of spawn, every checkpoint and the exit, sorted."""
+    checkpoints = data.get("checkpoints", [])
+    spawn = data.get("player_spawn", [0, 0])
+    exit_pos = data.get("exit", {}).get("position", [0, 0])
     
-    if "platforms" in data:
-        if not isinstance(data["platforms"], list) or len(data["platforms"]) == 0:
-            issues.append("❌ Must have at least one platform")
+    safe_points = [spawn[0]]
+    for cp in checkpoints:
+        safe_points.append(cp["position"][0])
+    safe_points.append(exit_pos[0])
+    safe_points.sort()
+    return safe_points
+
+
+@RULES.derive("schema_errors")
+def derive_schema_errors(data):
+    """Schema errors (see level_schema); the other checks only run without any."""
+    return level_schema.validate_level(data)
+
+
+@RULES.derive("overlaps", needs=("center_index",),
+              keys=ENTITY_KEYS + ("player_spawn", "exit"))
+def derive_overlaps(data, center_index):
+    """Overlapping entity pairs (one sweep) and physics-state coverage of the path."""
+    return {"pairs": level_overlaps.find_overlaps(center_index),
+            "coverage": level_overlaps.path_coverage(data, center_index)}
+
+
+# ─── Validation Functions ────────────────────────────────────────────────────
+
+@RULES.rule("schema", needs=("schema_errors",))
+def validate_schema(data, schema_errors=None):
+    """Check the level against levels/schema/level_schema.json.
     
-    return issues
+    Reports every structural problem at once, each with its JSON path;
+    physics state names come from scripts/physics_states/*.gd.
+    """
+    return [report_format.issue("critical" if e["critical"] else "error", "schema",
+                                f"{e['path']}: {e['message']}", path=e["path"])
+            for e in (schema_errors if schema_errors is not None
+                      else level_schema.validate_level(data))]
 
 
-def analyze_platform_gaps(data):
-    """Check if any platform gaps are too wide to jump."""
-    issues = []
-    platforms = data.get("platforms", [])
+@RULES.rule("reachability", needs=("reachability",), entities="platforms")
+def analyze_reachability(data, reachability=None):
+    """Check the exit can be reached from spawn with the level's physics.
     
-    if len(platforms) < 2:
-        return issues
+    Jump arcs come from PlayerController.gd and each PhysicsState's
+    multipliers, switched by the level's physics_triggers.
+    """
+    issues = []
+    if not _has_route(data):
+        return issues  # validate_schema already reports these
     
-    # Sort platforms by x position
-    sorted_platforms = sorted(platforms, key=lambda p: p["position"][0])
-    
-    for i in range(len(sorted_platforms) - 1):
-        p1 = sorted_platforms[i]
-        p2 = sorted_platforms[i + 1]
-        
-        p1_right = p1["position"][0] + p1["size"][0]
-        p2_left = p2["position"][0]
-        
-        gap = p2_left - p1_right
-        height_diff = abs(p1["position"][1] - p2["position"][1])
-        
-        # Account for height difference (higher target = harder jump)
-        effective_gap = gap
-        if p2["position"][1] < p1["position"][1]:  # Jumping up
-            effective_gap += height_diff * 0.5
-        
-        if effective_gap > MAX_JUMP_DISTANCE:
-            issues.append(
-                f"⚠️  Large gap ({gap}px) between platforms at "
-                f"x={p1_right} and x={p2_left} (height diff: {height_diff}px)"
-            )
+    result = reachability or solve_reachability(data)
+    if not result["exit_reachable"]:
+        states = ", ".join(sorted(result["states_used"]))
+        issues.append(report_format.issue(
+            "critical", "exit-unreachable",
+            f"Exit not reachable from spawn "
+            f"({len(result['reached_platforms'])}/{len(data['platforms'])} platforms "
+            f"reachable; states: {states})",
+            reached_platforms=len(result["reached_platforms"]),
+        ))
     
     return issues
 
 
-def analyze_hazard_density(data):
+@RULES.rule("hazard-density", needs=("index",), entities="hazards")
+def analyze_hazard_density(data, index=None):
     """Check for excessive hazard clustering."""
     issues = []
     hazards = data.get("hazards", [])
@@ -99,112 +182,187 @@ def analyze_hazard_density(data):
     if len(hazards) < 3:
         return issues
     
+    index = index or LevelIndex(data)
+    
     # Check for clusters (3+ hazards within 200px)
-    for i, h1 in enumerate(hazards):
-        nearby = 0
-        for j, h2 in enumerate(hazards):
-            if i != j:
-                dist = abs(h1["position"][0] - h2["position"][0])
-                if dist < 200:
-                    nearby += 1
+    for h1 in hazards:
+        x = h1["position"][0]
+        nearby = index.count_x_range("hazards", x - 200, x + 200) - 1
         
         if nearby >= 4:
-            issues.append(
-                f"⚠️  Hazard cluster ({nearby+1} hazards) near x={h1['position'][0]}"
-            )
+            issues.append(report_format.issue(
+                "warning", "hazard-cluster",
+                f"Hazard cluster ({nearby+1} hazards) near x={h1['position'][0]}",
+                x=h1["position"][0], hazards=nearby + 1,
+            ))
             break  # Only report once per level
     
     return issues
 
 
-def analyze_checkpoint_spacing(data):
+@RULES.rule("checkpoint-spacing", needs=("safe_points",), entities="checkpoints")
+def analyze_checkpoint_spacing(data, safe_points=None):
     """Check for long stretches without checkpoints."""
     issues = []
-    checkpoints = data.get("checkpoints", [])
-    spawn = data.get("player_spawn", [0, 0])
-    exit_pos = data.get("exit", {}).get("position", [0, 0])
     
-    # Create list of safe points (spawn + checkpoints + exit)
-    safe_points = [spawn[0]]
-    for cp in checkpoints:
-        safe_points.append(cp["position"][0])
-    safe_points.append(exit_pos[0])
-    safe_points.sort()
+    # Safe points: spawn + checkpoints + exit, sorted by x
+    if safe_points is None:
+        safe_points = derive_safe_points(data)
     
     for i in range(len(safe_points) - 1):
         distance = safe_points[i + 1] - safe_points[i]
         if distance > 800:
-            issues.append(
-                f"⚠️  No checkpoint for {distance}px (x={safe_points[i]} → x={safe_points[i+1]})"
-            )
+            issues.append(report_format.issue(
+                "warning", "checkpoint-gap",
+                f"No checkpoint for {distance}px (x={safe_points[i]} → x={safe_points[i+1]})",
+                x=safe_points[i], distance=distance,
+            ))
     
     return issues
 
 
-def analyze_spawn_safety(data):
+@RULES.rule("spawn-safety", needs=("index",), entities="hazards")
+def analyze_spawn_safety(data, index=None):
     """Check if player spawns inside a hazard."""
     issues = []
     spawn = data.get("player_spawn", [0, 0])
     hazards = data.get("hazards", [])
+    if not hazards:
+        return issues
+    
+    index = index or LevelIndex(data)
     
-    for hazard in hazards:
-        hx, hy = hazard["position"]
+    for i in index.query_radius("hazards", spawn[0], spawn[1], 50):
+        hx, hy = hazards[i]["position"]
         dist = math.sqrt((spawn[0] - hx)**2 + (spawn[1] - hy)**2)
         if dist < 50:
-            issues.append(
-                f"❌ CRITICAL: Player spawns near hazard at ({hx}, {hy})!"
-            )
+            issues.append(report_format.issue(
+                "critical", "spawn-near-hazard",
+                f"Player spawns near hazard at ({hx}, {hy})!", x=hx, y=hy,
+            ))
     
     return issues
 
 
-def analyze_exit_reachability(data):
+@RULES.rule("exit-distance", needs=("index",), entities="platforms")
+def analyze_exit_reachability(data, index=None):
     """Check if exit has a platform nearby."""
     issues = []
     exit_pos = data.get("exit", {}).get("position", None)
     if not exit_pos:
         return issues
     
-    platforms = data.get("platforms", [])
+    index = index or LevelIndex(data)
     
-    min_dist = float("inf")
-    for p in platforms:
+    def edge_distance(p):
         px, py = p["position"]
-        pw = p["size"][0]
+        pw = p.get("size", [0, 0])[0]   # Same point platform as the index
         
         # Distance from exit to nearest platform edge
         dist_x = max(0, exit_pos[0] - (px + pw), px - exit_pos[0])
         dist_y = abs(exit_pos[1] - py)
-        dist = math.sqrt(dist_x**2 + dist_y**2)
-        min_dist = min(min_dist, dist)
+        return math.sqrt(dist_x**2 + dist_y**2)
+    
+    _, min_dist = index.nearest("platforms", exit_pos[0], exit_pos[1],
+                                metric=edge_distance)
     
     if min_dist > 300:
-        issues.append(
-            f"⚠️  Exit at ({exit_pos[0]}, {exit_pos[1]}) is {min_dist:.0f}px from nearest platform"
-        )
+        issues.append(report_format.issue(
+            "warning", "exit-far",
+            f"Exit at ({exit_pos[0]}, {exit_pos[1]}) is {min_dist:.0f}px from nearest platform",
+            distance=round(min_dist, 1),
+        ))
     
     return issues
 
 
-def analyze_physics_triggers(data):
-    """Validate physics trigger states."""
-    issues = []
-    triggers = data.get("physics_triggers", [])
+def _at(entity):
+    x, y = entity["position"]
+    return f"({x}, {y})"
+
+
+@RULES.rule("overlaps", needs=("center_index", "overlaps"))
+def analyze_overlaps(data, center_index=None, overlaps=None):
+    """Check for conflicting triggers, unsafe checkpoints and buried hazards.
+    
+    Triggers that overlap with different states, checkpoints inside hazards
+    or trigger volumes, and hazards mostly inside a platform. Uses
+    LevelLoader.gd's centred, in-game entity sizes; touching edges don't
+    count as overlapping.
+    """
+    index = center_index or LevelIndex(data, anchor=CENTER)
+    pairs = (overlaps or derive_overlaps(data, index))["pairs"]
+    triggers = index.entities("physics_triggers")
+    checkpoints = index.entities("checkpoints")
+    hazards = index.entities("hazards")
+    platforms = index.entities("platforms")
+    found = {}
+    
+    for i, j in pairs[("physics_triggers", "physics_triggers")]:
+        a, b = triggers[i], triggers[j]
+        if a.get("state") != b.get("state"):
+            found.setdefault("trigger-conflict", []).append(report_format.issue(
+                "warning", "trigger-conflict",
+                f"Triggers at {_at(a)} ({a.get('state')}) and {_at(b)} ({b.get('state')}) "
+                f"overlap: the state depends on which fires last",
+                triggers=[i, j]))
     
-    for trigger in triggers:
-        state = trigger.get("state", "")
-        if state not in VALID_PHYSICS_STATES:
-            issues.append(f"❌ Unknown physics state in trigger: '{state}'")
+    for i, j in pairs[("checkpoints", "hazards")]:
+        found.setdefault("checkpoint-in-hazard", []).append(report_format.issue(
+            "critical", "checkpoint-in-hazard",
+            f"Checkpoint at {_at(checkpoints[i])} overlaps the hazard at "
+            f"{_at(hazards[j])}: respawns land in it",
+            checkpoint=i, hazard=j))
+    
+    for i, j in pairs[("checkpoints", "physics_triggers")]:
+        found.setdefault("checkpoint-in-trigger", []).append(report_format.issue(
+            "warning", "checkpoint-in-trigger",
+            f"Checkpoint at {_at(checkpoints[i])} is inside the "
+            f"{triggers[j].get('state')} trigger at {_at(triggers[j])}",
+            checkpoint=i, trigger=j))
+    
+    for i, j in pairs[("hazards", "platforms")]:
+        rect = index.rect("hazards", i)
+        area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+        share = level_overlaps.overlap_area(rect, index.rect("platforms", j)) / area
+        if share >= EMBED_SHARE:
+            found.setdefault("hazard-embedded", []).append(report_format.issue(
+                "warning", "hazard-embedded",
+                f"Hazard at {_at(hazards[i])} is {share:.0%} buried in the platform "
+                f"at {_at(platforms[j])}",
+                hazard=i, platform=j, share=round(share, 2)))
+    
+    issues = []
+    for code, records in found.items():
+        issues.extend(records[:OVERLAP_REPORT_LIMIT])
+        extra = len(records) - OVERLAP_REPORT_LIMIT
+        if extra > 0:
+            issues.append(report_format.issue(
+                records[0]["severity"], code, f"...and {extra} more {code} overlaps",
+                count=extra))
     
     return issues
 
 
 def calculate_difficulty_score(data):
-    """Calculate a difficulty score for the level (0-100)."""
-    hazard_count = len(data.get("hazards", []))
-    trigger_count = len(data.get("physics_triggers", []))
-    checkpoint_count = len(data.get("checkpoints", []))
-    platform_count = len(data.get("platforms", []))
+    """Calculate a difficulty score for the level (0-100).
+    
+    Uses the model fitted to player analytics when its artifact exists
+    (see level_difficulty_model), otherwise the hand-weighted formula.
+    """
+    model = level_difficulty_model.load_model()
+    if model is not None:
+        return model.score(data)
+    return hand_difficulty_score(data)
+
+
+def hand_difficulty_score(data):
+    """Hand-weighted difficulty from entity counts (0-100)."""
+    counts = _entity_counts(data)
+    hazard_count = counts["hazards"]
+    trigger_count = counts["physics_triggers"]
+    checkpoint_count = counts["checkpoints"]
+    platform_count = counts["platforms"]
     
     # More hazards + triggers = harder; more checkpoints + platforms = easier
     difficulty = (hazard_count * 5 + trigger_count * 3) - (checkpoint_count * 8 + platform_count * 1)
@@ -213,39 +371,296 @@ def calculate_difficulty_score(data):
 
 # ─── Main Analysis ───────────────────────────────────────────────────────────
 
-def analyze_level(filepath):
-    """Run all analyses on a single level file."""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+@functools.lru_cache(maxsize=None)
+def rules_fingerprint():
+    """Hash of RULES_VERSION, the analyzer's own source code and the
+    difficulty model artifact."""
+    digest = hashlib.sha256(RULES_VERSION.encode("utf-8"))
+    for module_file in RULE_MODULES:
+        with open(module_file, "rb") as f:
+            digest.update(f.read())
+    digest.update(level_difficulty_model.model_fingerprint().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analysis_fingerprint(simulate=0, par=False, rules=None):
+    """Cache fingerprint for a run, covering the optional simulation and solver
+    and any --rules/--skip selection."""
+    if rules is not None and list(rules) == RULES.names():
+        rules = None
+    if not simulate and not par and rules is None:
+        return rules_fingerprint()
+    digest = hashlib.sha256(rules_fingerprint().encode("utf-8"))
+    if simulate or par:
+        import level_simulator, level_trace_solver  # NumPy; only for --simulate/--par
+        modules = [level_simulator.__file__] + ([level_trace_solver.__file__] if par else [])
+        for module_file in modules:
+            with open(module_file, "rb") as f:
+                digest.update(f.read())
+        digest.update(f"simulate={simulate} par={par}".encode("utf-8"))
+    if rules is not None:
+        digest.update(f"rules={','.join(rules)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analyze_simulation(data, agents):
+    """Bot playthroughs of the level; returns (issues, summary)."""
+    import level_simulator  # NumPy; only for --simulate
+    result = level_simulator.simulate_level(data, agents)
+    del result["exit_times"]    # Keep cached results small
+    issues = []
+    if not result["cleared"]:
+        issues.append(report_format.issue(
+            "warning", "sim-no-clear", f"Simulation: none of {agents} bots reached the exit",
+            rule="simulation"))
+    return issues, result
+
+
+def analyze_par(data):
+    """Fastest input trace through the level; returns (issues, summary)."""
+    import level_trace_solver  # NumPy; only for --par
+    result = level_trace_solver.solve_level(data)
+    issues = []
+    if result["status"] == level_trace_solver.NO_PATH:
+        issues.append(report_format.issue(
+            "warning", "par-no-path", "Solver: no input sequence reaches the exit",
+            rule="par"))
+    summary = {key: result[key] for key in ("status", "par_time", "frames", "expanded")}
+    summary["inputs"] = len(result["inputs"]) if result["inputs"] else 0
+    return issues, summary
+
+
+def analyze_level(filepath, cache=None, simulate=0, par=False, profile=False, rules=None):
+    """Run all analyses on a single level file.
     
+    With a cache, unchanged files are answered without parsing the JSON.
+    Binary levels (see level_binary) are memory-mapped and decoded in place.
+    simulate > 0 adds that many bot playthroughs (see level_simulator), and
+    par the solver's fastest clear time (see level_trace_solver). profile
+    adds the timed spans of every step under "profile" (see level_profiler).
+    rules names the registered rules to run (default: all of RULES).
+    """
     filename = os.path.basename(filepath)
-    all_issues = []
+    profiler = level_profiler.Profiler() if profile else level_profiler.NULL_PROFILER
+    with profiler.span(level_profiler.LEVEL_SPAN, filename):
+        if level_binary.is_binary_level(filepath):
+            with level_binary.map_file(filepath) as content:
+                result = _analyze_content(content, filename, level_binary.decode_level,
+                                          cache, simulate, par, profiler, rules)
+        else:
+            with profiler.span("read", filename):
+                with open(filepath, 'rb') as f:
+                    content = f.read()
+            result = _analyze_content(content, filename, json.loads, cache, simulate, par,
+                                      profiler, rules)
+    if profile:
+        result = dict(result, profile=profiler.spans)
+    return result
+
+
+def _analyze_content(content, filename, decode, cache, simulate, par,
+                     profiler=level_profiler.NULL_PROFILER, rules=None):
+    """Cached analyze_level_data for a level file's raw bytes."""
+    if cache is not None:
+        with profiler.span("cache lookup", filename):
+            key = cache.key(content)
+            result = cache.get(key)
+        if result is not None:
+            result["filename"] = filename
+            return result
     
-    all_issues.extend(validate_structure(data, filename))
-    all_issues.extend(analyze_platform_gaps(data))
-    all_issues.extend(analyze_hazard_density(data))
-    all_issues.extend(analyze_checkpoint_spacing(data))
-    all_issues.extend(analyze_spawn_safety(data))
-    all_issues.extend(analyze_exit_reachability(data))
-    all_issues.extend(analyze_physics_triggers(data))
+    data = profiler.call("parse", filename, 0, decode, content)
+    result = analyze_level_data(data, filename, simulate, par, profiler, rules)
     
-    difficulty = calculate_difficulty_score(data)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def _entity_counts(data):
+    if not isinstance(data, dict):
+        data = {}
+    counts = {key: len(data[key]) if isinstance(data.get(key), list) else 0
+              for key in ("platforms", "hazards", "physics_triggers", "checkpoints")}
+    counts["all"] = sum(counts.values())
+    return counts
+
+
+def analyze_level_data(data, filename, simulate=0, par=False,
+                       profiler=level_profiler.NULL_PROFILER, rules=None, context=None):
+    """Run the selected rules (default: all) and extras on an already-parsed level.
+    
+    Pass a level_rules.LevelContext for data to keep its derived data
+    (watch mode does, to reuse it after the next edit).
+    
+    A level that fails the schema only gets the schema check: the others
+    (and --simulate/--par) read positions and sizes it may not have. Its
+    difficulty then comes from the hand-weighted entity counts.
+    """
+    counts = _entity_counts(data)
+    timed_counts = counts if profiler is not level_profiler.NULL_PROFILER else None
     
-    return {
+    def timed(name, entities, step, *args):
+        return profiler.call(name, filename, timed_counts[entities] if timed_counts else 0,
+                             step, *args)
+    
+    # Derived data (indexes, reachability, ...) is built once, on first use
+    if context is None:
+        context = level_rules.LevelContext(RULES, data, timed)
+    selected = RULES.select(rules)
+    valid = not context.get("schema_errors")
+    if valid:
+        all_issues = context.run_all(selected)
+    else:
+        skipped = sum(1 for rule in selected if rule.name != "schema")
+        all_issues = context.run(RULES.rules["schema"])
+        if skipped:
+            all_issues.append(report_format.issue(
+                "info", "checks-skipped",
+                f"Skipped {skipped} other check(s) until the schema errors are fixed",
+                rule="schema", skipped=skipped))
+    
+    simulation = None
+    if simulate > 0 and valid:
+        sim_issues, simulation = timed("simulation", "all", analyze_simulation, data, simulate)
+        all_issues.extend(sim_issues)
+    
+    par_result = None
+    if par and valid:
+        par_issues, par_result = timed("par", "all", analyze_par, data)
+        all_issues.extend(par_issues)
+    
+    score = calculate_difficulty_score if valid else hand_difficulty_score
+    difficulty = timed("difficulty", "all", score, data)
+    
+    result = {
         "filename": filename,
-        "title": data.get("title", "Unknown"),
+        "title": data.get("title", "Unknown") if isinstance(data, dict) else "Unknown",
         "issues": all_issues,
         "difficulty": difficulty,
         "stats": {
-            "platforms": len(data.get("platforms", [])),
-            "hazards": len(data.get("hazards", [])),
-            "triggers": len(data.get("physics_triggers", [])),
-            "checkpoints": len(data.get("checkpoints", [])),
+            "platforms": counts["platforms"],
+            "hazards": counts["hazards"],
+            "triggers": counts["physics_triggers"],
+            "checkpoints": counts["checkpoints"],
         }
     }
+    overlaps = context.computed("overlaps")
+    if overlaps is not None and overlaps["coverage"] is not None:
+        result["coverage"] = overlaps["coverage"]
+    if simulation is not None:
+        result["simulation"] = simulation
+    if par_result is not None:
+        result["par"] = par_result
+    return result
+
+
+def analyze_levels(paths, jobs=1, cache=None, simulate=0, par=False, profile=False,
+                   rules=None):
+    """Yield analyze_level results for each path, in input order.
+    
+    With jobs > 1 the files are spread over a process pool; results are still
+    yielded in the order of `paths` so reports stay deterministic.
+    """
+    if jobs <= 1 or len(paths) < 2:
+        for path in paths:
+            yield analyze_level(path, cache, simulate, par, profile, rules)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = min(jobs, len(paths))
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(functools.partial(analyze_level, cache=cache,
+                                              simulate=simulate, par=par,
+                                              profile=profile, rules=rules),
+                            paths, chunksize=chunksize)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Automated pre-flight QA for the JSON levels.")
+    parser.add_argument(
+        "levels", nargs="*", metavar="LEVEL",
+        help="level files to analyze, JSON or binary .lvlb "
+             "(default: every world_*.json in levels/json)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, metavar="N",
+        help="analyze levels in N worker processes (0 = one per CPU)")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="re-analyze every level, ignoring and not updating the result cache")
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR,
+        help=f"result cache location (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument(
+        "--simulate", type=int, nargs="?", const=None, default=0, metavar="N",
+        help="play each level with N bots (default N: level_simulator.DEFAULT_AGENTS) "
+             "and report completion rate and exit times")
+    parser.add_argument(
+        "--par", action="store_true",
+        help="search each level for its fastest input trace and report par times")
+    parser.add_argument(
+        "--rules", type=_rule_list, metavar="NAMES",
+        help="comma-separated rules to run (default: all; see --list-rules)")
+    parser.add_argument(
+        "--skip", type=_rule_list, default=[], metavar="NAMES",
+        help="comma-separated rules not to run")
+    parser.add_argument(
+        "--list-rules", action="store_true",
+        help="list the registered rules and the derived data they use, then exit")
+    parser.add_argument(
+        "--format", choices=report_format.FORMATS, default="text",
+        help="text report (default), one JSON document, or NDJSON records "
+             "streamed per level as results complete")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running and re-analyze each level as soon as it is saved "
+             "(restart after editing the rules themselves)")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="time every check on every level and print a ranked breakdown")
+    parser.add_argument(
+        "--trace", metavar="PATH",
+        help="with --profile, also write a trace file for chrome://tracing or "
+             "ui.perfetto.dev (implies --profile)")
+    args = parser.parse_args(argv)
+    if args.trace:
+        args.profile = True
+    if args.watch and args.profile:
+        parser.error("--watch can't be combined with --profile or --trace")
+    if args.watch and args.format == "json":
+        parser.error("--watch never finishes a document; use --format ndjson")
+    try:
+        args.rules = [rule.name for rule in RULES.select(args.rules, args.skip)]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    if args.simulate is None:   # --simulate without a count
+        import level_simulator  # NumPy; only for --simulate
+        args.simulate = level_simulator.DEFAULT_AGENTS
+    elif args.simulate < 0:
+        parser.error("--simulate must be >= 0")
+    return args
+
 
+def _rule_list(text):
+    return [name.strip() for name in text.split(",") if name.strip()]
 
-def main():
+
+def collect_level_paths(args):
+    """Level files named on the command line, or every shipped level."""
+    if args.levels:
+        missing = [p for p in args.levels if not os.path.isfile(p)]
+        if missing:
+            print(f"Error: Level file not found: {missing[0]}")
+            sys.exit(1)
+        return list(args.levels)
+    
     levels_dir = os.path.normpath(LEVELS_DIR)
     
     if not os.path.isdir(levels_dir):
@@ -259,37 +674,242 @@ def main():
         print("No level files found!")
         sys.exit(1)
     
+    return [os.path.join(levels_dir, f) for f in files]
+
+
+def format_simulation(sim):
+    """One-line summary of a level's bot playthroughs."""
+    line = f"🎮 Sim: {sim['completion_rate']:.0%} of {sim['agents']} bots clear"
+    if sim["cleared"]:
+        line += f" · exit p50 {sim['time_p50']:.1f}s / p90 {sim['time_p90']:.1f}s"
+    losses = [f"{name} {count / sim['agents']:.0%}" if count * 100 >= sim["agents"]
+              else f"{name} <1%"
+              for name, count in sim["outcomes"].items()
+              if name != "cleared" and count]
+    if losses:
+        line += " · " + ", ".join(losses)
+    return line
+
+
+def format_coverage(coverage):
+    """One-line physics-state coverage of a level's path."""
+    return "🧭 Path: " + " · ".join(f"{c['state']} {c['share']:.0%}" for c in coverage)
+
+
+def format_par(par):
+    """One-line summary of a level's solver result."""
+    import level_trace_solver  # NumPy; only for --par
+    if par["status"] == level_trace_solver.SOLVED:
+        return (f"🏁 Par: {par['par_time']:.2f}s ({par['inputs']} inputs, "
+                f"{par['expanded']} states searched)")
+    if par["status"] == level_trace_solver.BUDGET:
+        return f"🏁 Par: not found within {par['expanded']} states"
+    return "🏁 Par: none (exit unreachable for the solver)"
+
+
+def report_profile(spans, trace_path=None):
+    """Print the --profile breakdown and write the trace file, if asked."""
     print("=" * 70)
-    print("  LEVEL BALANCE ANALYZER — Definitely Normal Physics")
+    print("  PROFILE")
     print("=" * 70)
+    for line in level_profiler.format_report(spans):
+        print(line)
+    hits = sum(1 for s in spans if s["name"] == "cache lookup")
+    checked = sum(1 for s in spans if s["name"] == "parse")
+    if hits > checked:
+        print(f"\n  Note: {hits - checked} level(s) came from the result cache; "
+              "use --no-cache to time every check.")
+    if trace_path:
+        level_profiler.write_trace(spans, trace_path)
+        print(f"\n  Trace written to: {trace_path} (open in chrome://tracing or "
+              "ui.perfetto.dev)")
     print()
+
+
+def level_status(result):
+    """Worst issue severity of a level result, or "ok"."""
+    return report_format.worst_severity(result["issues"]) or "ok"
+
+
+def level_record(result):
+    """A level result as it appears in JSON/NDJSON output."""
+    return dict(result, status=level_status(result))
+
+
+def print_level_result(result):
+    """Print one level's summary line and issues; return (criticals, warnings)."""
+    counts = report_format.severity_counts(result["issues"])
+    
+    status = ("✅" if not result["issues"]
+              else "❌" if counts["critical"] or counts["error"] else "⚠️")
+    stats = result["stats"]
+    print(f"{status} {result['filename']:35s} | Diff: {result['difficulty']:3d}/100 "
+          f"| P:{stats['platforms']:2d} H:{stats['hazards']:2d} "
+          f"T:{stats['triggers']:2d} C:{stats['checkpoints']:2d}")
+    
+    for issue in result["issues"]:
+        print(f"   {report_format.format_issue(issue)}")
+    
+    coverage = result.get("coverage")
+    if coverage and [c["state"] for c in coverage] != [level_overlaps.START_STATE]:
+        print(f"   {format_coverage(coverage)}")
+    if "simulation" in result:
+        print(f"   {format_simulation(result['simulation'])}")
+    if "par" in result:
+        print(f"   {format_par(result['par'])}")
+    return counts["critical"], counts["warning"]
+
+
+def world_curve(world, results):
+    """One world's difficulty curve from results in level order, or None."""
+    world_levels = [r for r in results if r["filename"].startswith(f"world_{world:02d}")]
+    if not world_levels:
+        return None
+    diffs = [l["difficulty"] for l in world_levels]
+    
+    # Check if difficulty is non-monotonic
+    inversions = 0
+    for i in range(len(diffs) - 1):
+        if diffs[i+1] < diffs[i] - 10:
+            inversions += 1
+    
+    issues = []
+    if inversions > 2:
+        issues.append(report_format.issue(
+            "warning", "curve-inversions",
+            f"World {world}: Difficulty curve has {inversions} inversions (dips)",
+            rule="curve"))
+    return {"world": world, "levels": [l["filename"] for l in world_levels],
+            "difficulty": diffs, "inversions": inversions, "issues": issues}
+
+
+def world_curves(results):
+    curves = (world_curve(world, results) for world in range(1, 4))
+    return [curve for curve in curves if curve is not None]
+
+
+def print_world_curve(world, results):
+    """Print one world's difficulty curve from results in level order."""
+    curve = world_curve(world, results)
+    if curve is None:
+        return
+    diffs = curve["difficulty"]
+    print(f"  World {world}: ", end="")
+    for i, d in enumerate(diffs):
+        bar = "█" * (d // 5)
+        print(f"L{i+1}:{d:3d} {bar}")
+        if i < len(diffs) - 1:
+            print("           ", end="")
+    
+    for issue in curve["issues"]:
+        print(f"  {report_format.format_issue(issue)}")
+    print()
+
+
+def summarize_results(results):
+    """Issue counts per severity and the overall verdict of a run."""
+    counts = report_format.severity_counts(i for r in results for i in r["issues"])
+    if counts["critical"]:
+        verdict = "critical"
+    elif counts["error"]:
+        verdict = "errors"
+    elif counts["warning"]:
+        verdict = "warnings"
+    else:
+        verdict = "clean"
+    return {"levels": len(results), **counts,
+            "passed": sum(1 for r in results if not r["issues"]), "result": verdict}
+
+
+def list_rules():
+    """Print every registered rule with its derived data."""
+    for rule in RULES.rules.values():
+        needs = RULES.requirements([rule])
+        print(f"  {rule.name:<20s} {rule.description}")
+        if needs:
+            print(f"  {'':<20s} uses: {', '.join(needs)}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list_rules:
+        list_rules()
+        return 0
+    paths = collect_level_paths(args)
+    text = args.format == "text"
+    if args.simulate or args.par:
+        import level_simulator  # NumPy; only for --simulate/--par
+        if not level_simulator.AVAILABLE:
+            note = sys.stdout if text else sys.stderr
+            print("Note: --simulate and --par need NumPy (pip install numpy); skipping them.",
+                  file=note)
+            print(file=note)
+            args.simulate, args.par = 0, False
+    if args.watch:
+        return watch(args, paths)
+    fingerprint = analysis_fingerprint(args.simulate, args.par, args.rules)
+    cache = None if args.no_cache else AnalysisCache(fingerprint, args.cache_dir)
+    
+    model = level_difficulty_model.load_model()
+    rules = None if args.rules == RULES.names() else args.rules
+    if text:
+        print("=" * 70)
+        print("  LEVEL BALANCE ANALYZER — Definitely Normal Physics")
+        print("=" * 70)
+        print()
+        if model is not None:
+            print(f"  Difficulty: fitted to analytics ({model.info.get('levels')} levels, "
+                  f"{model.info.get('fitted')})")
+            print()
+        if rules is not None:
+            print(f"  Rules: {', '.join(rules) or 'none'} ({len(rules)} of {len(RULES.rules)})")
+            print()
     
-    total_issues = 0
-    critical_count = 0
-    warning_count = 0
     results = []
+    spans = []
     
-    for f in files:
-        result = analyze_level(os.path.join(levels_dir, f))
+    for result in analyze_levels(paths, args.jobs, cache, args.simulate, args.par,
+                                 args.profile, rules):
+        spans.extend(result.pop("profile", ()))
         results.append(result)
-        
-        criticals = [i for i in result["issues"] if "CRITICAL" in i]
-        warnings = [i for i in result["issues"] if "⚠️" in i]
-        
-        critical_count += len(criticals)
-        warning_count += len(warnings)
-        total_issues += len(result["issues"])
-        
-        # Print per-level summary
-        status = "✅" if not result["issues"] else ("❌" if criticals else "⚠️")
-        stats = result["stats"]
-        print(f"{status} {result['filename']:35s} | Diff: {result['difficulty']:3d}/100 "
-              f"| P:{stats['platforms']:2d} H:{stats['hazards']:2d} "
-              f"T:{stats['triggers']:2d} C:{stats['checkpoints']:2d}")
-        
-        for issue in result["issues"]:
-            print(f"   {issue}")
+        if text:
+            print_level_result(result)
+        elif args.format == "ndjson":
+            report_format.emit("level", level_record(result))
     
+    summary = summarize_results(results)
+    if text:
+        print_text_summary(results, summary)
+        if args.profile:
+            report_profile(spans, args.trace)
+    else:
+        curves = world_curves(results)
+        profile = level_profiler.summarize(spans) if args.profile else None
+        if args.trace:
+            level_profiler.write_trace(spans, args.trace)
+        if args.format == "json":
+            model_info = ({"levels": model.info.get("levels"), "fitted": model.info.get("fitted")}
+                          if model is not None else None)
+            report_format.write_json(report_format.document(
+                "level_balance_analyzer", rules=args.rules, difficulty_model=model_info,
+                levels=[level_record(r) for r in results], curve=curves, summary=summary,
+                **({"profile": profile} if profile is not None else {})))
+        else:
+            for curve in curves:
+                report_format.emit("curve", curve)
+            if profile is not None:
+                report_format.emit("profile", {"steps": profile})
+            report_format.emit("summary", summary)
+    
+    # Workers don't report hits/misses back, so prune after any parallel run
+    if cache is not None and (cache.misses or args.jobs > 1):
+        cache.prune()
+    
+    return 1 if summary["result"] in BLOCKING_RESULTS else 0
+
+
+def print_text_summary(results, summary):
+    """The difficulty curve and summary sections of the text report."""
     # ─── Difficulty Curve Analysis ──────────────────────────────────────────
     print()
     print("=" * 70)
@@ -298,45 +918,218 @@ def main():
     print()
     
     for world in range(1, 4):
-        world_levels = [r for r in results if r["filename"].startswith(f"world_{world:02d}")]
-        if world_levels:
-            diffs = [l["difficulty"] for l in world_levels]
-            print(f"  World {world}: ", end="")
-            for i, d in enumerate(diffs):
-                bar = "█" * (d // 5)
-                print(f"L{i+1}:{d:3d} {bar}")
-                if i < len(diffs) - 1:
-                    print("           ", end="")
-            
-            # Check if difficulty is non-monotonic
-            inversions = 0
-            for i in range(len(diffs) - 1):
-                if diffs[i+1] < diffs[i] - 10:
-                    inversions += 1
-            
-            if inversions > 2:
-                print(f"  ⚠️  World {world}: Difficulty curve has {inversions} inversions (dips)")
-            print()
+        print_world_curve(world, results)
     
     # ─── Summary ────────────────────────────────────────────────────────────
     print("=" * 70)
     print("  SUMMARY")
     print("=" * 70)
-    print(f"  Total levels analyzed: {len(results)}")
-    print(f"  Critical issues:       {critical_count}")
-    print(f"  Warnings:              {warning_count}")
-    print(f"  Passed clean:          {len(results) - len([r for r in results if r['issues']])}")
+    print(f"  Total levels analyzed: {summary['levels']}")
+    print(f"  Critical issues:       {summary['critical']}")
+    print(f"  Errors:                {summary['error']}")
+    print(f"  Warnings:              {summary['warning']}")
+    print(f"  Passed clean:          {summary['passed']}")
     print()
     
-    if critical_count > 0:
+    if summary["result"] == "critical":
         print("  ❌ RESULT: Critical issues found! Fix before release.")
-    elif warning_count > 0:
+    elif summary["result"] == "errors":
+        print("  ❌ RESULT: Invalid level data found! Fix before release.")
+    elif summary["result"] == "warnings":
         print("  ⚠️  RESULT: Warnings found. Review recommended but not blocking.")
     else:
         print("  ✅ RESULT: All levels passed! Ready for manual playtesting.")
     
     print()
-    return 1 if critical_count > 0 else 0
+
+
+# ─── Watch Mode ──────────────────────────────────────────────────────────────
+
+class WatchedLevel:
+    """One level file kept in memory between edits."""
+
+    __slots__ = ("path", "stamp", "content", "context", "result")
+
+    def __init__(self, path):
+        self.path = path
+        self.stamp = None       # (mtime_ns, size) when last read
+        self.content = None     # Bytes last analyzed
+        self.context = None     # LevelContext holding the parsed level and derived data
+        self.result = None
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _watch_world(filename):
+    """World number of a world_XX_level_YY file name, else None."""
+    if filename.startswith("world_") and filename[6:8].isdigit():
+        return int(filename[6:8])
+    return None
+
+
+def refresh_level(level, args):
+    """Re-analyze a watched level if its bytes changed.
+    
+    Returns (status, detail): "same", "updated" (detail: derived data
+    reused from the previous version) or "invalid" (detail: the error).
+    An invalid save, including one the checks trip over, leaves the last
+    good version's result and context in place.
+    """
+    stamp = _file_stamp(level.path)
+    with open(level.path, "rb") as f:
+        content = f.read()
+    level.stamp = stamp
+    if content == level.content:
+        return "same", None
+    
+    filename = os.path.basename(level.path)
+    try:
+        if level_binary.has_magic(content):
+            data = level_binary.decode_level(content)
+        else:
+            data = json.loads(content)
+    except ValueError as e:
+        return "invalid", str(e)
+    
+    previous = level.context
+    context = level_rules.LevelContext(RULES, data, previous=previous)
+    try:
+        result = analyze_level_data(data, filename, args.simulate, args.par,
+                                    rules=args.rules, context=context)
+    except WATCH_ANALYSIS_ERRORS as e:
+        return "invalid", f"analysis failed ({type(e).__name__}: {e})"
+    context.previous = None     # Don't chain every old version in memory
+    level.result = result
+    level.content = content
+    level.context = context
+    return "updated", context.reused if previous is not None else []
+
+
+def _watched_paths(args):
+    """Level files named on the command line, or every world_*.json right now."""
+    if args.levels:
+        return list(args.levels)
+    levels_dir = os.path.normpath(LEVELS_DIR)
+    return [os.path.join(levels_dir, f) for f in sorted(os.listdir(levels_dir))
+            if f.startswith("world_") and f.endswith(".json")]
+
+
+def watch(args, paths, interval=WATCH_INTERVAL):
+    """Analyze every level, then re-analyze each one whenever it is saved.
+    
+    Parsed levels and their derived data stay in memory; after an edit only
+    that level runs again, reusing whatever derived data the edit didn't
+    touch, and its world's difficulty curve is reprinted. Runs until Ctrl+C.
+    """
+    levels = {}
+    text = args.format == "text"
+    
+    def current_results():
+        return [levels[p].result for p in sorted(levels) if levels[p].result is not None]
+    
+    def show_level(result):
+        if text:
+            print_level_result(result)
+        else:
+            report_format.emit("level", level_record(result))
+    
+    def show_curve(world):
+        if text:
+            print_world_curve(world, current_results())
+            return
+        curve = world_curve(world, current_results())
+        if curve is not None:
+            report_format.emit("curve", curve)
+    
+    def show_invalid(filename, detail):
+        if text:
+            print(f"❌ {filename:35s} | invalid level file: {detail}")
+        else:
+            report_format.emit("error", {"filename": filename, "message": detail})
+    
+    if text:
+        print("=" * 70)
+        print("  LEVEL BALANCE ANALYZER — Watch Mode")
+        print("=" * 70)
+        print()
+    for path in paths:
+        level = levels[path] = WatchedLevel(path)
+        status, detail = refresh_level(level, args)
+        if status == "invalid":
+            show_invalid(os.path.basename(path), detail)
+        else:
+            show_level(level.result)
+    if text:
+        print()
+    for world in range(1, 4):
+        show_curve(world)
+    
+    if text:
+        where = "" if args.levels else f" in {os.path.normpath(LEVELS_DIR)}"
+        print(f"👀 Watching {len(levels)} level(s){where} — Ctrl+C to stop")
+        sys.stdout.flush()
+    
+    try:
+        while True:
+            time.sleep(interval)
+            watched = _watched_paths(args)
+            for path in sorted(set(levels) - set(watched)):
+                del levels[path]
+            for path in watched:
+                level = levels.get(path)
+                if level is None:
+                    level = levels[path] = WatchedLevel(path)
+                stamp = _file_stamp(path)
+                if stamp is None:
+                    continue
+                if stamp == level.stamp:
+                    continue
+                
+                start = time.perf_counter()
+                try:
+                    status, detail = refresh_level(level, args)
+                except OSError:
+                    continue    # Deleted or mid-replace; the next poll sees it
+                if status == "same":
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                
+                filename = os.path.basename(path)
+                world = _watch_world(filename)
+                if not text:
+                    if status == "invalid":
+                        show_invalid(filename, detail)
+                        continue
+                    show_level(dict(level.result, elapsed_ms=round(elapsed, 3),
+                                    reused=detail))
+                    if world is not None:
+                        show_curve(world)
+                    continue
+                
+                clock = datetime.now().strftime("%H:%M:%S")
+                print()
+                if status == "invalid":
+                    print(f"[{clock}] ❌ {filename}: invalid level file ({detail}); "
+                          f"keeping the last good result")
+                    sys.stdout.flush()
+                    continue
+                reused = f", reused {', '.join(detail)}" if detail else ""
+                print(f"[{clock}] {filename} re-analyzed in {elapsed:.1f} ms{reused}")
+                print_level_result(level.result)
+                if world is not None:
+                    print()
+                    show_curve(world)
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        if text:
+            print("\nStopped watching.")
+    return 0
 
 
 if __name__ == "__main__":
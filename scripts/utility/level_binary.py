@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Level Binary Format — Compact, Versioned Encoding of the JSON Levels
+
+The shipped levels are pretty-printed JSON that every tool parses from
+text. This module encodes the same data as typed columns: one fixed-width
+column per entity field (positions, sizes, delays, flags), so an entity
+is the same row across every column of its kind. All strings (level_id,
+platform/hazard types, physics states, trigger types) are interned into
+a single string table and stored in records as indices.
+
+Decoding does not parse text. BinaryLevel wraps any buffer (bytes, or an
+mmap from map_file()) and column() casts a memoryview of it in place, so
+the analyzer reads .lvlb files without copying them.
+
+The encoding is lossless. decode_level(encode_level(d)) == d for any level
+dict: ints stay ints, optional keys stay absent, and any key or value the
+fixed layout has no column for goes into a small JSON "extras" column.
+
+Layout (little-endian, every column 8-byte aligned):
+
+  header     magic b"DNPL", u16 version, u16 column count,
+             u32 string table offset, u32 string count
+  directory  per column: u32 name (string index), typecode, 3 pad bytes,
+             u32 data offset, u32 item count
+  columns    "containers" (entity count per LAYOUT entry, ABSENT if the key
+             is missing), then per entity kind "<kind>.present" (bitmask of
+             the fields each record has) and one column per field:
+               vec2  x0, y0, x1, y1, ...  (i32 when all ints, else f64)
+               num   one value per record (i32 or f64)
+               str   string index per record (u16, u32 past 65535 strings)
+               bool  u8
+             An f64 column holding some ints gets a "<column>.ints" u8 mask.
+  strings    u32 end offset per string, then the UTF-8 bytes
+
+Usage:
+    python3 level_binary.py                      # every level -> levels/binary/
+    python3 level_binary.py LEVEL.json -o DIR
+    python3 level_binary.py --check              # round-trip every shipped level
+    python3 level_binary.py --decode LEVEL.lvlb  # print the level as JSON
+"""
+
+import argparse
+import array
+import contextlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVELS_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "levels", "json"))
+BINARY_DIR = os.path.normpath(os.path.join(LEVELS_DIR, "..", "binary"))
+
+MAGIC = b"DNPL"
+VERSION = 1
+EXTENSION = ".lvlb"
+
+HEADER = struct.Struct("<4sHHII")
+DIRECTORY_ENTRY = struct.Struct("<Ic3xII")
+ALIGNMENT = 8
+
+ABSENT = 0xFFFFFFFF     # "containers" entry for a key the level doesn't have
+INT32_MIN, INT32_MAX = -(1 << 31), (1 << 31) - 1
+
+# (JSON key, container, fields). "root" fields live on the level itself,
+# "object" is a single nested dict, "array" a list of entity dicts.
+LAYOUT = (
+    ("level", "root", (("level_id", "str"), ("title", "str"),
+                       ("description", "str"), ("player_spawn", "vec2"))),
+    ("exit", "object", (("position", "vec2"),)),
+    ("platforms", "array", (("position", "vec2"), ("size", "vec2"),
+                            ("type", "str"))),
+    ("hazards", "array", (("position", "vec2"), ("type", "str"))),
+    ("physics_triggers", "array", (("position", "vec2"), ("size", "vec2"),
+                                   ("state", "str"), ("trigger_type", "str"),
+                                   ("delay", "num"), ("one_time", "bool"))),
+    ("checkpoints", "array", (("position", "vec2"),)),
+)
+CONTAINER_KEYS = frozenset(kind for kind, container, _ in LAYOUT if container != "root")
+
+ITEM_SIZES = {code: array.array(code).itemsize for code in "BHIid"}
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+# ─── Field Types ─────────────────────────────────────────────────────────────
+
+def _is_number(value):
+    return type(value) is int or type(value) is float
+
+
+def _fits(kind, value):
+    """True if value can be stored in a column of this field kind."""
+    if kind == "vec2":
+        return (type(value) is list and len(value) == 2
+                and _is_number(value[0]) and _is_number(value[1]))
+    if kind == "num":
+        return _is_number(value)
+    if kind == "str":
+        return type(value) is str
+    return type(value) is bool
+
+
+# ─── Encoding ────────────────────────────────────────────────────────────────
+
+class _Writer:
+    """Collects columns and interned strings, then lays out the file."""
+
+    def __init__(self):
+        self.strings = [""]
+        self.string_ids = {"": 0}
+        self.columns = []       # (name, typecode, array)
+
+    def intern(self, text):
+        index = self.string_ids.get(text)
+        if index is None:
+            index = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def add(self, name, code, values):
+        self.columns.append((name, code, array.array(code, values)))
+
+    def add_numbers(self, name, values, present):
+        """Numeric column: i32 when every present value is an int, else f64."""
+        used = [v for v, p in zip(values, present) if p]
+        if all(type(v) is int and INT32_MIN <= v <= INT32_MAX for v in used):
+            self.add(name, "i", [v if type(v) is int else 0 for v in values])
+            return
+        self.add(name, "d", [float(v) for v in values])
+        if any(type(v) is int for v in used):
+            self.add(f"{name}.ints", "B", [type(v) is int for v in values])
+
+    def tobytes(self):
+        names = [self.intern(name) for name, _, _ in self.columns]
+        offset = _align(HEADER.size + DIRECTORY_ENTRY.size * len(self.columns))
+        entries, blobs = [], []
+        for name, (_, code, values) in zip(names, self.columns):
+            if not _LITTLE_ENDIAN and values.itemsize > 1:
+                values.byteswap()
+            blob = values.tobytes()
+            entries.append(DIRECTORY_ENTRY.pack(name, code.encode("ascii"),
+                                                offset, len(values)))
+            blobs.append((offset, blob))
+            offset = _align(offset + len(blob))
+
+        encoded = [s.encode("utf-8") for s in self.strings]
+        ends, end = [], 0
+        for s in encoded:
+            end += len(s)
+            ends.append(end)
+        ends = array.array("I", ends)
+        if not _LITTLE_ENDIAN:
+            ends.byteswap()
+        string_offset = offset
+
+        out = bytearray(string_offset)
+        HEADER.pack_into(out, 0, MAGIC, VERSION, len(self.columns),
+                         string_offset, len(self.strings))
+        out[HEADER.size:HEADER.size + len(entries) * DIRECTORY_ENTRY.size] = b"".join(entries)
+        for start, blob in blobs:
+            out[start:start + len(blob)] = blob
+        out += ends.tobytes()
+        out += b"".join(encoded)
+        return bytes(out)
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_records(writer, kind, fields, records, extras):
+    """Write the present mask and field columns for a list of dicts."""
+    present = [0] * len(records)
+    columns = {key: [] for key, _ in fields}
+    for i, record in enumerate(records):
+        leftover = dict(record)
+        for bit, (key, field) in enumerate(fields):
+            value = record.get(key)
+            if key in record and _fits(field, value):
+                present[i] |= 1 << bit
+                del leftover[key]
+            else:
+                value = None
+            columns[key].append(value)
+        if leftover:
+            extras.setdefault(kind, {})[str(i)] = leftover
+
+    writer.add(f"{kind}.present", "B", present)
+    for bit, (key, field) in enumerate(fields):
+        values = columns[key]
+        has = [bool(mask & (1 << bit)) for mask in present]
+        name = f"{kind}.{key}"
+        if field == "vec2":
+            flat = [c for v in values for c in (v if v is not None else (0, 0))]
+            writer.add_numbers(name, flat, [h for h in has for _ in (0, 1)])
+        elif field == "num":
+            writer.add_numbers(name, [v if v is not None else 0 for v in values], has)
+        elif field == "str":
+            indices = [writer.intern(v) if v is not None else 0 for v in values]
+            writer.add(name, "H" if len(writer.strings) <= 0xFFFF else "I", indices)
+        else:
+            writer.add(name, "B", [v is True for v in values])
+
+
+def encode_level(data):
+    """Encode a level dict as bytes."""
+    if type(data) is not dict:
+        raise ValueError("A level must be a JSON object")
+    writer = _Writer()
+    extras = {}
+    containers = []
+
+    for kind, container, fields in LAYOUT:
+        if container == "root":
+            root = {k: v for k, v in data.items() if k not in CONTAINER_KEYS}
+            _encode_records(writer, kind, fields, [root], extras)
+            containers.append(1)
+            continue
+        value = data.get(kind)
+        if container == "object":
+            fits = type(value) is dict
+            records = [value] if fits else []
+        else:
+            fits = type(value) is list and all(type(r) is dict for r in value)
+            records = value if fits else []
+        if kind not in data:
+            containers.append(ABSENT)
+        elif not fits:
+            # Doesn't match the layout: keep it verbatim with the root's extras
+            extras.setdefault("level", {}).setdefault("0", {})[kind] = value
+            containers.append(ABSENT)
+        else:
+            containers.append(len(records))
+        _encode_records(writer, kind, fields, records, extras)
+
+    writer.columns.insert(0, ("containers", "I", array.array("I", containers)))
+    if extras:
+        blob = json.dumps(extras, separators=(",", ":")).encode("utf-8")
+        writer.add("extras", "B", blob)
+    return writer.tobytes()
+
+
+# ─── Decoding ────────────────────────────────────────────────────────────────
+
+def has_magic(prefix):
+    """True if the bytes start like a binary level."""
+    return bytes(prefix[:len(MAGIC)]) == MAGIC
+
+
+def is_binary_level(path):
+    """True if the file at path is a binary level (checked by magic, not name)."""
+    with open(path, "rb") as f:
+        return has_magic(f.read(len(MAGIC)))
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """Read-only mmap of a file, for zero-copy decoding."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class BinaryLevel:
+    """Typed, zero-copy view of an encoded level.
+
+    Release it (or use it as a context manager) before closing an mmap it
+    wraps; column() views must be released too.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        if len(self._view) < HEADER.size or not has_magic(self._view):
+            raise ValueError("Not a binary level (bad magic)")
+        _, self.version, count, string_offset, string_count = HEADER.unpack_from(self._view)
+        if self.version > VERSION:
+            raise ValueError(f"Unsupported binary level version {self.version} "
+                             f"(this reader knows up to {VERSION})")
+
+        ends_size = 4 * string_count
+        with self._typed(string_offset, "I", string_count) as ends:
+            ends = ends.tolist()
+        blob_start = string_offset + ends_size
+        blob = bytes(self._view[blob_start:blob_start + (ends[-1] if ends else 0)])
+        self.strings = [blob[start:end].decode("utf-8")
+                        for start, end in zip([0] + ends, ends)]
+
+        self._columns = {}
+        if HEADER.size + count * DIRECTORY_ENTRY.size > len(self._view):
+            raise ValueError("Truncated binary level")
+        directory = self._view[HEADER.size:HEADER.size + count * DIRECTORY_ENTRY.size]
+        for name, code, offset, items in DIRECTORY_ENTRY.iter_unpack(directory):
+            code = code.decode("ascii")
+            if code not in ITEM_SIZES:
+                raise ValueError(f"Unknown column typecode '{code}'")
+            self._columns[self.strings[name]] = (code, offset, items)
+        directory.release()
+
+    def _typed(self, offset, code, items):
+        end = offset + items * ITEM_SIZES[code]
+        if end > len(self._view):
+            raise ValueError("Truncated binary level")
+        raw = self._view[offset:end]
+        if _LITTLE_ENDIAN or ITEM_SIZES[code] == 1:
+            return raw.cast(code)
+        values = array.array(code, raw)
+        raw.release()
+        values.byteswap()
+        return memoryview(values)
+
+    def column(self, name):
+        """Typed memoryview of a column (a view into the buffer), or None."""
+        entry = self._columns.get(name)
+        if entry is None:
+            return None
+        code, offset, items = entry
+        return self._typed(offset, code, items)
+
+    def _values(self, name):
+        view = self.column(name)
+        if view is None:
+            return None
+        with view:
+            return view.tolist()
+
+    def _numbers(self, name):
+        values = self._values(name)
+        ints = self._values(f"{name}.ints")
+        if ints is not None:
+            values = [int(v) if is_int else v for v, is_int in zip(values, ints)]
+        return values
+
+    def _records(self, kind, fields, count):
+        """Rebuild a kind's records column by column."""
+        keys, columns = [], []
+        for key, field in fields:
+            name = f"{kind}.{key}"
+            if field == "vec2":
+                flat = self._numbers(name)
+                values = [[x, y] for x, y in zip(flat[0::2], flat[1::2])]
+            elif field == "num":
+                values = self._numbers(name)
+            elif field == "str":
+                strings = self.strings
+                values = [strings[i] for i in self._values(name)]
+            else:
+                values = [bool(v) for v in self._values(name)]
+            keys.append(key)
+            columns.append(values)
+
+        full = (1 << len(fields)) - 1
+        records = []
+        for mask, row in zip(self._values(f"{kind}.present"), zip(*columns)):
+            if mask == full:
+                records.append(dict(zip(keys, row)))
+            else:
+                records.append({key: value for bit, (key, value) in enumerate(zip(keys, row))
+                                if mask >> bit & 1})
+        return records
+
+    def to_dict(self):
+        """Rebuild the level dict."""
+        containers = self._values("containers")
+        blob = self.column("extras")
+        extras = {}
+        if blob is not None:
+            with blob:
+                extras = json.loads(bytes(blob))
+
+        data = {}
+        for (kind, container, fields), count in zip(LAYOUT, containers):
+            if count == ABSENT:
+                continue
+            records = self._records(kind, fields, count)
+            for i, leftover in extras.get(kind, {}).items():
+                records[int(i)].update(leftover)
+            if container == "root":
+                data.update(records[0])
+            elif container == "object":
+                data[kind] = records[0]
+            else:
+                data[kind] = records
+        return data
+
+    def release(self):
+        self._view.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def decode_level(buffer):
+    """Level dict from an encoded buffer (bytes, bytearray, mmap...)."""
+    with BinaryLevel(buffer) as level:
+        return level.to_dict()
+
+
+def load_level(path):
+    """Level dict from a .lvlb file, decoded straight from an mmap."""
+    with map_file(path) as mapped:
+        return decode_level(mapped)
+
+
+# ─── Conversion ──────────────────────────────────────────────────────────────
+
+def binary_path_for(json_path, out_dir=BINARY_DIR):
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    return os.path.join(out_dir, stem + EXTENSION)
+
+
+def shipped_level_paths(levels_dir=LEVELS_DIR):
+    return [os.path.join(levels_dir, f) for f in sorted(os.listdir(levels_dir))
+            if f.startswith("world_") and f.endswith(".json")]
+
+
+def round_trip(data):
+    """(encoded bytes, True if decoding them gives data back)."""
+    encoded = encode_level(data)
+    return encoded, decode_level(encoded) == data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert JSON levels to the compact binary level format.")
+    parser.add_argument("levels", nargs="*", metavar="LEVEL",
+                        help="JSON levels to convert (default: every shipped level)")
+    parser.add_argument("-o", "--out-dir", default=BINARY_DIR,
+                        help=f"output directory (default: {BINARY_DIR})")
+    parser.add_argument("--check", action="store_true",
+                        help="only verify every level round-trips; write nothing")
+    parser.add_argument("--decode", metavar="FILE",
+                        help="print a binary level as JSON and exit")
+    args = parser.parse_args(argv)
+
+    if args.decode:
+        print(json.dumps(load_level(args.decode), indent="\t"))
+        return 0
+
+    paths = args.levels or shipped_level_paths()
+    if not args.check:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    failed = 0
+    json_bytes = binary_bytes = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        encoded, same = round_trip(json.loads(raw))
+        json_bytes += len(raw)
+        binary_bytes += len(encoded)
+        mark = "✅" if same else "❌"
+        print(f"  {mark} {os.path.basename(path):<28} {len(raw):>7} B -> {len(encoded):>6} B")
+        if not same:
+            failed += 1
+            continue
+        if not args.check:
+            with open(binary_path_for(path, args.out_dir), "wb") as f:
+                f.write(encoded)
+
+    ratio = binary_bytes / json_bytes if json_bytes else 0
+    print(f"\n  {len(paths)} level(s), {json_bytes} B JSON -> {binary_bytes} B binary "
+          f"({ratio:.0%})")
+    if failed:
+        print(f"  ❌ {failed} level(s) did not round-trip")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
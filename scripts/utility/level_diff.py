@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Level Diff — What Actually Changed Between Two Versions of a Level
+
+A git diff of a level is hundreds of lines of pretty-printed coordinates.
+This tool decodes both versions the way the analyzer does (JSON or binary
+.lvlb), pairs up each kind's entities between them and reports which
+platforms, hazards, triggers and checkpoints moved or changed, which were
+added and which were removed — plus what that did to the analyzer's
+difficulty score and issues.
+
+Entities are paired in three passes, so nothing is compared all-pairs:
+
+  • identical entities pair up first (by a hash of the whole entity)
+  • the rest pair up nearest-first within MATCH_RADIUS px, candidates
+    coming from a LevelIndex over the old positions; entities of the same
+    type (or trigger state) are preferred
+  • anything left over was added (new side) or removed (old side)
+
+Usage:
+  python3 level_diff.py OLD NEW                    # two level files
+  python3 level_diff.py --git HEAD~1               # every levels/json file, HEAD~1 vs working tree
+  python3 level_diff.py --git v1.0 v1.1 --jobs 0   # two revisions, one worker per CPU
+
+Exits with status 1 when the new version introduces a critical issue.
+"""
+
+import argparse
+import collections
+import json
+import math
+import os
+import subprocess
+import sys
+
+import level_balance_analyzer as analyzer
+import level_binary
+import report_format
+from level_spatial_index import ENTITY_KINDS, LevelIndex
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                          "..", ".."))
+LEVELS_GIT_DIR = "levels/json"  # Relative to REPO_ROOT, as git paths
+
+# Entities further apart than this (px) are never the same entity moved
+MATCH_RADIUS = 256
+
+# Entity lines listed per kind and change in the text report
+DETAIL_LIMIT = 8
+
+# Top-level keys reported as "Spawn" etc. rather than as entity lists
+FIELD_LABELS = {"player_spawn": "Spawn", "exit": "Exit", "title": "Title"}
+
+
+# ─── Loading ─────────────────────────────────────────────────────────────────
+
+def decode(content):
+    """Level dict from a file's bytes: binary .lvlb (by magic) or JSON."""
+    if level_binary.has_magic(content):
+        return level_binary.decode_level(content)
+    return json.loads(content)
+
+
+def _position(entity):
+    position = entity.get("position") if isinstance(entity, dict) else None
+    if isinstance(position, (list, tuple)) and len(position) == 2:
+        return position
+    return None
+
+
+# ─── Matching ────────────────────────────────────────────────────────────────
+
+def _fingerprint(entity):
+    return json.dumps(entity, sort_keys=True)
+
+
+def _kind_of(entity):
+    """What makes two entities interchangeable: their type and trigger state."""
+    if not isinstance(entity, dict):
+        return None
+    return entity.get("type"), entity.get("state")
+
+
+def match_entities(kind, old, new, radius=MATCH_RADIUS):
+    """Pair two versions of one kind's entity list.
+
+    Returns {"same": [(i, j)], "matched": [(i, j)], "removed": [i],
+    "added": [j]}: i indexes old, j new; "matched" pairs differ (moved or
+    edited), "same" pairs are identical.
+    """
+    # Pass 1: identical entities
+    unmatched_old = collections.defaultdict(list)
+    for i, entity in enumerate(old):
+        unmatched_old[_fingerprint(entity)].append(i)
+    for indices in unmatched_old.values():
+        indices.reverse()   # pop() hands out the lowest index first
+    same = []
+    left_new = []
+    for j, entity in enumerate(new):
+        indices = unmatched_old.get(_fingerprint(entity))
+        if indices:
+            same.append((indices.pop(), j))
+        else:
+            left_new.append(j)
+    left_old = sorted(i for indices in unmatched_old.values() for i in indices)
+
+    # Pass 2: nearest-first within radius, from a grid over the old positions
+    points = [None] * len(old)
+    for i in left_old:
+        position = _position(old[i])
+        if position is not None:
+            points[i] = {"position": position}
+    index = LevelIndex({kind: points})
+    candidates = []
+    for j in left_new:
+        position = _position(new[j])
+        if position is None:
+            continue
+        x, y = position
+        for i in index.query_radius(kind, x, y, radius):
+            distance = math.hypot(x - points[i]["position"][0], y - points[i]["position"][1])
+            candidates.append((_kind_of(old[i]) != _kind_of(new[j]), distance, j, i))
+    candidates.sort()
+
+    matched = []
+    taken_old, taken_new = set(), set()
+    for _, _, j, i in candidates:
+        if i not in taken_old and j not in taken_new:
+            taken_old.add(i)
+            taken_new.add(j)
+            matched.append((i, j))
+    matched.sort()
+
+    # Pass 3: leftovers
+    return {
+        "same": sorted(same),
+        "matched": matched,
+        "removed": [i for i in left_old if i not in taken_old],
+        "added": [j for j in left_new if j not in taken_new],
+    }
+
+
+def _changed_fields(old, new):
+    """{field: {"old", "new"}} for everything but the position."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {"entity": {"old": old, "new": new}}
+    return {key: {"old": old.get(key), "new": new.get(key)}
+            for key in sorted(old.keys() | new.keys())
+            if key != "position" and old.get(key) != new.get(key)}
+
+
+def _entity_list(data, kind):
+    entities = data.get(kind, [])
+    return entities if isinstance(entities, list) else []
+
+
+def diff_entities(old_data, new_data):
+    """{kind: {"moved": [...], "added": [...], "removed": [...], "unchanged": n}}."""
+    changes = {}
+    for kind in ENTITY_KINDS:
+        old, new = _entity_list(old_data, kind), _entity_list(new_data, kind)
+        pairs = match_entities(kind, old, new)
+        moved = []
+        for i, j in pairs["matched"]:
+            before, after = _position(old[i]), _position(new[j])
+            moved.append({
+                "old_index": i, "new_index": j, "from": before, "to": after,
+                "distance": (math.hypot(after[0] - before[0], after[1] - before[1])
+                             if before is not None and after is not None else None),
+                "changed": _changed_fields(old[i], new[j]),
+            })
+        changes[kind] = {
+            "moved": moved,
+            "added": [{"index": j, "entity": new[j]} for j in pairs["added"]],
+            "removed": [{"index": i, "entity": old[i]} for i in pairs["removed"]],
+            "unchanged": len(pairs["same"]),
+        }
+    return changes
+
+
+def _issue_key(record):
+    return record.get("rule"), record["code"], record["message"]
+
+
+def diff_issues(old_issues, new_issues):
+    """(issues only in new, issues only in old), duplicates counted."""
+    def unmatched(issues, others):
+        left = collections.Counter(_issue_key(r) for r in others)
+        result = []
+        for record in issues:
+            key = _issue_key(record)
+            if left[key]:
+                left[key] -= 1
+            else:
+                result.append(record)
+        return result
+
+    return unmatched(new_issues, old_issues), unmatched(old_issues, new_issues)
+
+
+def diff_levels(name, old_data, new_data):
+    """Diff record for two versions of a level (either may be None: added/removed)."""
+    record = {"level": name}
+    if old_data is None or new_data is None:
+        record["status"] = "added" if old_data is None else "removed"
+        data = new_data if old_data is None else old_data
+        result = analyzer.analyze_level_data(data, name)
+        record["difficulty"] = {"old": None if old_data is None else result["difficulty"],
+                                "new": None if new_data is None else result["difficulty"]}
+        record["issues"] = {"new": result["issues"] if old_data is None else [],
+                            "resolved": result["issues"] if new_data is None else []}
+        return record
+
+    old_result = analyzer.analyze_level_data(old_data, name)
+    new_result = analyzer.analyze_level_data(new_data, name)
+    added, resolved = diff_issues(old_result["issues"], new_result["issues"])
+    fields = {key: {"old": old_data.get(key), "new": new_data.get(key)}
+              for key in sorted(old_data.keys() | new_data.keys())
+              if key not in ENTITY_KINDS and old_data.get(key) != new_data.get(key)}
+    record.update({
+        "status": "changed" if old_data != new_data else "unchanged",
+        "fields": fields,
+        "entities": diff_entities(old_data, new_data),
+        "difficulty": {"old": old_result["difficulty"], "new": new_result["difficulty"]},
+        "issues": {"new": added, "resolved": resolved},
+    })
+    return record
+
+
+def diff_contents(name, old_content, new_content):
+    """diff_levels for raw file bytes (None for a missing side); the unit of work
+    for batch workers. Unparseable versions come back as an "error" record."""
+    if old_content is not None and old_content == new_content:
+        return {"level": name, "status": "unchanged"}
+    versions = []
+    for label, content in (("old", old_content), ("new", new_content)):
+        try:
+            versions.append(None if content is None else decode(content))
+        except (ValueError, UnicodeDecodeError) as e:
+            return {"level": name, "status": "error",
+                    "error": report_format.issue("error", "level-parse",
+                                                 f"Could not read the {label} {name}: {e}")}
+    return diff_levels(name, *versions)
+
+
+# ─── Git Revisions ───────────────────────────────────────────────────────────
+
+def _git(*args, stdin=None):
+    return subprocess.run(["git", "-C", REPO_ROOT, *args], input=stdin,
+                          capture_output=True, check=True).stdout
+
+
+def verify_revision(rev):
+    """Resolve rev to a commit id; raises ValueError if git doesn't know it."""
+    try:
+        return _git("rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}").decode().strip()
+    except subprocess.CalledProcessError:
+        raise ValueError(f"unknown git revision '{rev}'") from None
+
+
+def _is_level_name(name):
+    return name.startswith("world_") and name.endswith(".json")
+
+
+def revision_levels(rev):
+    """{file name: bytes} of every level in levels/json at rev (None: working tree)."""
+    if rev is None:
+        levels_dir = os.path.join(REPO_ROOT, LEVELS_GIT_DIR)
+        contents = {}
+        for name in sorted(os.listdir(levels_dir)):
+            if _is_level_name(name):
+                with open(os.path.join(levels_dir, name), "rb") as f:
+                    contents[name] = f.read()
+        return contents
+
+    listing = _git("ls-tree", "--name-only", rev, f"{LEVELS_GIT_DIR}/").decode()
+    names = [os.path.basename(path) for path in listing.splitlines()
+             if _is_level_name(os.path.basename(path))]
+    # One git process for every blob instead of one per file
+    request = "".join(f"{rev}:{LEVELS_GIT_DIR}/{name}\n" for name in names).encode()
+    output = _git("cat-file", "--batch", stdin=request)
+    contents = {}
+    offset = 0
+    for name in names:
+        header_end = output.index(b"\n", offset)
+        _, _, size = output[offset:header_end].decode().split()
+        start = header_end + 1
+        contents[name] = output[start:start + int(size)]
+        offset = start + int(size) + 1
+    return contents
+
+
+def diff_revisions(old_rev, new_rev=None, jobs=1):
+    """Yield diff records for every level changed between two revisions, in
+    name order (new_rev None: the working tree). Unchanged files are skipped
+    without decoding; the rest are spread over jobs worker processes."""
+    old, new = revision_levels(old_rev), revision_levels(new_rev)
+    work = [(name, old.get(name), new.get(name)) for name in sorted(old.keys() | new.keys())
+            if old.get(name) != new.get(name)]
+    if jobs <= 1 or len(work) < 2:
+        for item in work:
+            yield diff_contents(*item)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(jobs, len(work))
+    chunksize = max(1, len(work) // (workers * 4))
+    names, olds, news = zip(*work)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(diff_contents, names, olds, news, chunksize=chunksize)
+
+
+# ─── Report ──────────────────────────────────────────────────────────────────
+
+def _label(entity):
+    position = _position(entity)
+    at = f"({position[0]}, {position[1]})" if position is not None else "(no position)"
+    details = [str(value) for key, value in entity.items()
+               if key in ("type", "state", "size")] if isinstance(entity, dict) else []
+    return f"{at} {' '.join(details)}".rstrip()
+
+
+def _signed(delta):
+    return f"+{delta}" if delta > 0 else str(delta)
+
+
+def summarize(records):
+    """Counts over a run's diff records."""
+    counts = collections.Counter(record["status"] for record in records)
+    new_issues = [i for r in records if "issues" in r for i in r["issues"]["new"]]
+    return {
+        "levels": len(records), "changed": counts["changed"], "added": counts["added"],
+        "removed": counts["removed"], "errors": counts["error"],
+        "new_issues": len(new_issues),
+        "resolved_issues": sum(len(r["issues"]["resolved"]) for r in records if "issues" in r),
+        "new_critical": sum(1 for i in new_issues if i["severity"] == "critical"),
+    }
+
+
+def print_record(record):
+    """Text report for one diff record."""
+    status = record["status"]
+    icon = {"changed": "📝", "added": "➕", "removed": "➖", "unchanged": "✅", "error": "❌"}
+    label = "no semantic changes" if status == "unchanged" else status
+    print(f"{icon[status]} {record['level']} ({label})")
+    if status == "error":
+        print(f"   {report_format.format_issue(record['error'])}")
+        return
+    if status == "unchanged":
+        return
+
+    difficulty = record["difficulty"]
+    if difficulty["old"] is not None and difficulty["new"] is not None:
+        delta = difficulty["new"] - difficulty["old"]
+        print(f"   Difficulty: {difficulty['old']} → {difficulty['new']} ({_signed(delta)})")
+    else:
+        print(f"   Difficulty: {difficulty['old'] if difficulty['new'] is None else difficulty['new']}")
+
+    for key, change in record.get("fields", {}).items():
+        print(f"   {FIELD_LABELS.get(key, key)}: {change['old']} → {change['new']}")
+
+    for kind, change in record.get("entities", {}).items():
+        moved, added, removed = change["moved"], change["added"], change["removed"]
+        if not (moved or added or removed):
+            continue
+        print(f"   {kind}: {len(moved)} moved/changed, {len(added)} added, "
+              f"{len(removed)} removed ({change['unchanged']} unchanged)")
+        lines = []
+        for item in moved:
+            if item["from"] == item["to"]:
+                line = f"     ✎ {_label({'position': item['from']})}"
+            else:
+                line = (f"     ↔ {_label({'position': item['from']})} → "
+                        f"{_label({'position': item['to']})}")
+            edits = [f"{field}: {values['old']} → {values['new']}"
+                     for field, values in item["changed"].items()]
+            if edits:
+                line += f" [{'; '.join(edits)}]"
+            lines.append(line)
+        lines.extend(f"     + {_label(item['entity'])}" for item in added)
+        lines.extend(f"     − {_label(item['entity'])}" for item in removed)
+        for line in lines[:DETAIL_LIMIT]:
+            print(line)
+        if len(lines) > DETAIL_LIMIT:
+            print(f"     ...and {len(lines) - DETAIL_LIMIT} more")
+
+    for issue in record["issues"]["new"]:
+        print(f"   new:      {report_format.format_issue(issue)}")
+    for issue in record["issues"]["resolved"]:
+        print(f"   resolved: {report_format.format_issue(issue)}")
+
+
+def print_summary(summary):
+    print()
+    print("=" * 70)
+    print(f"  {summary['levels']} level(s) compared: {summary['changed']} changed, "
+          f"{summary['added']} added, {summary['removed']} removed"
+          + (f", {summary['errors']} unreadable" if summary["errors"] else ""))
+    print(f"  Issues: {summary['new_issues']} new, {summary['resolved_issues']} resolved")
+    if summary["new_critical"]:
+        print(f"  ❌ {summary['new_critical']} new critical issue(s)")
+    print("=" * 70)
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Semantic diff of level files: moved, added and removed entities, "
+                    "and the change in difficulty and analyzer issues.")
+    parser.add_argument(
+        "files", nargs="*", metavar="FILE",
+        help="the old and the new version of one level (JSON or binary .lvlb)")
+    parser.add_argument(
+        "--git", nargs="+", metavar="REV",
+        help=f"diff every {LEVELS_GIT_DIR} level between two git revisions "
+             "(one revision: against the working tree)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, metavar="N",
+        help="with --git, diff levels in N worker processes (0 = one per CPU)")
+    parser.add_argument(
+        "--format", choices=report_format.FORMATS, default="text",
+        help="text report (default), one JSON document, or NDJSON records")
+    args = parser.parse_args(argv)
+    if args.git and args.files:
+        parser.error("give either two FILEs or --git REV [REV], not both")
+    if args.git and len(args.git) > 2:
+        parser.error("--git takes one or two revisions")
+    if not args.git and len(args.files) != 2:
+        parser.error("give the old and new FILE, or --git REV [REV]")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    return args
+
+
+def _read_files(paths):
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    text = args.format == "text"
+    if args.git:
+        try:
+            revisions = [verify_revision(rev) for rev in args.git]
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        labels = args.git + ["working tree"] * (2 - len(args.git))
+        records = diff_revisions(*(revisions + [None] * (2 - len(revisions))), jobs=args.jobs)
+        if text:
+            print(f"Level changes: {labels[0]} → {labels[1]}\n")
+    else:
+        try:
+            old_content, new_content = _read_files(args.files)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        name = os.path.basename(args.files[1])
+        records = [diff_contents(name, old_content, new_content)]
+
+    results = []
+    for record in records:
+        results.append(record)
+        if text:
+            print_record(record)
+        elif args.format == "ndjson":
+            report_format.emit("level", record)
+
+    summary = summarize(results)
+    if text:
+        if args.git and not results:
+            print("No level files changed.")
+        else:
+            print_summary(summary)
+    elif args.format == "json":
+        report_format.write_json(report_format.document("level_diff", levels=results,
+                                                        summary=summary))
+    else:
+        report_format.emit("summary", summary)
+    return 1 if summary["new_critical"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
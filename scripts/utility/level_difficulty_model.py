@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Level Difficulty Model — Difficulty Scores Fitted from Player Analytics
+
+The analyzer's original difficulty score is a hand-weighted count:
+hazards×5 + triggers×3 − checkpoints×8 − platforms, clamped to 0-100.
+This module replaces the guessed weights with ones learned from players:
+
+  1. extract_features() walks a level once and returns a fixed-order
+     vector (FEATURES): entity counts, the gap distribution between
+     consecutive platforms, hazard density, physics triggers per state
+     and checkpoint spacing.
+  2. fit_model() fits a ridge regression from those vectors to what
+     analytics_balance_advisor aggregates per level: the failure rate
+     (1 − clears/starts) and deaths per clear relative to the advisor's
+     MAX_AVG_DEATHS. Levels are weighted by their number of starts.
+  3. The model is saved as a small JSON artifact (DEFAULT_MODEL_PATH).
+     The analyzer loads it once per process and falls back to the hand
+     weights when there is no artifact, or when it was fitted on a
+     different feature list (e.g. after adding a physics state).
+
+A score is 100 × the mean of the two predicted targets, each clipped to
+[0, 1]. Scoring a batch is one matrix product (score_matrix) with NumPy.
+Fitting needs NumPy. Single-level scoring is plain Python, so the analyzer
+loads neither NumPy nor the advisor unless it fits or reads telemetry.
+
+Usage:
+    python3 level_difficulty_model.py CACHE... [-o model.json]   # fit
+    python3 level_difficulty_model.py --store DIR                # fit from a store
+    python3 level_difficulty_model.py                            # show current scores
+"""
+
+import argparse
+import datetime
+import functools
+import hashlib
+import json
+import math
+import os
+import sys
+
+import physics_state_catalog
+from analytics_event_stream import collect_cache_paths
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVELS_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "levels", "json"))
+DEFAULT_MODEL_PATH = os.path.normpath(os.path.join(
+    LEVELS_DIR, "..", "difficulty_model.json"))
+
+MODEL_VERSION = 1
+DEFAULT_RIDGE = 1.0     # L2 penalty on standardized weights; few levels, many features
+MIN_STARTS = 10         # Levels with fewer starts are too noisy to learn from
+
+# Defaults match LevelLoader.gd when an entity omits its size
+PLATFORM_SIZE = (64, 32)
+
+TARGETS = ("failure_rate", "deaths_ratio")
+
+BASE_FEATURES = (
+    "platforms", "hazards", "triggers", "checkpoints",
+    "level_width", "hazard_density",
+    "gap_mean", "gap_p90", "gap_max", "rise_max",
+    "checkpoint_spacing_mean", "checkpoint_spacing_max",
+    "timer_triggers",
+)
+STATE_FEATURES = tuple(
+    f"state:{name}" for name in physics_state_catalog.load_physics_states()
+    if name != "Normal")
+FEATURES = BASE_FEATURES + STATE_FEATURES
+
+
+@functools.lru_cache(maxsize=None)
+def load_numpy():
+    """NumPy, imported on first use, or None when it isn't installed."""
+    try:
+        import numpy
+    except ImportError:  # Scoring falls back to plain Python; fitting is skipped
+        return None
+    return numpy
+
+
+# ─── Feature Extraction ──────────────────────────────────────────────────────
+
+def _vec2(value, default=(0.0, 0.0)):
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return float(value[0]), float(value[1])
+    return default
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def extract_features(data):
+    """Feature vector for one level, in FEATURES order.
+
+    Gaps are the horizontal distances between consecutive platforms (by
+    left edge; overlapping platforms count as 0) and rises how far each
+    next platform's top sits above the previous one. Checkpoint spacing
+    runs along x from spawn through every checkpoint to the exit.
+    """
+    platforms = data.get("platforms", [])
+    hazards = data.get("hazards", [])
+    triggers = data.get("physics_triggers", [])
+    checkpoints = data.get("checkpoints", [])
+
+    spans = []
+    for platform in platforms:
+        x, y = _vec2(platform.get("position"))
+        w, h = _vec2(platform.get("size"), PLATFORM_SIZE)
+        spans.append((x - w / 2, x + w / 2, y - h / 2))
+    spans.sort()
+
+    gaps, rise_max, reach = [], 0.0, None
+    for i, (left, right, top) in enumerate(spans):
+        if reach is not None:
+            gaps.append(max(0.0, left - reach))
+            rise_max = max(rise_max, spans[i - 1][2] - top)
+        reach = right if reach is None else max(reach, right)
+    gaps.sort()
+    width = (reach - spans[0][0]) if spans else 0.0
+
+    states = dict.fromkeys(STATE_FEATURES, 0)
+    timers = 0
+    for trigger in triggers:
+        key = f"state:{trigger.get('state', '')}"
+        if key in states:
+            states[key] += 1
+        if trigger.get("trigger_type") == "timer":
+            timers += 1
+
+    stops = sorted([_vec2(data.get("player_spawn"))[0]]
+                   + [_vec2(c.get("position"))[0] for c in checkpoints]
+                   + [_vec2(data.get("exit", {}).get("position"))[0]])
+    spacing = [b - a for a, b in zip(stops, stops[1:])]
+
+    row = [
+        len(platforms), len(hazards), len(triggers), len(checkpoints),
+        width, 1000.0 * len(hazards) / width if width else 0.0,
+        sum(gaps) / len(gaps) if gaps else 0.0, _percentile(gaps, 0.9),
+        gaps[-1] if gaps else 0.0, rise_max,
+        sum(spacing) / len(spacing) if spacing else 0.0, max(spacing, default=0.0),
+        timers,
+    ]
+    row.extend(states.values())
+    return [float(v) for v in row]
+
+
+def feature_matrix(levels):
+    """(levels × FEATURES) array for an iterable of level dicts."""
+    rows = [extract_features(data) for data in levels]
+    np = load_numpy()
+    if np is None:
+        return rows
+    return np.asarray(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+
+
+# ─── Model ───────────────────────────────────────────────────────────────────
+
+class DifficultyModel:
+    """Standardized linear model: features -> (failure rate, deaths ratio)."""
+
+    def __init__(self, features, mean, scale, weights, intercept, info=None):
+        self.features = list(features)
+        self.mean = list(mean)
+        self.scale = list(scale)
+        self.weights = [list(row) for row in weights]  # One row per target
+        self.intercept = list(intercept)
+        self.info = dict(info or {})
+
+    @classmethod
+    def from_dict(cls, doc):
+        if doc.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported difficulty model version {doc.get('version')}")
+        return cls(doc["features"], doc["mean"], doc["scale"], doc["weights"],
+                   doc["intercept"], doc.get("info"))
+
+    def to_dict(self):
+        return {"version": MODEL_VERSION, "features": self.features,
+                "targets": list(TARGETS), "mean": self.mean, "scale": self.scale,
+                "weights": self.weights, "intercept": self.intercept,
+                "info": self.info}
+
+    def predict_matrix(self, matrix):
+        """(levels × TARGETS) predictions for a feature matrix."""
+        np = load_numpy()
+        z = (np.asarray(matrix, dtype=np.float64) - self.mean) / self.scale
+        return z @ np.asarray(self.weights).T + self.intercept
+
+    def score_matrix(self, matrix):
+        """0-100 difficulty per row of a feature matrix, as ints."""
+        np = load_numpy()
+        predicted = np.clip(self.predict_matrix(matrix), 0.0, 1.0)
+        return np.rint(100.0 * predicted.mean(axis=1)).astype(int)
+
+    def predict(self, row):
+        z = [(v - m) / s for v, m, s in zip(row, self.mean, self.scale)]
+        return [b + sum(w * x for w, x in zip(ws, z))
+                for ws, b in zip(self.weights, self.intercept)]
+
+    def score(self, data):
+        """0-100 difficulty for one level dict."""
+        predicted = [min(1.0, max(0.0, p)) for p in self.predict(extract_features(data))]
+        return int(round(100.0 * sum(predicted) / len(predicted)))
+
+
+def fit_model(matrix, targets, sample_weights=None, ridge=DEFAULT_RIDGE):
+    """Weighted ridge regression of targets (levels × TARGETS) on features.
+
+    Features are standardized with weighted means and deviations, so the
+    intercept is the weighted mean target and ridge penalizes every
+    feature on the same scale. Constant features get zero weight.
+    """
+    np = load_numpy()
+    if np is None:
+        raise RuntimeError("Fitting the difficulty model needs NumPy")
+    x = np.asarray(matrix, dtype=np.float64)
+    y = np.asarray(targets, dtype=np.float64)
+    w = np.ones(len(x)) if sample_weights is None else np.asarray(sample_weights, float)
+    w = w / w.mean()
+
+    mean = np.average(x, axis=0, weights=w)
+    scale = np.sqrt(np.average((x - mean) ** 2, axis=0, weights=w))
+    scale[scale < 1e-9] = 1.0
+    intercept = np.average(y, axis=0, weights=w)
+
+    root_w = np.sqrt(w)[:, None]
+    z = (x - mean) / scale * root_w
+    centred = (y - intercept) * root_w
+    gram = z.T @ z + ridge * np.eye(x.shape[1])
+    weights = np.linalg.solve(gram, z.T @ centred).T
+
+    residual = centred - z @ weights.T
+    total = (centred ** 2).sum(axis=0)
+    r2 = [float(1.0 - r / t) if t > 0 else 0.0
+          for r, t in zip((residual ** 2).sum(axis=0), total)]
+
+    info = {"levels": len(x), "ridge": ridge, "r2": dict(zip(TARGETS, r2)),
+            "fitted": datetime.date.today().isoformat()}
+    return DifficultyModel(FEATURES, mean.tolist(), scale.tolist(), weights.tolist(),
+                           intercept.tolist(), info)
+
+
+# ─── Training Data ───────────────────────────────────────────────────────────
+
+def observed_targets(stats):
+    """(failure rate, deaths ratio) for a LevelStats from the advisor.
+
+    Deaths per clear are only known when someone cleared the level; a level
+    nobody clears counts as maximally grindy.
+    """
+    import analytics_balance_advisor as advisor  # Loads NumPy; only for fitting
+    failure = 1.0 - min(1.0, stats.completes / max(stats.starts, 1))
+    deaths = stats.avg_deaths if stats.completes else advisor.MAX_AVG_DEATHS
+    return failure, deaths / advisor.MAX_AVG_DEATHS
+
+
+def training_set(aggregate, levels_dir=LEVELS_DIR, min_starts=MIN_STARTS):
+    """(keys, level dicts, targets, weights) for levels with enough starts."""
+    from death_heatmap import load_level  # Loads NumPy; only for fitting
+    keys, levels, targets, weights = [], [], [], []
+    for key, stats in sorted(aggregate.levels.items()):
+        if stats.starts < min_starts:
+            continue
+        data = load_level(key, levels_dir)
+        if data is None:
+            continue
+        keys.append(key)
+        levels.append(data)
+        targets.append(observed_targets(stats))
+        weights.append(stats.starts)
+    return keys, levels, targets, weights
+
+
+# ─── Artifact ────────────────────────────────────────────────────────────────
+
+def save_model(model, path=DEFAULT_MODEL_PATH):
+    """Write the model artifact atomically."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, indent=1)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def model_fingerprint(path=DEFAULT_MODEL_PATH):
+    """Hash of the artifact's bytes ("none" without one), for result caches."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return "none"
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(path=DEFAULT_MODEL_PATH):
+    """The saved model, or None if it is missing, unreadable or stale."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            model = DifficultyModel.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+    if model.features != list(FEATURES):
+        return None     # Fitted on another feature list; refit before use
+    return model
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def _shipped_levels(levels_dir=LEVELS_DIR):
+    names = sorted(f for f in os.listdir(levels_dir)
+                   if f.startswith("world_") and f.endswith(".json"))
+    levels = []
+    for name in names:
+        with open(os.path.join(levels_dir, name), "r", encoding="utf-8") as f:
+            levels.append((name, json.load(f)))
+    return levels
+
+
+def _hand_score(data):
+    import level_balance_analyzer  # Imports this module; only needed for the table
+    return level_balance_analyzer.hand_difficulty_score(data)
+
+
+def print_scores(model):
+    levels = _shipped_levels()
+    if model is not None and load_numpy() is not None:
+        fitted = model.score_matrix(feature_matrix(d for _, d in levels)).tolist()
+    elif model is not None:
+        fitted = [model.score(d) for _, d in levels]
+    else:
+        fitted = [None] * len(levels)
+    print(f"  {'Level':<24} {'Hand':>5} {'Fitted':>7}")
+    print("  " + "-" * 38)
+    for (name, data), score in zip(levels, fitted):
+        shown = f"{score:>7d}" if score is not None else f"{'—':>7}"
+        print(f"  {name[:-5]:<24} {_hand_score(data):>5d} {shown}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fit level difficulty scores to player analytics.")
+    parser.add_argument(
+        "caches", nargs="*", metavar="CACHE",
+        help="analytics cache files, directories or glob patterns to fit on "
+             "(none: just print the current scores)")
+    parser.add_argument("--store", metavar="DIR",
+                        help="fit on a columnar analytics store (CACHE args are ingested first)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="read cache files in N worker processes")
+    parser.add_argument("-o", "--output", default=DEFAULT_MODEL_PATH,
+                        help=f"model artifact path (default: {DEFAULT_MODEL_PATH})")
+    parser.add_argument("--ridge", type=float, default=DEFAULT_RIDGE,
+                        help=f"L2 penalty (default: {DEFAULT_RIDGE})")
+    parser.add_argument("--min-starts", type=int, default=MIN_STARTS,
+                        help=f"skip levels with fewer starts (default: {MIN_STARTS})")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+    if args.ridge < 0:
+        parser.error("--ridge must be >= 0")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.caches and not args.store:
+        model = load_model(args.output)
+        print("Fitted model: " + (f"{args.output} ({model.info.get('levels')} levels, "
+                                  f"{model.info.get('fitted')})" if model else "none"))
+        print()
+        print_scores(model)
+        return 0
+    if load_numpy() is None:
+        print("Fitting the difficulty model needs NumPy (pip install numpy).")
+        return 1
+    import analytics_balance_advisor as advisor  # Both load NumPy; only for fitting
+    from analytics_store import AnalyticsStore
+
+    paths, missing = collect_cache_paths(args.caches)
+    for item in missing:
+        print(f"⚠️  No analytics cache matches: {item}")
+    if args.store:
+        store = AnalyticsStore(args.store)
+        store.ingest(paths, args.jobs)
+        aggregate = store.to_aggregate()
+    else:
+        aggregate = advisor.aggregate_caches(paths, args.jobs)
+
+    keys, levels, targets, weights = training_set(aggregate, min_starts=args.min_starts)
+    if len(keys) < 2:
+        print(f"Need at least 2 levels with >= {args.min_starts} starts to fit; "
+              f"found {len(keys)}.")
+        return 1
+
+    model = fit_model(feature_matrix(levels), targets, weights, args.ridge)
+    model.info["starts"] = int(sum(weights))
+    save_model(model, args.output)
+    load_model.cache_clear()
+
+    r2 = ", ".join(f"{k} {v:.2f}" for k, v in model.info["r2"].items())
+    print(f"Fitted on {len(keys)} levels ({model.info['starts']} starts); "
+          f"training R²: {r2}")
+    print(f"Saved {args.output}\n")
+    print_scores(model)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
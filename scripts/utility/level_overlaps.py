@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Level Overlaps — Sweep-Line Entity Overlaps and Physics Coverage of the Path
+
+Finds every pair of entity rectangles that overlap (with positive area) in
+the classes the analyzer cares about:
+
+  • physics trigger × physics trigger   (conflicting states)
+  • checkpoint × hazard                  (respawning into a death)
+  • checkpoint × physics trigger         (respawning inside a trigger)
+  • hazard × platform                    (spikes buried in the ground)
+
+One sweep runs left to right over the rectangles' left edges. Each kind
+keeps the rectangles the sweep line is crossing, ordered by top edge, so
+an entering rectangle only looks at the partners whose vertical extent can
+reach it: O((n + k) log n) for n rectangles and k overlaps, however many
+thousands of entities a generated level has.
+
+path_coverage() follows the path from spawn to exit and measures how much
+of it each physics state is active for, assuming the player passes through
+every trigger on the way.
+
+Rectangles come from a LevelIndex; the analyzer passes its centred index,
+which has the sizes LevelLoader.gd gives entities in game.
+"""
+
+import bisect
+import heapq
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+# (kind, kind) pairs whose overlaps are reported, in report order
+OVERLAP_CLASSES = (
+    ("physics_triggers", "physics_triggers"),
+    ("checkpoints", "hazards"),
+    ("checkpoints", "physics_triggers"),
+    ("hazards", "platforms"),
+)
+
+# The state every level starts in (LevelManager.on_level_start)
+START_STATE = "Normal"
+
+# Trigger types that fire as the player leaves the volume (the rest fire
+# on entering it; "timer" triggers after a delay the sweep ignores)
+EXIT_TRIGGER_TYPES = ("exit",)
+
+
+# ─── Sweep ───────────────────────────────────────────────────────────────────
+
+class _ActiveSet:
+    """Rectangles of one kind the sweep line is crossing, ordered by top edge."""
+
+    __slots__ = ("rects", "tallest", "keys", "expiry")
+
+    def __init__(self, rects):
+        self.rects = rects
+        self.tallest = max((r[3] - r[1] for r in rects.values()), default=0)
+        self.keys = []      # (y0, i), sorted
+        self.expiry = []    # Heap of (x1, i)
+
+    def add(self, i):
+        rect = self.rects[i]
+        bisect.insort(self.keys, (rect[1], i))
+        heapq.heappush(self.expiry, (rect[2], i))
+
+    def expire(self, x):
+        """Drop rectangles whose right edge is at or left of x."""
+        while self.expiry and self.expiry[0][0] <= x:
+            _, i = heapq.heappop(self.expiry)
+            del self.keys[bisect.bisect_left(self.keys, (self.rects[i][1], i))]
+
+    def overlapping(self, y0, y1):
+        """Indices whose vertical extent overlaps (y0, y1)."""
+        keys = self.keys
+        lo = bisect.bisect_left(keys, (y0 - self.tallest, -1))
+        hi = bisect.bisect_left(keys, (y1, -1))
+        rects = self.rects
+        return [i for _, i in keys[lo:hi] if rects[i][3] > y0]
+
+
+def find_overlaps(index, classes=OVERLAP_CLASSES):
+    """{(kind a, kind b): [(i, j), ...]} for every overlapping pair in classes.
+
+    i indexes kind a's entity list and j kind b's; same-kind pairs have
+    i < j. Each list is sorted. Rectangles that only touch don't count.
+    """
+    partners = {}
+    for a, b in classes:
+        partners.setdefault(a, set()).add(b)
+        partners.setdefault(b, set()).add(a)
+
+    rects = {}
+    events = []
+    for kind in partners:
+        rects[kind] = {}
+        for i in range(len(index.entities(kind))):
+            rect = index.rect(kind, i)
+            if rect is not None and rect[2] > rect[0] and rect[3] > rect[1]:
+                rects[kind][i] = rect
+                events.append((rect[0], kind, i))
+    events.sort()
+
+    active = {kind: _ActiveSet(kind_rects) for kind, kind_rects in rects.items()}
+    found = {pair: [] for pair in classes}
+    for x0, kind, i in events:
+        _, y0, _, y1 = rects[kind][i]
+        for other in partners[kind]:
+            others = active[other]
+            others.expire(x0)
+            for j in others.overlapping(y0, y1):
+                if (kind, other) in found:
+                    found[(kind, other)].append((min(i, j), max(i, j)) if kind == other else (i, j))
+                else:
+                    found[(other, kind)].append((j, i))
+        active[kind].add(i)
+
+    for pairs in found.values():
+        pairs.sort()
+    return found
+
+
+def overlap_area(a, b):
+    """Area shared by two (x0, y0, x1, y1) rectangles."""
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    return w * h if w > 0 and h > 0 else 0
+
+
+# ─── Coverage ────────────────────────────────────────────────────────────────
+
+def path_coverage(data, index):
+    """[{"state", "px", "share"}] of the spawn→exit path, most covered first.
+
+    The path runs along whichever axis separates spawn and exit most, so
+    climbing levels are measured bottom to top. A trigger switches the state
+    where the player first crosses it (where they leave it, for exit
+    triggers); triggers beside the path's span never fire. Returns None
+    without a spawn and an exit.
+    """
+    spawn = data.get("player_spawn")
+    exit_data = data.get("exit")
+    exit_pos = exit_data.get("position") if isinstance(exit_data, dict) else None
+    if not (isinstance(spawn, (list, tuple)) and len(spawn) == 2
+            and isinstance(exit_pos, (list, tuple)) and len(exit_pos) == 2):
+        return None
+    axis = 0 if abs(exit_pos[0] - spawn[0]) >= abs(exit_pos[1] - spawn[1]) else 1
+    sign = 1 if exit_pos[axis] >= spawn[axis] else -1
+    length = (exit_pos[axis] - spawn[axis]) * sign
+    if length <= 0:
+        return None
+
+    # Progress along the path: 0 at spawn, length at the exit
+    switches = []
+    for i, trigger in enumerate(index.entities("physics_triggers")):
+        rect = index.rect("physics_triggers", i)
+        state = trigger.get("state")
+        if rect is None or not state:
+            continue
+        near, far = sorted(((rect[axis] - spawn[axis]) * sign,
+                            (rect[axis + 2] - spawn[axis]) * sign))
+        at = far if trigger.get("trigger_type") in EXIT_TRIGGER_TYPES else near
+        if at < length and far > 0:
+            switches.append((max(at, 0), i, state))
+    switches.sort()
+
+    covered = {}
+    state, at = START_STATE, 0
+    for switch_at, _, new_state in switches:
+        covered[state] = covered.get(state, 0) + switch_at - at
+        state, at = new_state, switch_at
+    covered[state] = covered.get(state, 0) + length - at
+
+    return [{"state": name, "px": px, "share": px / length}
+            for name, px in sorted(covered.items(), key=lambda item: (-item[1], item[0]))
+            if px > 0]
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Level Profiler — Per-Check Timing for the Level Balance Analyzer
+
+A Profiler records one span per timed step: the step's name, the level it
+ran on, its wall time and how many entities it walked. The analyzer opens a
+"level" span around each file and a span per read, parse and check inside
+it; spans are plain dicts, so worker processes hand them back with their
+results.
+
+format_report() ranks the checks by total time, with call counts and the
+cost per call and per entity, and lists the slowest levels. write_trace()
+writes the Trace Event Format JSON that chrome://tracing and
+ui.perfetto.dev open, one track per process.
+
+NULL_PROFILER has the same interface and records nothing, so code paths can
+always go through a profiler at the cost of one extra call.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVEL_SPAN = "level"    # Encloses every other span of one level
+SLOWEST_LEVELS = 5
+
+
+# ─── Recording ───────────────────────────────────────────────────────────────
+
+class Profiler:
+    """Collects timed spans as {"name", "level", "start", "seconds", "entities", "pid"}."""
+
+    def __init__(self):
+        self.spans = []
+        self.pid = os.getpid()
+
+    def _record(self, name, level, entities, start):
+        self.spans.append({
+            "name": name, "level": level, "start": start,
+            "seconds": time.perf_counter() - start,
+            "entities": entities, "pid": self.pid,
+        })
+
+    @contextlib.contextmanager
+    def span(self, name, level, entities=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, level, entities, start)
+
+    def call(self, name, level, entities, fn, *args):
+        """fn(*args), recorded as one span."""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._record(name, level, entities, start)
+
+
+class _NullProfiler:
+    """A Profiler that records nothing."""
+
+    spans = ()
+
+    def span(self, name, level, entities=0):
+        return contextlib.nullcontext()
+
+    def call(self, name, level, entities, fn, *args):
+        return fn(*args)
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+# ─── Summaries ───────────────────────────────────────────────────────────────
+
+def summarize(spans):
+    """Per-step totals, slowest first, leaving out the enclosing level spans."""
+    totals = {}
+    for span in spans:
+        if span["name"] == LEVEL_SPAN:
+            continue
+        row = totals.setdefault(span["name"], {"name": span["name"], "calls": 0,
+                                               "seconds": 0.0, "entities": 0})
+        row["calls"] += 1
+        row["seconds"] += span["seconds"]
+        row["entities"] += span["entities"]
+    return sorted(totals.values(), key=lambda r: r["seconds"], reverse=True)
+
+
+def level_times(spans):
+    """(level, seconds) for every level span, slowest first."""
+    rows = [(s["level"], s["seconds"]) for s in spans if s["name"] == LEVEL_SPAN]
+    return sorted(rows, key=lambda r: r[1], reverse=True)
+
+
+def format_report(spans, slowest=SLOWEST_LEVELS):
+    """The ranked breakdown as printable lines."""
+    levels = level_times(spans)
+    wall = sum(seconds for _, seconds in levels)
+    lines = [f"  {len(levels)} level(s), {wall * 1000:.1f} ms inside the analyzer", "",
+             f"  {'Step':<28} {'Calls':>6} {'Entities':>9} {'Total ms':>9} "
+             f"{'Share':>6} {'µs/call':>9} {'µs/entity':>10}",
+             "  " + "-" * 83]
+    for row in summarize(spans):
+        share = row["seconds"] / wall if wall else 0.0
+        per_call = row["seconds"] * 1e6 / row["calls"]
+        per_entity = (f"{row['seconds'] * 1e6 / row['entities']:>10.2f}"
+                      if row["entities"] else f"{'-':>10}")
+        lines.append(f"  {row['name']:<28} {row['calls']:>6} {row['entities']:>9} "
+                     f"{row['seconds'] * 1000:>9.2f} {share:>6.0%} {per_call:>9.1f} "
+                     f"{per_entity}")
+    if levels:
+        lines += ["", "  Slowest levels:"]
+        for level, seconds in levels[:slowest]:
+            lines.append(f"    {level:<35s} {seconds * 1000:>8.2f} ms")
+    return lines
+
+
+# ─── Trace Files ─────────────────────────────────────────────────────────────
+
+def trace_events(spans):
+    """Spans as Trace Event Format complete ("X") events, in microseconds."""
+    origin = min((s["start"] for s in spans), default=0.0)
+    events = []
+    for span in spans:
+        events.append({
+            "name": span["name"],
+            "cat": "level" if span["name"] == LEVEL_SPAN else "step",
+            "ph": "X",
+            "ts": round((span["start"] - origin) * 1e6, 3),
+            "dur": round(span["seconds"] * 1e6, 3),
+            "pid": span["pid"],
+            "tid": span["pid"],
+            "args": {"level": span["level"], "entities": span["entities"]},
+        })
+    return events
+
+
+def write_trace(spans, path):
+    """Write spans as a trace file for chrome://tracing or ui.perfetto.dev."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events(spans), "displayTimeUnit": "ms"}, f)
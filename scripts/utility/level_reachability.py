@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Level Reachability — Physics-Aware Platform Graph Search
+
+Answers "can the player get from player_spawn to the exit?" using the same
+movement numbers as the game. Every physics state gets a precomputed jump
+profile (gravity, jump impulse, run speed, air jumps, wind, teleport) built
+from PlayerController.gd constants and the PhysicsState multipliers parsed
+by physics_state_catalog. A breadth-first search then walks a graph whose
+nodes are (platform, surface side, active physics state):
+
+  • Jump/fall edges exist when the closed-form jump arc for the active state
+    can cover the horizontal gap while still being at or above the target
+    surface. The arc is solved once per candidate, not simulated per frame.
+  • Walking edges switch state when a physics trigger overlaps the strip of
+    air the player occupies while walking along a platform.
+  • Arcs crossing a trigger column change the state of the landing node.
+  • A state whose gravity points away from the current surface (e.g. walking
+    into ReverseGravity) produces fall edges toward the opposite side.
+
+Geometry follows LevelLoader.gd: every position is the centre of its node.
+The model ignores collisions on the way (ceilings, walls), so it is
+optimistic: "unreachable" is a strong signal, "reachable" is not a proof.
+"""
+
+import math
+from collections import deque
+
+from level_spatial_index import CENTER, LevelIndex
+from physics_state_catalog import load_movement_constants, load_physics_states
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+PLAYER_SIZE = 32        # Player collision height (matches the analyzer)
+EXIT_HALF_SIZE = 32     # LevelLoader builds the exit as a 64×64 area
+SPAWN_HALF_HEIGHT = 16  # player_spawn is the player's centre; feet sit below it
+
+# States that zero gravity (WallWalk) stick to surfaces with their own
+# forces; model them with a tenth of base gravity, like Underwater.
+MIN_GRAVITY_SCALE = 0.1
+
+TOP, BOTTOM = 1, -1     # Surface the player stands on: top (gravity down) or bottom
+
+
+# ─── Jump Profiles ───────────────────────────────────────────────────────────
+
+def build_jump_profiles(states=None, constants=None):
+    """Precompute the arc parameters of every physics state.
+
+    Returns {state name: profile}. Heights in a profile are measured against
+    gravity, so the same formulas serve normal and reversed gravity.
+    """
+    states = states or load_physics_states()
+    constants = constants or load_movement_constants()
+
+    profiles = {}
+    for name, props in states.items():
+        scale = max(props["gravity_scale"], MIN_GRAVITY_SCALE)
+        g = constants["BASE_GRAVITY"] * scale
+        v0 = constants["BASE_JUMP_VELOCITY"] * props["jump_multiplier"]
+        jumps = 1 + props["air_jumps"]
+        wind = props["extras"].get("wind_force", (0.0, 0.0))
+        gravity_y = props["gravity_direction"][1]
+
+        profile = {
+            "g": g,
+            "v0": v0,
+            "vx": constants["BASE_SPEED"] * props["speed_multiplier"],
+            "jumps": jumps,
+            "apex": jumps * v0 * v0 / (2 * g),
+            "coyote": constants["COYOTE_TIME"],
+            "wind_x": wind[0] if isinstance(wind, tuple) else 0.0,
+            "teleport": props["extras"].get("TELEPORT_DISTANCE", 0.0),
+            "side": BOTTOM if gravity_y < 0 else TOP,
+            "death_y": constants["DEATH_FALL_Y"],
+        }
+        profile["kinematics"] = tuple(sorted(profile.items()))
+        profiles[name] = profile
+    return profiles
+
+
+def latest_time_at_height(profile, dh, jumps):
+    """Latest time the player can still be at least dh above the takeoff point.
+
+    jumps counts the jump impulses available (0 for a plain fall). Chained
+    air jumps are taken at each apex. Returns None if dh is out of reach.
+    """
+    g, v0 = profile["g"], profile["v0"]
+    if jumps == 0:
+        return math.sqrt(-2 * dh / g) if dh <= 0 else None
+
+    chained = jumps - 1
+    base = chained * v0 * v0 / (2 * g)
+    disc = v0 * v0 - 2 * g * (dh - base)
+    if disc < 0:
+        return None
+    return chained * v0 / g + (v0 + math.sqrt(disc)) / g
+
+
+def horizontal_reach(profile, dh, jumps, direction, grounded):
+    """Max horizontal distance covered while ending at height dh, or -1.
+
+    direction is +1 (moving right) or -1 (moving left), for wind.
+    """
+    vx = profile["vx"]
+    reach = -1.0
+
+    t = latest_time_at_height(profile, dh, jumps)
+    if t is not None:
+        drift = 0.5 * profile["wind_x"] * t * t * direction
+        reach = max(0.0, vx * t + drift)
+        if grounded:
+            reach += vx * profile["coyote"]
+
+    # TeleportJump replaces the ground jump: blink up (or diagonally) then fall
+    distance = profile["teleport"]
+    if distance and grounded:
+        g = profile["g"]
+        diagonal = distance / math.sqrt(2)
+        if dh <= diagonal:
+            reach = max(reach, diagonal + vx * math.sqrt(2 * (diagonal - dh) / g))
+        if dh <= distance:
+            reach = max(reach, vx * math.sqrt(2 * (distance - dh) / g))
+
+    return reach
+
+
+# ─── Solver ──────────────────────────────────────────────────────────────────
+
+class ReachabilitySolver:
+    """Breadth-first search over (platform, side, state) nodes for one level."""
+
+    def __init__(self, data, index=None, profiles=None):
+        self.data = data
+        if index is None or index.anchor != CENTER:
+            index = LevelIndex(data, anchor=CENTER)
+        self.index = index
+        self.profiles = profiles or build_jump_profiles()
+
+        self.rects = {}
+        for i in range(len(self.index.entities("platforms"))):
+            rect = self.index.rect("platforms", i)
+            if rect is not None:
+                self.rects[i] = rect
+
+        # Trigger index → state, for triggers naming a known state
+        self.trigger_states = {}
+        for i, trigger in enumerate(self.index.entities("physics_triggers")):
+            state = trigger.get("state") if isinstance(trigger, dict) else None
+            if self.index.rect("physics_triggers", i) is not None and state in self.profiles:
+                self.trigger_states[i] = state
+
+        self._arc_cache = {}
+        self._gap_triggers = {}
+
+        if self.rects:
+            self.min_y = min(r[1] for r in self.rects.values())
+            self.max_y = max(r[3] for r in self.rects.values())
+        else:
+            self.min_y = self.max_y = 0
+
+        exit_pos = data.get("exit", {}).get("position") if isinstance(
+            data.get("exit"), dict) else None
+        self.exit_pos = exit_pos if isinstance(exit_pos, list) and len(exit_pos) == 2 else None
+
+    # ─── Geometry ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def surface_y(rect, side):
+        return rect[1] if side == TOP else rect[3]
+
+    def _height_above(self, y_start, y_target, profile):
+        """Height of y_target above y_start, measured against gravity."""
+        return (y_start - y_target) if profile["side"] == TOP else (y_target - y_start)
+
+    def _triggers_in(self, x0, y0, x1, y1):
+        """Triggers overlapping a rectangle, as (rect, state) in x order."""
+        return [(self.index.rect("physics_triggers", i), self.trigger_states[i])
+                for i in self.index.query_x_span("physics_triggers", x0, x1, y0, y1)
+                if i in self.trigger_states]
+
+    def _crossings(self, x0, x1, y_lo, y_hi, direction):
+        """Triggers an arc through a gap region switches through.
+
+        Returns (forced, optional): triggers spanning the arc's whole vertical
+        extent can't be jumped around, so the last one crossed is forced;
+        partial overlaps are optional.
+        """
+        if x1 < x0:
+            return None, ()
+        column = self._gap_triggers.get((x0, x1))
+        if column is None:
+            column = self._gap_triggers[(x0, x1)] = self._triggers_in(
+                x0, -math.inf, x1, math.inf)
+        crossed = [t for t in column if t[0][1] <= y_hi and t[0][3] >= y_lo]
+        if direction < 0:
+            crossed.reverse()
+
+        forced = None
+        optional = set()
+        for rect, trigger_state in crossed:
+            if rect[1] <= y_lo and rect[3] >= y_hi:
+                forced = trigger_state
+            else:
+                optional.add(trigger_state)
+        return forced, tuple(sorted(optional))
+
+    # ─── Search ──────────────────────────────────────────────────────────
+
+    def _arcs(self, x0, x1, y_start, profile, jumps, grounded, skip):
+        """Landable platforms from a span, as (q, forced, optional) tuples.
+
+        Depends only on the profile's kinematics, so states that move alike
+        (Normal, ZeroFriction, InvertedControls, ...) share one computation.
+        """
+        key = (x0, x1, y_start, profile["kinematics"], jumps, grounded, skip)
+        cached = self._arc_cache.get(key)
+        if cached is not None:
+            return cached
+
+        arcs = []
+        self._arc_cache[key] = arcs
+        side = profile["side"]
+        apex = profile["apex"] if jumps else 0.0
+
+        if side == TOP:
+            y_lo, y_hi = y_start - apex - profile["teleport"], min(self.max_y, profile["death_y"])
+            dh_min = y_start - y_hi
+        else:
+            y_lo, y_hi = self.min_y, y_start + apex + profile["teleport"]
+            dh_min = y_lo - y_start
+        if y_hi < y_lo:
+            return arcs
+
+        # Widest reach is downwind
+        downwind = -1 if profile["wind_x"] < 0 else 1
+        reach = horizontal_reach(profile, dh_min, jumps, downwind, grounded)
+        if reach < 0:
+            return arcs
+
+        for q in self.index.query_x_span("platforms", x0 - reach, x1 + reach, y_lo, y_hi):
+            if q == skip or q not in self.rects:
+                continue
+            rect = self.rects[q]
+            y_target = self.surface_y(rect, side)
+            dh = self._height_above(y_start, y_target, profile)
+            if side == TOP and y_target > profile["death_y"]:
+                continue
+
+            if rect[0] > x1:
+                gap, direction, gx0, gx1 = rect[0] - x1, 1, x1, rect[0]
+            elif rect[2] < x0:
+                gap, direction, gx0, gx1 = x0 - rect[2], -1, rect[2], x0
+            else:
+                gap, direction = 0.0, 1
+                gx0, gx1 = max(x0, rect[0]), min(x1, rect[2])
+
+            if horizontal_reach(profile, dh, jumps, direction, grounded) < gap:
+                continue
+
+            top = min(y_start, y_target) - (apex if side == TOP else 0)
+            bottom = max(y_start, y_target) + (apex if side == BOTTOM else 0)
+            forced, optional = self._crossings(gx0, gx1, top, bottom, direction)
+            arcs.append((q, forced, optional))
+        return arcs
+
+    def _hops(self, x0, x1, y_start, state, jumps, grounded, skip):
+        """Yield (platform, side, state) reachable by one arc from a span."""
+        profile = self.profiles[state]
+        side = profile["side"]
+        for q, forced, optional in self._arcs(x0, x1, y_start, profile, jumps, grounded, skip):
+            yield q, side, forced or state
+            for trigger_state in optional:
+                yield q, side, trigger_state
+
+    def _reaches_exit(self, x0, x1, y_start, state, jumps, grounded):
+        """True if an arc from the span can touch the exit area."""
+        if self.exit_pos is None:
+            return False
+        ex, ey = self.exit_pos
+        profile = self.profiles[state]
+        gap = max(0.0, x0 - ex, ex - x1) - EXIT_HALF_SIZE
+        # Feet must rise until the player's head touches the exit's near edge
+        dh = self._height_above(y_start, ey, profile) - EXIT_HALF_SIZE - PLAYER_SIZE
+        if gap <= 0 and dh <= 0:
+            return True
+        direction = 1 if ex >= x1 else -1
+        return horizontal_reach(profile, dh, jumps, direction, grounded) >= max(gap, 0.0)
+
+    def solve(self):
+        """Search from player_spawn; return the reachability summary.
+
+        Result keys: exit_reachable, reached_platforms (set of indices),
+        path (list of (platform, state) from spawn to the exit, or []),
+        states_used (set of state names seen on reached nodes).
+        """
+        spawn = self.data.get("player_spawn")
+        result = {"exit_reachable": False, "reached_platforms": set(),
+                  "path": [], "states_used": set()}
+        if not (isinstance(spawn, list) and len(spawn) == 2) or "Normal" not in self.profiles:
+            return result
+
+        sx, sy = spawn[0], spawn[1] + SPAWN_HALF_HEIGHT
+        parents = {}
+        queue = deque()
+
+        def visit(node, parent):
+            if node not in parents:
+                parents[node] = parent
+                queue.append(node)
+
+        # The player drops in at the spawn point with no jump in hand
+        goal = None
+        if self._reaches_exit(sx, sx, sy, "Normal", 0, False):
+            goal = "spawn"
+        for node in self._hops(sx, sx, sy, "Normal", 0, False, None):
+            visit(node, None)
+
+        while queue and goal is None:
+            node = queue.popleft()
+            p, side, state = node
+            rect = self.rects[p]
+            profile = self.profiles[state]
+            y = self.surface_y(rect, side)
+
+            if profile["side"] == side:
+                # Resting on this surface: jump, or walk into triggers
+                jumps, grounded = profile["jumps"], True
+                band = (y - PLAYER_SIZE, y) if side == TOP else (y, y + PLAYER_SIZE)
+                for _, trigger_state in self._triggers_in(rect[0], band[0], rect[2], band[1]):
+                    visit((p, side, trigger_state), node)
+            else:
+                # Gravity now points away from this surface: the player falls off it
+                jumps, grounded = max(0, profile["jumps"] - 1), False
+
+            if self._reaches_exit(rect[0], rect[2], y, state, jumps, grounded):
+                goal = node
+                break
+            for succ in self._hops(rect[0], rect[2], y, state, jumps, grounded, p):
+                visit(succ, node)
+
+        result["reached_platforms"] = {n[0] for n in parents}
+        result["states_used"] = {"Normal"} | {n[2] for n in parents}
+        if goal is not None:
+            result["exit_reachable"] = True
+            path = []
+            node = goal if goal != "spawn" else None
+            while node is not None:
+                path.append((node[0], node[2]))
+                node = parents[node]
+            result["path"] = path[::-1]
+        return result
+
+
+def solve_reachability(data, index=None, profiles=None):
+    """Convenience wrapper: build a solver for one level and run it."""
+    return ReachabilitySolver(data, index, profiles).solve()
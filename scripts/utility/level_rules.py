@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Level Rules — Registry of Level Checks and the Derived Data They Share
+
+Each check registers as a rule that names the derived data it needs: the
+spatial index, the reachability result, the sorted safe points and so on.
+Derived data registers the same way, naming its own inputs. The analyzer
+runs the selected rules in registration order through a LevelContext,
+which computes each piece of derived data the first time a rule asks for
+it, dependencies first, and shares it with every later rule. A run that
+selects only cheap rules never builds what they don't use.
+
+    registry = RuleRegistry()
+
+    @registry.derive("index")
+    def build_index(data):
+        return LevelIndex(data)
+
+    @registry.rule("spawn-safety", needs=("index",), entities="hazards")
+    def analyze_spawn_safety(data, index=None):
+        ...
+
+Rule and derived functions receive the level dict plus one keyword argument
+per name in needs, and stay plain functions that can be called directly.
+
+Derived data may also declare the top-level level keys it reads, directly
+or through its needs. A context built with previous= (watch mode, after an
+edit) reuses the previous value of anything whose keys compare equal, so
+moving a hazard doesn't redo the reachability search.
+"""
+
+_MISSING = object()
+
+# ─── Registry ────────────────────────────────────────────────────────────────
+
+class Rule:
+    """One registered check: fn(data, **needs) -> list of issues (see report_format)."""
+
+    __slots__ = ("name", "fn", "needs", "entities", "description", "keys")
+
+    def __init__(self, name, fn, needs, entities, description, keys=None):
+        self.name = name
+        self.fn = fn
+        self.needs = needs
+        self.entities = entities
+        self.description = description
+        self.keys = keys
+
+
+class RuleRegistry:
+    """Rules and derived data, in registration order."""
+
+    def __init__(self):
+        self.rules = {}
+        self.derived = {}
+
+    def _check_needs(self, name, needs):
+        for need in needs:
+            if need not in self.derived:
+                raise ValueError(f"'{name}' needs unregistered derived data '{need}'")
+
+    def derive(self, name, needs=(), entities="all", keys=None):
+        """Register fn(data, **needs) as the derived data `name`.
+
+        Needs must already be registered, so dependencies can't form a cycle.
+        keys lists every level key the value depends on (None: the whole level).
+        """
+        needs = tuple(needs)
+        self._check_needs(name, needs)
+        keys = tuple(keys) if keys is not None else None
+
+        def register(fn):
+            self.derived[name] = Rule(name, fn, needs, entities, _summary(fn), keys)
+            return fn
+        return register
+
+    def rule(self, name, needs=(), entities="all"):
+        """Register fn(data, **needs) as the rule `name`."""
+        needs = tuple(needs)
+        self._check_needs(name, needs)
+
+        def register(fn):
+            if name in self.rules:
+                raise ValueError(f"Rule '{name}' is already registered")
+            self.rules[name] = Rule(name, fn, needs, entities, _summary(fn))
+            return fn
+        return register
+
+    def names(self):
+        return list(self.rules)
+
+    def select(self, only=None, skip=()):
+        """Rules named in `only` (default: all) minus `skip`, in registration order.
+
+        Raises ValueError naming the first unknown rule.
+        """
+        for name in list(only or ()) + list(skip):
+            if name not in self.rules:
+                raise ValueError(f"unknown rule '{name}' (choose from {', '.join(self.rules)})")
+        wanted = set(only) if only else set(self.rules)
+        wanted.difference_update(skip)
+        return [rule for name, rule in self.rules.items() if name in wanted]
+
+    def requirements(self, rules):
+        """Derived data the rules need, each after its own dependencies."""
+        order = []
+
+        def visit(name):
+            if name in order:
+                return
+            for need in self.derived[name].needs:
+                visit(need)
+            order.append(name)
+
+        for rule in rules:
+            for need in rule.needs:
+                visit(need)
+        return order
+
+
+def _summary(fn):
+    doc = (fn.__doc__ or "").strip()
+    return doc.splitlines()[0] if doc else fn.__name__
+
+
+# ─── Evaluation ──────────────────────────────────────────────────────────────
+
+class LevelContext:
+    """Derived data for one level, computed on first use and then shared.
+
+    `timed(name, entities, fn, *args)` wraps every computation, so a
+    profiler's call() can record each derived value and rule as a step.
+    With a previous context of the same level, values whose keys are
+    unchanged are taken over instead (their names collect in `reused`).
+    Drop `previous` once the rules have run so old levels can be freed.
+    """
+
+    def __init__(self, registry, data, timed=None, previous=None):
+        self.registry = registry
+        self.data = data
+        self.values = {}
+        self.timed = timed or _untimed
+        self.previous = previous
+        self.reused = []
+
+    def _unchanged(self, derived):
+        if self.previous is None or derived.keys is None:
+            return False
+        if derived.name not in self.previous.values:
+            return False
+        old = self.previous.data
+        return all(self.data.get(key, _MISSING) == old.get(key, _MISSING)
+                   for key in derived.keys)
+
+    def get(self, name):
+        if name not in self.values:
+            derived = self.registry.derived[name]
+            if self._unchanged(derived):
+                self.values[name] = self.previous.values[name]
+                self.reused.append(name)
+                return self.values[name]
+            kwargs = {need: self.get(need) for need in derived.needs}
+            self.values[name] = self.timed(f"derive {name}", derived.entities,
+                                           _call, derived.fn, self.data, kwargs)
+        return self.values[name]
+
+    def computed(self, name):
+        """Derived data some rule already asked for, or None (never computes it)."""
+        return self.values.get(name)
+
+    def run(self, rule):
+        """Issues from one rule, with its derived data filled in and its name
+        recorded on each issue."""
+        kwargs = {need: self.get(need) for need in rule.needs}
+        issues = self.timed(rule.name, rule.entities, _call, rule.fn, self.data, kwargs)
+        for record in issues:
+            record.setdefault("rule", rule.name)
+        return issues
+
+    def run_all(self, rules):
+        issues = []
+        for rule in rules:
+            issues.extend(self.run(rule))
+        return issues
+
+
+def _call(fn, data, kwargs):
+    return fn(data, **kwargs)
+
+
+def _untimed(name, entities, fn, *args):
+    return fn(*args)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Level Schema — One Declarative Level Schema, Compiled Once
+
+levels/schema/level_schema.json describes what a level file may contain.
+LevelValidator.gd reads the same file in the game, so the analyzer, the
+generator pipeline and the in-game check can never disagree. Physics state
+names are not listed there: "enum_source": "physics_states" resolves to the
+scripts in scripts/physics_states/*.gd (via physics_state_catalog here, via
+PhysicsManager's registry in Godot).
+
+Schema nodes use a small vocabulary:
+
+  type          object | array | string | number | boolean | vec2 ([x, y])
+  required      object keys that must be present
+  properties    per-key child schemas (unlisted keys are allowed)
+  items         child schema for every array element
+  min_items     minimum array length
+  min_length    minimum string length
+  enum          allowed string values
+  enum_source   named set of allowed values ("physics_states")
+  minimum       smallest allowed number
+  positive      vec2 components must both be > 0 (sizes)
+  message       replaces the default text of this node's own errors
+  critical      this node's own errors are critical (e.g. missing level_id)
+
+compile_schema() turns the tree into nested closures once. Every compiled
+node has an allocation-free accept test, ok(value), and a reporting walk,
+collect(value, path, errors). validate() only runs the walk when the fast
+test fails, and the walk reports every error in the level, each with its
+JSON path ("$.physics_triggers[3].state").
+"""
+
+import functools
+import json
+import os
+
+import physics_state_catalog
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+SCHEMA_PATH = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "levels", "schema", "level_schema.json"))
+
+ROOT_PATH = "$"
+
+_NUMBER_TYPES = frozenset((int, float))     # bool is deliberately excluded
+_MISSING = object()
+
+TYPE_LABELS = {
+    "object": "an object", "array": "an array", "string": "a string",
+    "number": "a number", "boolean": "true or false", "vec2": "[x, y]",
+}
+
+
+# ─── Schema Loading ──────────────────────────────────────────────────────────
+
+def load_schema(path=SCHEMA_PATH):
+    """Parsed schema JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def default_enum_sources():
+    """Named value sets the schema may refer to through enum_source."""
+    return {"physics_states": frozenset(physics_state_catalog.load_physics_states())}
+
+
+# ─── Compilation ─────────────────────────────────────────────────────────────
+
+class SchemaNode:
+    """A compiled schema node: ok(value) -> bool, collect(value, path, errors)."""
+
+    __slots__ = ("ok", "collect")
+
+    def __init__(self, ok, collect):
+        self.ok = ok
+        self.collect = collect
+
+
+def _reporter(node):
+    """Append one error for this node, honouring its message/critical flags."""
+    message = node.get("message")
+    critical = bool(node.get("critical", False))
+
+    def report(errors, path, text, value=_MISSING):
+        if message:
+            text = message if value is _MISSING else f"{message} '{value}'"
+        errors.append({"path": path, "message": text, "critical": critical})
+    return report
+
+
+def _compile_object(node, sources):
+    report = _reporter(node)
+    required = tuple(node.get("required", ()))
+    children = tuple((key, _compile(child, sources))
+                     for key, child in node.get("properties", {}).items())
+    checks = tuple((key, child.ok) for key, child in children)
+
+    def ok(value):
+        if type(value) is not dict:
+            return False
+        for key in required:
+            if key not in value:
+                return False
+        for key, child_ok in checks:
+            item = value.get(key, _MISSING)
+            if item is not _MISSING and not child_ok(item):
+                return False
+        return True
+
+    def collect(value, path, errors):
+        if type(value) is not dict:
+            report(errors, path, f"expected {TYPE_LABELS['object']}")
+            return
+        for key in required:
+            if key not in value:
+                report(errors, f"{path}.{key}", "missing required field")
+        for key, child in children:
+            item = value.get(key, _MISSING)
+            if item is not _MISSING:
+                child.collect(item, f"{path}.{key}", errors)
+
+    return SchemaNode(ok, collect)
+
+
+def _compile_array(node, sources):
+    report = _reporter(node)
+    min_items = node.get("min_items", 0)
+    items = _compile(node["items"], sources) if "items" in node else None
+    item_ok = items.ok if items else None
+
+    def ok(value):
+        if type(value) is not list or len(value) < min_items:
+            return False
+        if item_ok is not None:
+            for item in value:
+                if not item_ok(item):
+                    return False
+        return True
+
+    def collect(value, path, errors):
+        if type(value) is not list:
+            report(errors, path, f"expected {TYPE_LABELS['array']}")
+            return
+        if len(value) < min_items:
+            report(errors, path, f"needs at least {min_items} item(s)")
+        if items is not None:
+            for i, item in enumerate(value):
+                items.collect(item, f"{path}[{i}]", errors)
+
+    return SchemaNode(ok, collect)
+
+
+def _compile_string(node, sources):
+    report = _reporter(node)
+    min_length = node.get("min_length", 0)
+    allowed = None
+    if "enum" in node:
+        allowed = frozenset(node["enum"])
+    if "enum_source" in node:
+        source = node["enum_source"]
+        if source not in sources:
+            raise ValueError(f"Unknown enum_source '{source}' in level schema")
+        allowed = frozenset(sources[source]) | (allowed or frozenset())
+
+    def ok(value):
+        return (type(value) is str and len(value) >= min_length
+                and (allowed is None or value in allowed))
+
+    def collect(value, path, errors):
+        if type(value) is not str:
+            report(errors, path, f"expected {TYPE_LABELS['string']}")
+        elif len(value) < min_length:
+            report(errors, path, f"must be at least {min_length} character(s)")
+        elif allowed is not None and value not in allowed:
+            if len(allowed) <= 5:
+                text = f"'{value}' is not one of {', '.join(sorted(allowed))}"
+            else:
+                text = f"unknown value '{value}'"
+            report(errors, path, text, value)
+
+    return SchemaNode(ok, collect)
+
+
+def _compile_number(node, sources):
+    report = _reporter(node)
+    minimum = node.get("minimum")
+
+    def ok(value):
+        return (type(value) in _NUMBER_TYPES
+                and (minimum is None or value >= minimum))
+
+    def collect(value, path, errors):
+        if type(value) not in _NUMBER_TYPES:
+            report(errors, path, f"expected {TYPE_LABELS['number']}")
+        elif minimum is not None and value < minimum:
+            report(errors, path, f"must be >= {minimum}")
+
+    return SchemaNode(ok, collect)
+
+
+def _compile_boolean(node, sources):
+    report = _reporter(node)
+
+    def ok(value):
+        return type(value) is bool
+
+    def collect(value, path, errors):
+        if type(value) is not bool:
+            report(errors, path, f"expected {TYPE_LABELS['boolean']}")
+
+    return SchemaNode(ok, collect)
+
+
+def _compile_vec2(node, sources):
+    report = _reporter(node)
+    positive = bool(node.get("positive", False))
+
+    def ok(value):
+        if (type(value) is not list or len(value) != 2
+                or type(value[0]) not in _NUMBER_TYPES
+                or type(value[1]) not in _NUMBER_TYPES):
+            return False
+        return not positive or (value[0] > 0 and value[1] > 0)
+
+    def collect(value, path, errors):
+        if not ok(value):
+            text = "must be [x, y] with both > 0" if positive else "must be [x, y]"
+            report(errors, path, text)
+
+    return SchemaNode(ok, collect)
+
+
+_COMPILERS = {
+    "object": _compile_object,
+    "array": _compile_array,
+    "string": _compile_string,
+    "number": _compile_number,
+    "boolean": _compile_boolean,
+    "vec2": _compile_vec2,
+}
+
+
+def _compile(node, sources):
+    kind = node.get("type")
+    if kind not in _COMPILERS:
+        raise ValueError(f"Unsupported type '{kind}' in level schema")
+    return _COMPILERS[kind](node, sources)
+
+
+class LevelSchema:
+    """A level schema compiled into a validator."""
+
+    def __init__(self, schema, sources):
+        self.version = schema.get("schema_version")
+        self.root = _compile(schema, sources)
+
+    def is_valid(self, data):
+        return self.root.ok(data)
+
+    def validate(self, data):
+        """Every schema error in data as {"path", "message", "critical"} dicts."""
+        if self.root.ok(data):
+            return []
+        errors = []
+        self.root.collect(data, ROOT_PATH, errors)
+        return errors
+
+
+def compile_schema(schema=None, sources=None):
+    """Compile a schema dict (default: the shipped schema) into a LevelSchema."""
+    if schema is None:
+        schema = load_schema()
+    if sources is None:
+        sources = default_enum_sources()
+    return LevelSchema(schema, sources)
+
+
+@functools.lru_cache(maxsize=None)
+def default_schema():
+    """The shipped schema compiled against the shipped physics states."""
+    return compile_schema()
+
+
+def validate_level(data):
+    """Schema errors for a parsed level, checked against the shipped schema."""
+    return default_schema().validate(data)
+
+
+def format_error(error):
+    """One issue line in the analyzer's style."""
+    prefix = "❌ CRITICAL: " if error["critical"] else "❌ "
+    return f"{prefix}{error['path']}: {error['message']}"
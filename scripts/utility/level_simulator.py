@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Level Simulator — Headless Batch Playthroughs with NumPy
+
+Steps thousands of bot players through a level at once, each agent a row in
+a set of NumPy arrays, using the per-frame integration of
+PlayerController._physics_process at Godot's 60 Hz physics tick:
+
+  1. fall death below DEATH_FALL_Y
+  2. gravity (direction × scale × BASE_GRAVITY) in the air, coyote timer,
+     and the BouncyPhysics branch (velocity.reflect(UP) × bounce on floor)
+  3. the state's update_physics() (wind, DoubleJump re-arming)
+  4. move_toward acceleration / friction, reversed and delayed controls
+  5. jumps through the state's handle_jump() (default, DoubleJump, TeleportJump)
+  6. move_and_slide against the platforms, with a 1 px floor snap
+  7. hazards, physics triggers (enter / exit / timer, with delays) and the exit
+
+Engine.time_scale (SlowMotion, FastForward) scales each tick's delta, and
+time-to-exit is measured like LevelManager.level_timer, in scaled seconds.
+
+A few places follow what the scripts intend rather than the current build:
+PlayerController never calls current_state.update_physics(), hazards are
+Area2Ds that its slide-collision check can't see, and up_direction stays UP
+under ReverseGravity. The simulator applies update_physics() every tick,
+kills on hazard overlap and treats the side gravity pulls toward as the
+floor, like the reachability solver. Behaviour that lives only in update_physics() node code
+(RandomDirection, SizeChange, PhaseThrough, MagnetPlatforms, WallWalk) is
+modelled by the state's properties alone.
+
+Bots are simple and randomized per agent: run toward the exit, jump near
+platform edges, at walls and at random, steer onto the nearest reachable
+platform mid-air, get used to reversed controls after a moment, and
+hesitate now and then. The
+completion rate is therefore "how often a so-so player clears this in one
+life", useful for comparing levels rather than as an absolute.
+
+BatchPhysics holds the per-tick physics on its own, so other tools can
+drive it with their own inputs (level_trace_solver searches over them).
+
+Geometry follows LevelLoader.gd: every position is the centre of its node.
+"""
+
+import zlib
+
+from level_spatial_index import CENTER, LevelIndex, entity_rect
+from physics_state_catalog import load_movement_constants, load_physics_states
+
+try:
+    import numpy as np
+except ImportError:  # simulate_level() raises; callers check AVAILABLE
+    np = None
+
+AVAILABLE = np is not None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+PHYSICS_FPS = 60
+DEFAULT_AGENTS = 1000
+MAX_LEVEL_TIME = 60.0       # Scaled seconds before an attempt counts as a timeout
+
+PLAYER_HALF_W = 8           # TestLevel.gd's player capsule: radius 8, height 32
+PLAYER_HALF_H = 16
+FLOOR_SNAP = 1.0            # CharacterBody2D.floor_snap_length default
+EPSILON = 1e-6
+
+TRIGGER_TYPES = {"enter": 0, "exit": 1, "timer": 2}
+TIMER_MIN_WAIT = 0.1        # PhysicsTrigger._start_timer: delay or 0.1 s
+
+# Outcome codes
+RUNNING, CLEARED, FELL, HAZARD, TIMEOUT = range(5)
+OUTCOME_NAMES = {CLEARED: "cleared", FELL: "fall", HAZARD: "hazard", TIMEOUT: "timeout"}
+
+# Bot personality ranges, drawn per agent
+BOT_EDGE_LOOKAHEAD = (4.0, 48.0)    # Jump this close to a platform's edge (px)
+BOT_RANDOM_JUMP = (0.0, 0.02)       # Chance per frame of a jump for no reason
+BOT_HESITATE = (0.0, 0.05)          # Chance per frame of letting go of the stick
+BOT_AIR_JUMP = (0.02, 0.2)          # Chance per falling frame of an air jump
+BOT_AIM_DEPTH = (0.15, 0.6)         # How far onto the landing platform to aim
+BOT_REACTION = (0.2, 0.8)           # Seconds to adapt to reversed controls
+
+
+# ─── State Table ─────────────────────────────────────────────────────────────
+
+class StateTable:
+    """Per-state properties as arrays indexed by state id."""
+
+    def __init__(self, states=None):
+        states = states or load_physics_states()
+        self.names = sorted(states)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        def column(fn, dtype=np.float64):
+            return np.array([fn(states[n]) for n in self.names], dtype=dtype)
+
+        def extra(props, key, default):
+            value = props["extras"].get(key, default)
+            return value if not isinstance(value, str) else default
+
+        self.gravity_x = column(lambda p: p["gravity_direction"][0] * p["gravity_scale"])
+        self.gravity_y = column(lambda p: p["gravity_direction"][1] * p["gravity_scale"])
+        self.friction = column(lambda p: p["friction"])
+        self.bounce = column(lambda p: p["bounce"])
+        self.speed = column(lambda p: p["speed_multiplier"])
+        self.jump = column(lambda p: p["jump_multiplier"])
+        self.reversed = column(lambda p: bool(p["controls_reversed"]), bool)
+        self.delay_frames = column(
+            lambda p: round(p["input_delay"] * PHYSICS_FPS), np.int64)
+        self.time_scale = column(lambda p: p["time_scale"])
+        self.wind_x = column(lambda p: extra(p, "wind_force", (0.0, 0.0))[0])
+        self.wind_y = column(lambda p: extra(p, "wind_force", (0.0, 0.0))[1])
+        self.teleport = column(lambda p: extra(p, "TELEPORT_DISTANCE", 0.0))
+        self.double_jump = column(lambda p: p["air_jumps"] > 0, bool)
+
+
+# ─── Level Geometry ──────────────────────────────────────────────────────────
+
+def _rect_arrays(rects):
+    rects = [r for r in rects if r is not None]
+    if not rects:
+        return np.zeros((4, 0))
+    return np.array(rects, dtype=np.float64).T
+
+
+class SimLevel:
+    """Level geometry as flat arrays (x0, y0, x1, y1 rows) for one JSON level."""
+
+    def __init__(self, data, table):
+        index = LevelIndex(data, anchor=CENTER)
+        self.platforms = _rect_arrays(
+            [index.rect("platforms", i) for i in range(index.count("platforms"))])
+        self.hazards = _rect_arrays(
+            [index.rect("hazards", i) for i in range(index.count("hazards"))])
+
+        rects, states, kinds, delays = [], [], [], []
+        for i, trigger in enumerate(index.entities("physics_triggers")):
+            rect = index.rect("physics_triggers", i)
+            state = trigger.get("state", "Normal") if isinstance(trigger, dict) else None
+            if rect is None or state not in table.ids:
+                continue
+            rects.append(rect)
+            states.append(table.ids[state])
+            kinds.append(TRIGGER_TYPES.get(trigger.get("trigger_type", "enter"), 0))
+            delay = trigger.get("delay", 0.0)
+            delays.append(float(delay) if isinstance(delay, (int, float)) else 0.0)
+        self.triggers = _rect_arrays(rects)
+        self.trigger_states = np.array(states, dtype=np.int64)
+        self.trigger_kinds = np.array(kinds, dtype=np.int64)
+        self.trigger_delays = np.array(delays, dtype=np.float64)
+
+        self.exit = entity_rect(data.get("exit"), CENTER, kind="exit")
+        spawn = data.get("player_spawn")
+        self.spawn = tuple(spawn) if isinstance(spawn, list) and len(spawn) == 2 else None
+
+
+# ─── Helpers ─────────────────────────────────────────────────────────────────
+
+def _move_toward(value, target, step):
+    """Vectorized Godot move_toward()."""
+    diff = target - value
+    return np.where(np.abs(diff) <= step, target, value + np.sign(diff) * step)
+
+
+def _overlaps(x, y, rects, half_w=PLAYER_HALF_W, half_h=PLAYER_HALF_H):
+    """[agents, rects] bool matrix: player box at (x, y) overlaps each rect."""
+    if rects.shape[1] == 0:
+        return np.zeros((x.size, 0), dtype=bool)
+    return ((x[:, None] + half_w > rects[0]) & (x[:, None] - half_w < rects[2]) &
+            (y[:, None] + half_h > rects[1]) & (y[:, None] - half_h < rects[3]))
+
+
+def _ray_hit_distance(ox, oy, dx, dy, length, rects):
+    """Distance along each ray to the first platform it enters (inf if none)."""
+    if rects.shape[1] == 0:
+        return np.full(ox.size, np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_x = 1.0 / dx[:, None]
+        inv_y = 1.0 / dy[:, None]
+        tx0 = (rects[0] - ox[:, None]) * inv_x
+        tx1 = (rects[2] - ox[:, None]) * inv_x
+        ty0 = (rects[1] - oy[:, None]) * inv_y
+        ty1 = (rects[3] - oy[:, None]) * inv_y
+        # Axis-parallel rays: inside the slab means (-inf, inf), outside never hits
+        tx_lo = np.where(dx[:, None] == 0,
+                         np.where((ox[:, None] > rects[0]) & (ox[:, None] < rects[2]),
+                                  -np.inf, np.inf),
+                         np.minimum(tx0, tx1))
+        tx_hi = np.where(dx[:, None] == 0, np.inf, np.maximum(tx0, tx1))
+        ty_lo = np.where(dy[:, None] == 0,
+                         np.where((oy[:, None] > rects[1]) & (oy[:, None] < rects[3]),
+                                  -np.inf, np.inf),
+                         np.minimum(ty0, ty1))
+        ty_hi = np.where(dy[:, None] == 0, np.inf, np.maximum(ty0, ty1))
+    t_enter = np.maximum(tx_lo, ty_lo)
+    t_exit = np.minimum(tx_hi, ty_hi)
+    hit = (t_enter <= t_exit) & (t_enter >= 0) & (t_enter <= length)
+    return np.where(hit, t_enter, np.inf).min(axis=1)
+
+
+# ─── Physics ─────────────────────────────────────────────────────────────────
+
+class Agents:
+    """Player state for a batch of agents: one row per agent in every array."""
+
+    def __init__(self, arrays):
+        self.__dict__.update(arrays)
+
+    def __len__(self):
+        return self.x.size
+
+    def take(self, rows):
+        """New batch with the given rows (index array or bool mask)."""
+        return Agents({name: value[rows] for name, value in vars(self).items()})
+
+    @staticmethod
+    def concat(batches):
+        names = vars(batches[0])
+        return Agents({name: np.concatenate([getattr(b, name) for b in batches])
+                       for name in names})
+
+
+class BatchPhysics:
+    """PlayerController._physics_process for many players at once.
+
+    spawn() creates agents at player_spawn; step() advances them one physics
+    tick given each agent's stick direction (Input.get_axis) and whether jump
+    was just pressed. Callers decide inputs and when to stop.
+    """
+
+    def __init__(self, data, table=None, constants=None):
+        if np is None:
+            raise RuntimeError("level_simulator needs NumPy (pip install numpy)")
+        self.table = table or StateTable()
+        self.constants = constants or load_movement_constants()
+        self.level = SimLevel(data, self.table)
+        level = self.level
+        self.playable = (level.spawn is not None and level.exit is not None and
+                         "Normal" in self.table.ids)
+        if level.exit is not None:
+            self.exit_rect = np.array(level.exit, dtype=np.float64).reshape(4, 1)
+        self.history_len = int(self.table.delay_frames.max()) + 1
+
+    def spawn(self, n):
+        level = self.level
+        n_triggers = level.triggers.shape[1]
+        return Agents({
+            "x": np.full(n, float(level.spawn[0])),
+            "y": np.full(n, float(level.spawn[1])),
+            "vx": np.zeros(n),
+            "vy": np.zeros(n),
+            "on_floor": np.zeros(n, dtype=bool),
+            "coyote": np.zeros(n),
+            "state": np.full(n, self.table.ids["Normal"], dtype=np.int64),
+            "can_double": np.zeros(n, dtype=bool),
+            "timer": np.zeros(n),                   # LevelManager.level_timer
+            "state_frames": np.zeros(n, dtype=np.int64),
+            "support": np.full(n, -1, dtype=np.int64),  # Platform stood on
+            "blocked": np.zeros(n, dtype=bool),     # Ran into a wall on the floor
+            "jumped": np.zeros(n, dtype=bool),      # Normal jump this tick
+            "dir_history": np.zeros((n, self.history_len)),
+            "jump_history": np.zeros((n, self.history_len), dtype=bool),
+            "inside": np.zeros((n, n_triggers), dtype=bool),
+            "triggered": np.zeros((n, n_triggers), dtype=bool),
+            "trigger_timer": np.full((n, n_triggers), np.inf),  # Timer-type countdowns
+            "pending_time": np.full(n, np.inf),     # Delayed set_state()
+            "pending_state": np.zeros(n, dtype=np.int64),
+        })
+
+    def gravity(self, agents):
+        """Gravity vector (px/s²) per agent."""
+        base = self.constants["BASE_GRAVITY"]
+        return (self.table.gravity_x[agents.state] * base,
+                self.table.gravity_y[agents.state] * base)
+
+    def step(self, a, stick, jump_pressed):
+        """Advance agents one tick in place; returns per-agent outcome codes.
+
+        RUNNING for agents still playing, else CLEARED, FELL or HAZARD.
+        """
+        table, level, c = self.table, self.level, self.constants
+        plat = level.platforms
+        n = len(a)
+        delta = (1.0 / PHYSICS_FPS) * table.time_scale[a.state]
+        finished = np.zeros(n, dtype=np.int64)
+
+        # ── Death detection ──
+        finished[a.y > c["DEATH_FALL_Y"]] = FELL
+
+        # ── Gravity / coyote / bounce ──
+        gx, gy = self.gravity(a)
+        g_len = np.hypot(gx, gy)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            nx = np.where(g_len > 0, gx / g_len, 0.0)
+            ny = np.where(g_len > 0, gy / g_len, 0.0)
+        air = ~a.on_floor
+        vx = np.where(air, a.vx + gx * delta, a.vx)
+        vy = np.where(air, a.vy + gy * delta, a.vy)
+        a.coyote = np.where(air, np.maximum(0.0, a.coyote - delta), c["COYOTE_TIME"])
+        bounce = table.bounce[a.state]
+        bouncing = a.on_floor & (vx * nx + vy * ny > 0) & (bounce > 0)
+        # Godot 4: v.reflect(UP) = 2 * UP * v.dot(UP) - v = (-vx, vy)
+        vx = np.where(bouncing, -vx * bounce, vx)
+        vy = np.where(bouncing, vy * bounce, vy)
+
+        # ── update_physics(): wind, DoubleJump re-arm ──
+        vx += table.wind_x[a.state] * delta
+        vy += table.wind_y[a.state] * delta
+        a.can_double |= a.on_floor & table.double_jump[a.state]
+
+        # ── Input, through the delay queue ──
+        a.dir_history = np.roll(a.dir_history, 1, axis=1)
+        a.jump_history = np.roll(a.jump_history, 1, axis=1)
+        a.dir_history[:, 0] = np.where(table.reversed[a.state], -stick, stick)
+        a.jump_history[:, 0] = jump_pressed
+        delay = table.delay_frames[a.state]
+        rows = np.arange(n)
+        ready = a.state_frames >= delay
+        input_dir = np.where(delay > 0, np.where(ready, a.dir_history[rows, delay], 0.0),
+                             a.dir_history[:, 0])
+        jump_now = np.where(delay > 0, ready & a.jump_history[rows, delay], jump_pressed)
+
+        # ── Horizontal movement ──
+        accel = c["ACCELERATION"]
+        target = input_dir * c["BASE_SPEED"] * table.speed[a.state]
+        step = np.where(a.on_floor, accel, accel * 0.5 * delta)
+        decel = accel * (1.0 + table.friction[a.state]) * delta
+        vx = np.where(input_dir != 0, _move_toward(vx, target, step),
+                      _move_toward(vx, 0.0, decel))
+
+        # ── Jump (handle_jump) ──
+        is_double = table.double_jump[a.state]
+        can_jump = jump_now & (a.on_floor | (a.coyote > 0) | is_double)
+        air_double = can_jump & is_double & ~a.on_floor
+        jumping = can_jump & (~is_double | a.on_floor | a.can_double)
+        a.can_double &= ~air_double
+        teleporting = jumping & (table.teleport[a.state] > 0)
+        a.jumped = jumping & ~teleporting
+        jv = c["BASE_JUMP_VELOCITY"] * table.jump[a.state]
+        vx = np.where(a.jumped, vx - nx * jv, vx)
+        vy = np.where(a.jumped, vy - ny * jv, vy)
+        x, y = a.x, a.y
+        if teleporting.any():
+            t = np.flatnonzero(teleporting)
+            axis = stick[t]         # Input.get_axis(), not reversed or delayed
+            norm = np.hypot(axis, 1.0)
+            dx, dy = axis / norm, -1.0 / norm
+            distance = table.teleport[a.state[t]]
+            hit = _ray_hit_distance(x[t], y[t], dx, dy, distance, plat)
+            travel = np.where(np.isfinite(hit), hit - 10.0, distance)
+            x = x.copy()
+            y = y.copy()
+            x[t] += dx * travel
+            y[t] += dy * travel
+            vy[t] = 0.0
+        a.coyote = np.where(can_jump, 0.0, a.coyote)
+
+        # ── move_and_slide ──
+        was_on_floor = a.on_floor
+        blocked = np.zeros(n, dtype=bool)
+        new_x = x + vx * delta
+        if plat.shape[1]:
+            rows_y = ((y[:, None] + PLAYER_HALF_H > plat[1] + EPSILON) &
+                      (y[:, None] - PLAYER_HALF_H < plat[3] - EPSILON))
+            right = rows_y & (vx[:, None] > 0) & \
+                (x[:, None] + PLAYER_HALF_W <= plat[0] + EPSILON) & \
+                (new_x[:, None] + PLAYER_HALF_W > plat[0])
+            left = rows_y & (vx[:, None] < 0) & \
+                (x[:, None] - PLAYER_HALF_W >= plat[2] - EPSILON) & \
+                (new_x[:, None] - PLAYER_HALF_W < plat[2])
+            stop_r = np.where(right, plat[0] - PLAYER_HALF_W, np.inf).min(axis=1)
+            stop_l = np.where(left, plat[2] + PLAYER_HALF_W, -np.inf).max(axis=1)
+            hit_x = np.isfinite(stop_r) | np.isfinite(stop_l)
+            new_x = np.minimum(new_x, stop_r)
+            new_x = np.maximum(new_x, stop_l)
+            blocked = hit_x & was_on_floor
+            vx = np.where(hit_x, 0.0, vx)
+        x = new_x
+
+        new_y = y + vy * delta
+        on_floor = np.zeros(n, dtype=bool)
+        support = np.full(n, -1, dtype=np.int64)
+        if plat.shape[1]:
+            # The floor is whichever side gravity pulls toward (zero gravity: down)
+            floor_down = (ny >= 0)[:, None]
+            snap = FLOOR_SNAP * was_on_floor[:, None]
+            cols_x = ((x[:, None] + PLAYER_HALF_W > plat[0] + EPSILON) &
+                      (x[:, None] - PLAYER_HALF_W < plat[2] - EPSILON))
+            down = cols_x & (vy[:, None] >= 0) & \
+                (y[:, None] + PLAYER_HALF_H <= plat[1] + EPSILON) & \
+                (new_y[:, None] + PLAYER_HALF_H + snap * floor_down >= plat[1])
+            up = cols_x & (vy[:, None] <= 0) & \
+                (y[:, None] - PLAYER_HALF_H >= plat[3] - EPSILON) & \
+                (new_y[:, None] - PLAYER_HALF_H - snap * ~floor_down <= plat[3])
+            top_y = np.where(down, plat[1] - PLAYER_HALF_H, np.inf)
+            bottom_y = np.where(up, plat[3] + PLAYER_HALF_H, -np.inf)
+            stop_down = top_y.min(axis=1)
+            stop_up = bottom_y.max(axis=1)
+            hit_down = np.isfinite(stop_down)
+            hit_up = np.isfinite(stop_up)
+            new_y = np.where(hit_down, stop_down, new_y)
+            new_y = np.where(hit_up, stop_up, new_y)
+            on_floor = np.where(floor_down[:, 0], hit_down, hit_up)
+            support = np.where(floor_down[:, 0], top_y.argmin(axis=1), bottom_y.argmax(axis=1))
+            support = np.where(on_floor, support, -1)
+            vy = np.where(hit_down | hit_up, 0.0, vy)
+        a.x, a.y, a.vx, a.vy = x, new_y, vx, vy
+        a.on_floor, a.support, a.blocked = on_floor, support, blocked
+
+        # ── Hazards (Area2D overlap) ──
+        if level.hazards.shape[1]:
+            hurt = _overlaps(a.x, a.y, level.hazards).any(axis=1)
+            finished[(finished == RUNNING) & hurt] = HAZARD
+
+        # ── Physics triggers ──
+        a.timer = a.timer + delta
+        a.state_frames = a.state_frames + 1
+        if level.triggers.shape[1]:
+            self._run_triggers(a)
+
+        # ── Exit ──
+        at_exit = _overlaps(a.x, a.y, self.exit_rect)[:, 0] & (finished == RUNNING)
+        finished[at_exit] = CLEARED
+        return finished
+
+    def _set_state(self, a, mask, new_state):
+        changed = mask & (a.state != new_state)
+        a.state = np.where(changed, new_state, a.state)
+        a.state_frames = np.where(changed, 0, a.state_frames)
+
+    def _run_triggers(self, a):
+        """PhysicsTrigger enter / exit / timer handling, including delays."""
+        level = self.level
+        now_inside = _overlaps(a.x, a.y, level.triggers)
+        entered = now_inside & ~a.inside
+        exited = a.inside & ~now_inside
+        for k in range(level.triggers.shape[1]):
+            kind = level.trigger_kinds[k]
+            delay = level.trigger_delays[k]
+            if kind == TRIGGER_TYPES["enter"]:
+                fire = entered[:, k] & ~a.triggered[:, k]
+            elif kind == TRIGGER_TYPES["exit"]:
+                fire = exited[:, k]
+            else:
+                start = entered[:, k] & ~a.triggered[:, k]
+                a.trigger_timer[start, k] = a.timer[start] + max(delay, TIMER_MIN_WAIT)
+                a.trigger_timer[exited[:, k], k] = np.inf
+                fire = a.timer >= a.trigger_timer[:, k]
+                a.trigger_timer[fire, k] = np.inf
+            if delay > 0:
+                a.pending_time = np.where(fire, a.timer + delay, a.pending_time)
+                a.pending_state = np.where(fire, level.trigger_states[k], a.pending_state)
+            else:
+                self._set_state(a, fire, level.trigger_states[k])
+            a.triggered[:, k] |= fire
+            a.triggered[exited[:, k], k] = False
+        a.inside = now_inside
+        due = a.timer >= a.pending_time
+        if due.any():
+            self._set_state(a, due, a.pending_state)
+            a.pending_time = np.where(due, np.inf, a.pending_time)
+
+
+# ─── Bots ────────────────────────────────────────────────────────────────────
+
+def _pick_landing(x, y, heading, support, jump_v, gravity_y, plat):
+    """Nearest platform ahead whose surface a jump from (x, y) can reach, or -1."""
+    with np.errstate(divide="ignore"):
+        apex = np.where(gravity_y != 0, jump_v ** 2 / (2 * np.abs(gravity_y)), np.inf)
+    feet = np.where(gravity_y >= 0, y + PLAYER_HALF_H, -(y - PLAYER_HALF_H))
+    surface = np.where((gravity_y >= 0)[:, None], plat[1], -plat[3])
+    reachable = ((surface >= feet[:, None] - apex[:, None]) &
+                 (np.arange(plat.shape[1]) != support[:, None]))
+    right = reachable & (plat[0] >= x[:, None] - PLAYER_HALF_W)
+    left = reachable & (plat[2] <= x[:, None] + PLAYER_HALF_W)
+    ahead = np.where(heading[:, None] >= 0,
+                     np.where(right, plat[0] - x[:, None], np.inf),
+                     np.where(left, x[:, None] - plat[2], np.inf))
+    best = ahead.argmin(axis=1)
+    return np.where(np.isfinite(ahead[np.arange(x.size), best]), best, -1)
+
+
+def _platform_below(x, y, plat):
+    """Platform each point would drop onto under normal gravity, or -1."""
+    under = ((plat[0] < x + PLAYER_HALF_W) & (plat[2] > x - PLAYER_HALF_W) &
+             (plat[1] >= y + PLAYER_HALF_H - EPSILON))
+    if not under.any():
+        return -1
+    return int(np.where(under, plat[1], np.inf).argmin())
+
+
+class Bots:
+    """Randomized bot players driving a batch of agents (see module docstring)."""
+
+    def __init__(self, physics, n, rng):
+        self.physics = physics
+        level = physics.level
+        plat = level.platforms
+        self.lookahead = rng.uniform(*BOT_EDGE_LOOKAHEAD, n)
+        self.random_jump = rng.uniform(*BOT_RANDOM_JUMP, n)
+        self.hesitate = rng.uniform(*BOT_HESITATE, n)
+        self.air_jump = rng.uniform(*BOT_AIR_JUMP, n)
+        self.aim_depth = rng.uniform(*BOT_AIM_DEPTH, n)
+        self.reaction = np.round(rng.uniform(*BOT_REACTION, n) * PHYSICS_FPS)
+        self.jump_held = np.zeros(n, dtype=bool)
+        self.landing = np.full(n, -1, dtype=np.int64)   # Platform aimed for mid-jump
+        if plat.shape[1]:
+            self.landing[:] = _platform_below(level.spawn[0], level.spawn[1], plat)
+        self.exit_x = (level.exit[0] + level.exit[2]) / 2
+        self.exit_y = (level.exit[1] + level.exit[3]) / 2
+        self.rng = rng
+
+    def keep(self, rows):
+        for name in ("lookahead", "random_jump", "hesitate", "air_jump", "aim_depth",
+                     "reaction", "jump_held", "landing"):
+            setattr(self, name, getattr(self, name)[rows])
+
+    def inputs(self, a):
+        """(stick, jump_pressed) for this tick."""
+        table = self.physics.table
+        plat = self.physics.level.platforms
+        n = len(a)
+        self.heading = np.sign(self.exit_x - a.x)
+        self.heading[self.heading == 0] = 1.0
+        intent = self.heading.copy()
+        aiming = (self.landing >= 0) & ~a.on_floor
+        if aiming.any():
+            # Steer onto the platform picked at take-off
+            t = self.landing[aiming]
+            depth = self.aim_depth[aiming] * (plat[2, t] - plat[0, t])
+            aim = np.where(self.heading[aiming] >= 0, plat[0, t] + depth, plat[2, t] - depth)
+            offset = aim - a.x[aiming]
+            intent[aiming] = np.where(np.abs(offset) > 4.0, np.sign(offset), 0.0)
+        intent[self.rng.random(n) < self.hesitate] = 0.0
+        # Bots learn reversed controls after a moment in the state
+        adapted = table.reversed[a.state] & (a.state_frames >= self.reaction)
+        stick = np.where(adapted, -intent, intent)
+
+        grounded = a.on_floor | (a.coyote > 0)
+        edge = np.full(n, np.inf)
+        standing = a.support >= 0
+        if plat.shape[1] and standing.any():
+            s = a.support[standing]
+            edge[standing] = np.where(self.heading[standing] >= 0,
+                                      plat[2, s] - (a.x[standing] + PLAYER_HALF_W),
+                                      (a.x[standing] - PLAYER_HALF_W) - plat[0, s])
+        exit_above = (self.exit_y < a.y - 2 * PLAYER_HALF_H) & (np.abs(self.exit_x - a.x) < 96)
+        want_jump = grounded & ((edge < self.lookahead) | a.blocked | exit_above |
+                                (self.rng.random(n) < self.random_jump))
+        want_jump |= (~grounded & table.double_jump[a.state] & a.can_double &
+                      (a.vy > 0) & (self.rng.random(n) < self.air_jump))
+        pressed = want_jump & ~self.jump_held
+        self.jump_held = want_jump
+        return stick, pressed
+
+    def after_step(self, a):
+        """Pick landing platforms for agents that just jumped."""
+        plat = self.physics.level.platforms
+        if plat.shape[1] and a.jumped.any():
+            j = a.jumped
+            jv = self.physics.constants["BASE_JUMP_VELOCITY"] * self.physics.table.jump[a.state[j]]
+            _, gy = self.physics.gravity(a.take(j))
+            self.landing[j] = _pick_landing(a.x[j], a.y[j], self.heading[j],
+                                            a.support[j], jv, gy, plat)
+        self.landing[a.on_floor] = -1
+
+
+# ─── Simulation ──────────────────────────────────────────────────────────────
+
+def _level_seed(data):
+    return zlib.crc32(str(data.get("level_id", data.get("title", ""))).encode("utf-8"))
+
+
+def max_frames_for(table, max_time=MAX_LEVEL_TIME):
+    """Ticks needed for max_time scaled seconds in the slowest time_scale."""
+    return int(max_time * PHYSICS_FPS / max(table.time_scale.min(), 0.01)) + 1
+
+
+def simulate_level(data, agents=DEFAULT_AGENTS, seed=None, max_time=MAX_LEVEL_TIME,
+                   table=None, constants=None):
+    """Run `agents` one-life bot attempts on a level.
+
+    Returns {"agents", "cleared", "completion_rate", "outcomes" (name -> count),
+    "exit_times" (sorted scaled seconds of the clears), "time_p50", "time_p90",
+    "frames"}. Deterministic for a given seed (default: derived from level_id).
+    """
+    physics = BatchPhysics(data, table, constants)
+    outcomes = np.full(agents, RUNNING, dtype=np.int64)
+    exit_times = np.full(agents, np.nan)
+    if not physics.playable:
+        outcomes[:] = TIMEOUT
+        return _summarize(outcomes, exit_times, 0)
+
+    rng = np.random.default_rng(_level_seed(data) if seed is None else seed)
+    batch = physics.spawn(agents)
+    bots = Bots(physics, agents, rng)
+    ids = np.arange(agents)     # Row -> agent, as finished rows are dropped
+
+    frames = 0
+    max_frames = max_frames_for(physics.table, max_time)
+    while ids.size and frames < max_frames:
+        frames += 1
+        stick, pressed = bots.inputs(batch)
+        finished = physics.step(batch, stick, pressed)
+        bots.after_step(batch)
+
+        cleared = finished == CLEARED
+        exit_times[ids[cleared]] = batch.timer[cleared]
+        finished[(finished == RUNNING) & (batch.timer > max_time)] = TIMEOUT
+
+        done = finished != RUNNING
+        if done.any():
+            outcomes[ids[done]] = finished[done]
+            keep = ~done
+            ids = ids[keep]
+            batch = batch.take(keep)
+            bots.keep(keep)
+
+    outcomes[ids] = TIMEOUT
+    return _summarize(outcomes, exit_times, frames)
+
+
+def _summarize(outcomes, exit_times, frames):
+    agents = outcomes.size
+    cleared = int(np.count_nonzero(outcomes == CLEARED))
+    times = np.sort(exit_times[outcomes == CLEARED])
+    return {
+        "agents": agents,
+        "cleared": cleared,
+        "completion_rate": cleared / agents if agents else 0.0,
+        "outcomes": {name: int(np.count_nonzero(outcomes == code))
+                     for code, name in OUTCOME_NAMES.items()},
+        "exit_times": times.tolist(),
+        "time_p50": float(np.percentile(times, 50)) if cleared else None,
+        "time_p90": float(np.percentile(times, 90)) if cleared else None,
+        "frames": frames,
+    }
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Level Spatial Index — Shared Geometry Lookups for the Python Level Tools
+
+Buckets every platform, hazard, physics trigger and checkpoint rectangle of a
+level into a uniform grid so range and nearest-neighbour queries only touch
+the cells around the query instead of rescanning every entity.
+
+A rectangle covering more than MAX_ENTITY_CELLS cells (a runaway size from
+a generator bug) stays out of the grid; every query scans those few
+directly, so one huge platform can't blow up the build.
+
+Build it once per level and hand it to every check:
+
+    index = LevelIndex(data)
+    index.query_radius("hazards", x, y, 50)
+    index.nearest("platforms", x, y)
+"""
+
+import bisect
+import math
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+# Grid cell size in pixels. Roughly a screen-width quarter: small enough that a
+# radius query touches a handful of cells, large enough that a typical
+# platform only lands in one or two.
+CELL_SIZE = 256
+
+# Rectangles spanning more grid cells than this are scanned, not bucketed
+MAX_ENTITY_CELLS = 256
+
+# Entity lists indexed from the level JSON
+ENTITY_KINDS = ("platforms", "hazards", "physics_triggers", "checkpoints")
+
+# How `position` maps to a rectangle. The analyzer's checks have always read
+# it as the top-left corner; LevelLoader.gd centres every node on it.
+TOP_LEFT = "top_left"
+CENTER = "center"
+
+# Sizes LevelLoader.gd gives entities in game (used with CENTER anchoring)
+GAME_SIZES = {
+    "platforms": (64, 32),          # default when "size" is missing
+    "physics_triggers": (64, 64),   # default when "size" is missing
+    "hazards": (32, 32),            # always
+    "checkpoints": (32, 64),        # always
+    "exit": (64, 64),               # always
+}
+
+
+# ─── Geometry Helpers ────────────────────────────────────────────────────────
+
+def entity_rect(entity, anchor=TOP_LEFT, kind=None):
+    """Return the (x0, y0, x1, y1) bounds of a level entity, or None.
+
+    With TOP_LEFT anchoring, entities without a size (hazards, checkpoints)
+    are points. With CENTER anchoring they get their in-game size.
+    """
+    if not isinstance(entity, dict):
+        return None
+    position = entity.get("position")
+    if not isinstance(position, (list, tuple)) or len(position) != 2:
+        return None
+
+    x, y = position
+    if anchor == CENTER:
+        default = GAME_SIZES.get(kind, (0, 0))
+        size = entity.get("size", default) if kind in ("platforms", "physics_triggers") else default
+        if not isinstance(size, (list, tuple)) or len(size) != 2:
+            size = default
+        w, h = abs(size[0]) / 2, abs(size[1]) / 2
+        return (x - w, y - h, x + w, y + h)
+
+    size = entity.get("size", [0, 0])
+    if not isinstance(size, (list, tuple)) or len(size) != 2:
+        size = [0, 0]
+    w, h = size
+    return (min(x, x + w), min(y, y + h), max(x, x + w), max(y, y + h))
+
+
+def point_rect_distance(x, y, rect):
+    """Euclidean distance from a point to the closest point of a rectangle."""
+    x0, y0, x1, y1 = rect
+    dx = max(0, x0 - x, x - x1)
+    dy = max(0, y0 - y, y - y1)
+    return math.sqrt(dx * dx + dy * dy)
+
+
+# ─── Index ───────────────────────────────────────────────────────────────────
+
+class LevelIndex:
+    """Uniform-grid spatial index over one level's entity rectangles."""
+
+    def __init__(self, data, cell_size=CELL_SIZE, anchor=TOP_LEFT):
+        self.cell_size = cell_size
+        self.anchor = anchor
+        self._entities = {}
+        self._rects = {}
+        self._grids = {}
+        self._bounds = {}
+        self._sorted_x = {}
+        self._spans = {}
+        self._oversized = {}
+
+        for kind in ENTITY_KINDS:
+            entities = data.get(kind, [])
+            if not isinstance(entities, list):
+                entities = []
+            self._entities[kind] = entities
+
+            rects = {}
+            grid = {}
+            oversized = []
+            for i, entity in enumerate(entities):
+                rect = entity_rect(entity, anchor, kind)
+                if rect is None:
+                    continue
+                rects[i] = rect
+                cx0, cy0 = self._cell(rect[0], rect[1])
+                cx1, cy1 = self._cell(rect[2], rect[3])
+                if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > MAX_ENTITY_CELLS:
+                    oversized.append(i)
+                    continue
+                for cx in range(cx0, cx1 + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        grid.setdefault((cx, cy), []).append(i)
+
+            self._rects[kind] = rects
+            self._grids[kind] = grid
+            self._oversized[kind] = oversized
+            if grid:
+                cells = grid.keys()
+                self._bounds[kind] = (
+                    min(c[0] for c in cells), min(c[1] for c in cells),
+                    max(c[0] for c in cells), max(c[1] for c in cells),
+                )
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    # ─── Accessors ───────────────────────────────────────────────────────
+
+    def entities(self, kind):
+        """The raw entity list for a kind, as it appears in the level JSON."""
+        return self._entities[kind]
+
+    def rect(self, kind, i):
+        """Bounds of entity i, or None if it has no usable position."""
+        return self._rects[kind].get(i)
+
+    def count(self, kind):
+        """Number of indexed (well-formed) entities of a kind."""
+        return len(self._rects[kind])
+
+    def sorted_by_x(self, kind):
+        """Entities ordered by their position x (stable, like sorted())."""
+        order = self._x_order(kind)
+        entities = self._entities[kind]
+        return [entities[i] for _, i in order]
+
+    def _x_order(self, kind):
+        if kind not in self._sorted_x:
+            entities = self._entities[kind]
+            self._sorted_x[kind] = sorted(
+                ((entities[i]["position"][0], i) for i in self._rects[kind]),
+            )
+        return self._sorted_x[kind]
+
+    def _span_order(self, kind):
+        """(left edges sorted, indices in that order, widest entity width)."""
+        if kind not in self._spans:
+            rects = self._rects[kind]
+            order = sorted(rects, key=lambda i: (rects[i][0], i))
+            widest = max((rects[i][2] - rects[i][0] for i in order), default=0)
+            self._spans[kind] = ([rects[i][0] for i in order], order, widest)
+        return self._spans[kind]
+
+    # ─── Queries ─────────────────────────────────────────────────────────
+
+    def count_x_range(self, kind, lo, hi):
+        """Count entities whose position x lies strictly between lo and hi."""
+        order = self._x_order(kind)
+        left = bisect.bisect_right(order, (lo, math.inf))
+        right = bisect.bisect_left(order, (hi, -math.inf))
+        return max(0, right - left)
+
+    def query_x_span(self, kind, x0, x1, y0=-math.inf, y1=math.inf):
+        """Indices of entities overlapping [x0, x1] (and [y0, y1]), left to right.
+
+        A bisect over left edges instead of a grid walk: cheaper than
+        query_rect for the wide, short windows of horizontal sweeps.
+        """
+        lefts, order, widest = self._span_order(kind)
+        rects = self._rects[kind]
+        lo = bisect.bisect_left(lefts, x0 - widest)
+        hi = bisect.bisect_right(lefts, x1)
+        hits = []
+        for i in order[lo:hi]:
+            rx0, ry0, rx1, ry1 = rects[i]
+            if rx1 >= x0 and ry0 <= y1 and ry1 >= y0:
+                hits.append(i)
+        return hits
+
+    def query_rect(self, kind, x0, y0, x1, y1):
+        """Indices (ascending) of entities whose bounds touch the rectangle."""
+        grid = self._grids[kind]
+        rects = self._rects[kind]
+        found = set()
+        for i in self._oversized[kind]:
+            rx0, ry0, rx1, ry1 = rects[i]
+            if rx0 <= x1 and rx1 >= x0 and ry0 <= y1 and ry1 >= y0:
+                found.add(i)
+        if not grid:
+            return sorted(found)
+        bx0, by0, bx1, by1 = self._bounds[kind]
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+
+        for cx in range(max(cx0, bx0), min(cx1, bx1) + 1):
+            for cy in range(max(cy0, by0), min(cy1, by1) + 1):
+                for i in grid.get((cx, cy), ()):
+                    if i in found:
+                        continue
+                    rx0, ry0, rx1, ry1 = rects[i]
+                    if rx0 <= x1 and rx1 >= x0 and ry0 <= y1 and ry1 >= y0:
+                        found.add(i)
+        return sorted(found)
+
+    def query_radius(self, kind, x, y, radius):
+        """Indices (ascending) of entities within radius of a point."""
+        rects = self._rects[kind]
+        return [
+            i for i in self.query_rect(kind, x - radius, y - radius,
+                                       x + radius, y + radius)
+            if point_rect_distance(x, y, rects[i]) <= radius
+        ]
+
+    def nearest(self, kind, x, y, metric=None):
+        """Return (index, distance) of the entity closest to a point.
+
+        metric(entity) may replace the default point-to-rectangle distance,
+        as long as it never returns less than that distance (the ring search
+        uses it as the lower bound for stopping). Returns (None, inf) when the
+        kind has no entities.
+        """
+        grid = self._grids[kind]
+        rects = self._rects[kind]
+        entities = self._entities[kind]
+
+        best_i, best_d = None, math.inf
+        for i in self._oversized[kind]:
+            d = point_rect_distance(x, y, rects[i]) if metric is None else metric(entities[i])
+            if best_i is None or d < best_d or (d == best_d and i < best_i):
+                best_i, best_d = i, d
+        if not grid:
+            return best_i, best_d
+        bx0, by0, bx1, by1 = self._bounds[kind]
+        cs = self.cell_size
+        cx, cy = self._cell(x, y)
+        seen = set()
+
+        # Rings closer than the populated bounds are empty; start at the edge.
+        ring = max(0, bx0 - cx, cx - bx1, by0 - cy, cy - by1)
+        while True:
+            for cell in self._ring_cells(cx, cy, ring, self._bounds[kind]):
+                for i in grid.get(cell, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    if metric is None:
+                        d = point_rect_distance(x, y, rects[i])
+                    else:
+                        d = metric(entities[i])
+                    if best_i is None or d < best_d or (d == best_d and i < best_i):
+                        best_i, best_d = i, d
+
+            covers_all = (cx - ring <= bx0 and cx + ring >= bx1 and
+                          cy - ring <= by0 and cy + ring >= by1)
+            if covers_all:
+                break
+            # Anything not seen yet lies entirely outside the searched square.
+            margin = min(x - (cx - ring) * cs, (cx + ring + 1) * cs - x,
+                         y - (cy - ring) * cs, (cy + ring + 1) * cs - y)
+            if best_d <= margin:
+                break
+            ring += 1
+
+        return best_i, best_d
+
+    @staticmethod
+    def _ring_cells(cx, cy, ring, bounds):
+        """Cells at Chebyshev distance `ring` from (cx, cy), clipped to bounds."""
+        bx0, by0, bx1, by1 = bounds
+        if ring == 0:
+            if bx0 <= cx <= bx1 and by0 <= cy <= by1:
+                yield (cx, cy)
+            return
+        x_lo, x_hi = max(cx - ring, bx0), min(cx + ring, bx1)
+        for y in (cy - ring, cy + ring):
+            if by0 <= y <= by1:
+                for x in range(x_lo, x_hi + 1):
+                    yield (x, y)
+        y_lo, y_hi = max(cy - ring + 1, by0), min(cy + ring - 1, by1)
+        for x in (cx - ring, cx + ring):
+            if bx0 <= x <= bx1:
+                for y in range(y_lo, y_hi + 1):
+                    yield (x, y)
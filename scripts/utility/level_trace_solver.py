@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Level Trace Solver — Shortest Input Sequences from Spawn to Exit
+
+A best-first (A*) search over player states, stepped with the headless
+simulator's BatchPhysics so a trace replays exactly in level_simulator and
+closely in the game. Each search edge holds one input (left / none / right,
+optionally pressing jump on its first tick) for MACRO_FRAMES physics ticks;
+the cost is LevelManager.level_timer, so physics triggers that change
+Engine.time_scale change the par time the way players see it.
+
+  • States are hashed on a grid (position, velocity, active physics state,
+    floor/coyote flags, trigger bookkeeping and queued delayed input). The
+    first state to reach a cell keeps its exact continuous values.
+  • Dominance pruning: a state is dropped when a state in the same cell got
+    there no later with at least as many jumps left (DoubleJump's air jump).
+  • Expansion is batched: the best EXPAND_BATCH open states are stepped
+    together through every input in one vectorized call.
+  • The heuristic is the horizontal distance to the exit over the fastest
+    run speed of any state, which never overestimates except through
+    TeleportJump's 150 px hops. It is weighted by WEIGHT: exact A* has to
+    visit every state on the wide plateau of equally promising runs, while
+    weight 2 needs 10-40x fewer states and matched exact par times on
+    world 1 (within 2% elsewhere). Pass --weight 1 for exact searches.
+  • States falling past every platform, trigger and the exit are dropped.
+
+Traces are written as JSON replay fixtures (see TRACE_FORMAT) that
+scenes/testing/E2ETestRunner.gd plays back, and give the analyzer its par
+times (level_balance_analyzer.py --par).
+
+Usage:
+    python3 level_trace_solver.py                       # every shipped level
+    python3 level_trace_solver.py world_02_level_03.json -o ../../scenes/testing/replays
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+
+import level_simulator
+from level_simulator import BatchPhysics, CLEARED, MAX_LEVEL_TIME, PHYSICS_FPS, RUNNING
+
+try:
+    import numpy as np
+except ImportError:  # solve_level() raises via BatchPhysics
+    np = None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "..", "..", "levels", "json")
+
+MACRO_FRAMES = 6            # Ticks per input decision (0.1 s)
+POSITION_QUANTUM = 8.0      # Hash grid, px
+VELOCITY_QUANTUM = 50.0     # Hash grid, px/s
+EXPAND_BATCH = 64           # Open states stepped per vectorized call
+MAX_EXPANSIONS = 200_000    # Search budget in expanded states
+WEIGHT = 2.0                # f = g + WEIGHT * h (1 = exact A*, see module docstring)
+MOVES = (1.0, 0.0, -1.0)
+ACTIONS = [(move, jump) for jump in (False, True) for move in MOVES]
+
+TRACE_FORMAT = 1
+
+# Search outcomes
+SOLVED = "solved"
+NO_PATH = "no_path"         # Open set ran dry: nothing reaches the exit
+BUDGET = "budget"           # Gave up after MAX_EXPANSIONS or the time limit
+
+
+# ─── State Hashing ───────────────────────────────────────────────────────────
+
+def _history_code(rows, delay):
+    """Queued delayed input as one integer per agent (0 outside DelayedInput)."""
+    n, length = rows.shape
+    code = np.zeros(n, dtype=np.int64)
+    for i in range(length):
+        code = code * 3 + (rows[:, i] + 1).astype(np.int64)
+    return np.where(delay > 0, code, 0)
+
+
+def state_keys(physics, a):
+    """Hash-cell key (bytes) per agent, and its jumps left."""
+    table = physics.table
+    delay = table.delay_frames[a.state]
+    bits = np.zeros(len(a), dtype=np.int64)
+    for k in range(a.inside.shape[1]):
+        bits |= (a.inside[:, k].astype(np.int64) << (3 * k) |
+                 a.triggered[:, k].astype(np.int64) << (3 * k + 1) |
+                 np.isfinite(a.trigger_timer[:, k]).astype(np.int64) << (3 * k + 2))
+    columns = np.stack([
+        np.floor(a.x / POSITION_QUANTUM),
+        np.floor(a.y / POSITION_QUANTUM),
+        np.round(a.vx / VELOCITY_QUANTUM),
+        np.round(a.vy / VELOCITY_QUANTUM),
+        a.state,
+        a.on_floor,
+        a.coyote > 0,
+        np.where(np.isfinite(a.pending_time), a.pending_state, -1),
+        np.minimum(a.state_frames, delay),
+        _history_code(a.dir_history, delay),
+        _history_code(a.jump_history.astype(np.int64) - 1, delay),
+        bits,
+    ], axis=1).astype(np.int64)
+    jumps_left = a.can_double.astype(np.int64)
+    return [row.tobytes() for row in columns], jumps_left
+
+
+# ─── Search ──────────────────────────────────────────────────────────────────
+
+class _Nodes:
+    """Search tree: parent links and actions, plus agent rows kept in chunks."""
+
+    def __init__(self):
+        self.parent = []
+        self.action = []
+        self.g = []
+        self.ref = []           # (chunk, row) into self.chunks
+        self.dead = []
+        self.chunks = []
+
+    def add_chunk(self, agents):
+        self.chunks.append(agents)
+        return len(self.chunks) - 1
+
+    def add(self, parent, action, g, ref):
+        self.parent.append(parent)
+        self.action.append(action)
+        self.g.append(g)
+        self.ref.append(ref)
+        self.dead.append(False)
+        return len(self.parent) - 1
+
+    def gather(self, node_ids):
+        """Agent rows of the given nodes as one batch, in order."""
+        by_chunk = {}
+        for position, node in enumerate(node_ids):
+            chunk, row = self.ref[node]
+            by_chunk.setdefault(chunk, []).append((position, row))
+        parts, order = [], []
+        for chunk, entries in by_chunk.items():
+            parts.append(self.chunks[chunk].take(np.array([r for _, r in entries])))
+            order.extend(p for p, _ in entries)
+        batch = parts[0] if len(parts) == 1 else level_simulator.Agents.concat(parts)
+        return batch.take(np.argsort(order))
+
+    def actions_to(self, node):
+        actions = []
+        while self.parent[node] is not None:
+            actions.append(self.action[node])
+            node = self.parent[node]
+        return actions[::-1]
+
+
+def _heuristic(physics, x):
+    """Admissible time-to-exit estimate from horizontal distance alone."""
+    table, c = physics.table, physics.constants
+    run = c["BASE_SPEED"] * table.speed.max() + np.abs(table.wind_x).max()
+    x0, _, x1, _ = physics.level.exit
+    gap = np.maximum(0.0, np.maximum(x0 - (x + level_simulator.PLAYER_HALF_W),
+                                     (x - level_simulator.PLAYER_HALF_W) - x1))
+    return gap / run
+
+
+def _escape_bounds(physics):
+    """(top, bottom) beyond which nothing can stop or turn a falling player."""
+    level = physics.level
+    rects = [r for r in (level.platforms, level.triggers) if r.shape[1]]
+    rects.append(physics.exit_rect)
+    return (min(float(r[1].min()) for r in rects),
+            max(float(r[3].max()) for r in rects))
+
+
+def _doomed(physics, a, bounds):
+    """Agents falling (with gravity) past every platform, trigger and the exit."""
+    _, gy = physics.gravity(a)
+    top, bottom = bounds
+    return (((gy >= 0) & (a.y - level_simulator.PLAYER_HALF_H > bottom)) |
+            ((gy < 0) & (a.y + level_simulator.PLAYER_HALF_H < top)))
+
+
+def solve_level(data, max_expansions=MAX_EXPANSIONS, time_limit=None, weight=WEIGHT,
+                max_time=MAX_LEVEL_TIME, table=None, constants=None):
+    """Search for the fastest input trace from player_spawn to the exit.
+
+    Returns {"status" (SOLVED / NO_PATH / BUDGET), "par_time" (scaled seconds),
+    "frames", "inputs" (trace segments, see compress_actions), "expanded",
+    "seconds"}; par_time, frames and inputs are None unless solved.
+    """
+    started = time.perf_counter()
+    physics = BatchPhysics(data, table, constants)
+    result = {"status": NO_PATH, "par_time": None, "frames": None, "inputs": None,
+              "expanded": 0, "seconds": 0.0}
+    if not physics.playable:
+        return result
+
+    bounds = _escape_bounds(physics)
+    nodes = _Nodes()
+    root = nodes.add(None, None, 0.0, (nodes.add_chunk(physics.spawn(1)), 0))
+    keys, jumps = state_keys(physics, nodes.chunks[0])
+    visited = {keys[0]: [(0.0, int(jumps[0]), root)]}
+    h0 = float(_heuristic(physics, nodes.chunks[0].x)[0])
+    open_set = [(weight * h0, h0, 0, root)]
+    goals = {}              # node -> clear time, for goals waiting in the open set
+    counter = 1
+    move_of = np.array([m for m, _ in ACTIONS])
+    jump_of = np.array([j for _, j in ACTIONS])
+
+    while open_set:
+        if result["expanded"] >= max_expansions or (
+                time_limit is not None and time.perf_counter() - started > time_limit):
+            result["status"] = BUDGET
+            break
+
+        # ── Pop the best open states, stopping at a goal ──
+        batch = []
+        while open_set and len(batch) < EXPAND_BATCH:
+            _, _, _, node = heapq.heappop(open_set)
+            if nodes.dead[node]:
+                continue
+            if node in goals:
+                if not batch:
+                    actions = nodes.actions_to(node)
+                    result.update(status=SOLVED, par_time=goals[node],
+                                  inputs=compress_actions(actions))
+                    result["frames"] = _trace_frames(result["inputs"])
+                    open_set = []
+                else:
+                    heapq.heappush(open_set, (nodes.g[node], 0.0, -1, node))
+                break
+            batch.append(node)
+        if not batch:
+            continue
+        result["expanded"] += len(batch)
+
+        # ── Step every (state, input) pair through one macro step ──
+        parents = nodes.gather(batch)
+        rows = np.repeat(np.arange(len(batch)), len(ACTIONS))
+        children = parents.take(rows)
+        action_ids = np.tile(np.arange(len(ACTIONS)), len(batch))
+        stick = move_of[action_ids]
+        outcome = np.full(len(children), RUNNING, dtype=np.int64)
+        clear_time = np.full(len(children), np.inf)
+        for tick in range(MACRO_FRAMES):
+            pressed = jump_of[action_ids] if tick == 0 else np.zeros(len(children), dtype=bool)
+            finished = physics.step(children, stick, pressed)
+            newly = (outcome == RUNNING) & (finished != RUNNING)
+            outcome[newly] = finished[newly]
+            clear_time[newly & (finished == CLEARED)] = children.timer[newly & (finished == CLEARED)]
+
+        # Jump presses that can't do anything just duplicate the no-jump child
+        useless = jump_of[action_ids] & ~(
+            parents.on_floor | (parents.coyote > 0) | parents.can_double |
+            (physics.table.delay_frames[parents.state] > 0) |
+            physics.table.double_jump[parents.state])[rows]
+        alive = ((outcome == RUNNING) & ~useless & (children.timer <= max_time) &
+                 ~_doomed(physics, children, bounds))
+        cleared = outcome == CLEARED
+
+        chunk = nodes.add_chunk(children)
+        for i in np.flatnonzero(cleared):
+            node = nodes.add(batch[rows[i]], int(action_ids[i]), float(clear_time[i]), (chunk, i))
+            goals[node] = float(clear_time[i])
+            heapq.heappush(open_set, (float(clear_time[i]), 0.0, counter, node))
+            counter += 1
+
+        survivors = np.flatnonzero(alive)
+        if not survivors.size:
+            continue
+        keys, jumps = state_keys(physics, children.take(survivors))
+        g_values = children.timer[survivors]
+        h_values = _heuristic(physics, children.x[survivors])
+        for i, key, jumps_left, g, h in zip(survivors.tolist(), keys, jumps.tolist(),
+                                            g_values.tolist(), h_values.tolist()):
+            front = visited.setdefault(key, [])
+            if any(g0 <= g and j0 >= jumps_left for g0, j0, _ in front):
+                continue
+            # The new state dominates anything slower with no more jumps left
+            for entry in front:
+                if g <= entry[0] and jumps_left >= entry[1]:
+                    nodes.dead[entry[2]] = True
+            node = nodes.add(batch[rows[i]], int(action_ids[i]), g, (chunk, i))
+            front[:] = [e for e in front if not nodes.dead[e[2]]] + [(g, jumps_left, node)]
+            heapq.heappush(open_set, (g + weight * h, h, counter, node))
+            counter += 1
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+# ─── Traces ──────────────────────────────────────────────────────────────────
+
+def compress_actions(actions):
+    """Turn per-macro action ids into run-length segments.
+
+    Each segment is {"move": -1/0/1, "jump": bool, "frames": ticks}; jump
+    means "press jump on the segment's first tick" (released the tick after).
+    """
+    segments = []
+    for action in actions:
+        move, jump = ACTIONS[action]
+        if segments and not jump and segments[-1]["move"] == int(move):
+            segments[-1]["frames"] += MACRO_FRAMES
+        else:
+            segments.append({"move": int(move), "jump": bool(jump), "frames": MACRO_FRAMES})
+    return segments
+
+
+def _trace_frames(segments):
+    return sum(s["frames"] for s in segments)
+
+
+def replay_trace(data, segments, table=None, constants=None):
+    """Play segments in the simulator; returns (outcome code, timer, ticks)."""
+    physics = BatchPhysics(data, table, constants)
+    agent = physics.spawn(1)
+    ticks = 0
+    for segment in segments:
+        stick = np.array([float(segment["move"])])
+        for tick in range(segment["frames"]):
+            pressed = np.array([bool(segment["jump"]) and tick == 0])
+            ticks += 1
+            outcome = physics.step(agent, stick, pressed)[0]
+            if outcome != RUNNING:
+                return int(outcome), float(agent.timer[0]), ticks
+    return RUNNING, float(agent.timer[0]), ticks
+
+
+def trace_document(filename, data, result):
+    """JSON replay fixture for a solved level."""
+    return {
+        "format": TRACE_FORMAT,
+        "level": filename,
+        "level_id": data.get("level_id"),
+        "physics_fps": PHYSICS_FPS,
+        "par_time": round(result["par_time"], 4),
+        "frames": result["frames"],
+        "inputs": result["inputs"],
+    }
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find the fastest input trace through each level.")
+    parser.add_argument(
+        "levels", nargs="*", metavar="LEVEL",
+        help="level files to solve (default: every world_*.json in levels/json)")
+    parser.add_argument(
+        "-o", "--output", metavar="DIR",
+        help="write <level>.trace.json replay fixtures into DIR")
+    parser.add_argument(
+        "--max-expansions", type=int, default=MAX_EXPANSIONS, metavar="N",
+        help=f"search budget per level in expanded states (default: {MAX_EXPANSIONS})")
+    parser.add_argument(
+        "--weight", type=float, default=WEIGHT,
+        help=f"heuristic weight; 1 gives exact A* par times (default: {WEIGHT})")
+    parser.add_argument(
+        "--time-limit", type=float, default=None, metavar="SECONDS",
+        help="give up on a level after this much wall time")
+    args = parser.parse_args(argv)
+    if args.weight < 1:
+        parser.error("--weight must be >= 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if np is None:
+        print("Error: level_trace_solver needs NumPy (pip install numpy)")
+        return 1
+
+    if args.levels:
+        paths = args.levels
+    else:
+        levels_dir = os.path.normpath(LEVELS_DIR)
+        paths = [os.path.join(levels_dir, f) for f in sorted(os.listdir(levels_dir))
+                 if f.startswith("world_") and f.endswith(".json")]
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    table = level_simulator.StateTable()
+    status = 0
+    for path in paths:
+        filename = os.path.basename(path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        result = solve_level(data, args.max_expansions, args.time_limit, args.weight,
+                             table=table)
+        searched = f"{result['expanded']:>6} states, {result['seconds']:5.1f}s"
+
+        if result["status"] != SOLVED:
+            reason = ("no input sequence reaches the exit" if result["status"] == NO_PATH
+                      else "search budget exhausted")
+            print(f"⚠️  {filename:30s} | {reason} ({searched})")
+            continue
+
+        outcome, replay_time, _ = replay_trace(data, result["inputs"], table=table)
+        verified = outcome == CLEARED and abs(replay_time - result["par_time"]) < 1e-9
+        mark = "✅" if verified else "❌"
+        print(f"{mark} {filename:30s} | par {result['par_time']:6.2f}s "
+              f"| {len(result['inputs']):3d} inputs | {searched}")
+        if not verified:
+            print(f"   ❌ CRITICAL: Replay does not reproduce the trace "
+                  f"({level_simulator.OUTCOME_NAMES.get(outcome, 'running')})")
+            status = 1
+            continue
+
+        if args.output:
+            out_path = os.path.join(args.output, filename.replace(".json", ".trace.json"))
+            with open(out_path, "w", encoding="utf-8") as f:
+                json.dump(trace_document(filename, data, result), f, indent=2)
+                f.write("\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Physics State Catalog — Reads PhysicsState Tuning Straight from the GDScript
+
+The Python tools need the same numbers the game uses: PlayerController's
+movement constants, PhysicsManager's base gravity, and every PhysicsState
+subclass's multipliers. Rather than hand-copying them (and drifting), this
+module parses the .gd sources:
+
+  • top-level `const` / `var` declarations (e.g. WindForce's wind_force)
+  • property assignments inside `_init()` and `on_enter()`
+    (e.g. LowGravity's `gravity_scale = 0.3`)
+  • `Engine.time_scale = ...` in `on_enter()` (SlowMotion / FastForward)
+
+Level JSON refers to states by script file name ("LowGravity" for
+LowGravity.gd), except NormalPhysics.gd which levels call "Normal".
+"""
+
+import functools
+import os
+import re
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+SCRIPTS_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".."))
+PHYSICS_STATES_DIR = os.path.join(SCRIPTS_DIR, "physics_states")
+PLAYER_CONTROLLER_PATH = os.path.join(SCRIPTS_DIR, "player", "PlayerController.gd")
+PHYSICS_MANAGER_PATH = os.path.join(SCRIPTS_DIR, "managers", "PhysicsManager.gd")
+
+BASE_STATE_FILE = "PhysicsState.gd"
+
+# Script files whose level-facing name differs from the file name
+STATE_NAME_ALIASES = {"NormalPhysics": "Normal"}
+
+# Functions whose assignments configure the state when it becomes active
+CONFIG_FUNCTIONS = ("_init", "on_enter")
+
+# Behaviour that lives in handle_jump() code rather than data. Extra jumps
+# available in the air (DoubleJump.gd re-arms one jump on every landing).
+AIR_JUMPS = {"DoubleJump": 1}
+
+_DECL_RE = re.compile(r"^(?:const|var)\s+(\w+)\s*(?::\s*[\w\[\]]*)?\s*:?=\s*(.+)$")
+_ASSIGN_RE = re.compile(r"^\s+([\w.]+)\s*=\s*(.+)$")
+_FUNC_RE = re.compile(r"^(?:static\s+)?func\s+(\w+)")
+_VECTOR_CONSTANTS = {
+    "ZERO": (0.0, 0.0), "UP": (0.0, -1.0), "DOWN": (0.0, 1.0),
+    "LEFT": (-1.0, 0.0), "RIGHT": (1.0, 0.0),
+}
+
+
+# ─── GDScript Parsing ────────────────────────────────────────────────────────
+
+def _strip_comment(line):
+    """Drop a trailing # comment, leaving # inside strings alone."""
+    in_string = None
+    for i, ch in enumerate(line):
+        if in_string:
+            if ch == in_string:
+                in_string = None
+        elif ch in "\"'":
+            in_string = ch
+        elif ch == "#":
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+def parse_value(text):
+    """Convert a GDScript literal to Python; unknown expressions stay strings."""
+    text = text.strip()
+    if text in ("true", "false"):
+        return text == "true"
+    if text.startswith("Vector2."):
+        return _VECTOR_CONSTANTS.get(text.split(".", 1)[1], text)
+    match = re.fullmatch(r"Vector2\(\s*([-\d.]+)\s*,\s*([-\d.]+)\s*\)", text)
+    if match:
+        return (float(match.group(1)), float(match.group(2)))
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_gdscript(path):
+    """Return ({name: value} top-level declarations, {func: {target: value}})."""
+    declarations = {}
+    assignments = {}
+    current_func = None
+
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = _strip_comment(raw)
+            if not line.strip():
+                continue
+
+            func = _FUNC_RE.match(line)
+            if func:
+                current_func = func.group(1)
+                continue
+            if not line[0].isspace():
+                current_func = None
+                decl = _DECL_RE.match(line)
+                if decl:
+                    declarations[decl.group(1)] = parse_value(decl.group(2))
+                continue
+
+            assign = _ASSIGN_RE.match(line)
+            if assign and current_func is not None:
+                target, value = assign.groups()
+                assignments.setdefault(current_func, {})[target] = parse_value(value)
+
+    return declarations, assignments
+
+
+def parse_constants(path):
+    """Top-level numeric constants of a script, e.g. BASE_SPEED."""
+    declarations, _ = parse_gdscript(path)
+    return {k: v for k, v in declarations.items()
+            if isinstance(v, float) and k.isupper()}
+
+
+# ─── Catalog ─────────────────────────────────────────────────────────────────
+
+def state_name_for(filename):
+    """Level-facing state name for a physics state script file."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return STATE_NAME_ALIASES.get(stem, stem)
+
+
+def source_files(states_dir=PHYSICS_STATES_DIR):
+    """Every GDScript file the catalog reads, for cache fingerprints."""
+    files = [os.path.join(states_dir, f) for f in sorted(os.listdir(states_dir))
+             if f.endswith(".gd")]
+    return files + [PLAYER_CONTROLLER_PATH, PHYSICS_MANAGER_PATH]
+
+
+@functools.lru_cache(maxsize=None)
+def load_physics_states(states_dir=PHYSICS_STATES_DIR):
+    """Return {state name: properties} for every PhysicsState script.
+
+    Properties hold the PhysicsState fields (gravity_scale, gravity_direction,
+    friction, bounce, speed_multiplier, jump_multiplier, controls_reversed,
+    input_delay), plus time_scale, air_jumps, and the script's own constants
+    and variables under "extras" (e.g. wind_force, TELEPORT_DISTANCE).
+    """
+    base_decls, _ = parse_gdscript(os.path.join(states_dir, BASE_STATE_FILE))
+    base = {k: v for k, v in base_decls.items() if not isinstance(v, str)}
+
+    states = {}
+    for filename in sorted(os.listdir(states_dir)):
+        if not filename.endswith(".gd") or filename == BASE_STATE_FILE:
+            continue
+        decls, funcs = parse_gdscript(os.path.join(states_dir, filename))
+        name = state_name_for(filename)
+
+        props = dict(base)
+        props["time_scale"] = 1.0
+        for func in CONFIG_FUNCTIONS:
+            for target, value in funcs.get(func, {}).items():
+                if target == "Engine.time_scale":
+                    props["time_scale"] = value
+                elif target in base and not isinstance(value, str):
+                    props[target] = value
+        props["air_jumps"] = AIR_JUMPS.get(name, 0)
+        props["extras"] = {k: v for k, v in decls.items()
+                           if not k.startswith("_") and k not in base}
+        props["script"] = filename
+        states[name] = props
+
+    return states
+
+
+@functools.lru_cache(maxsize=None)
+def load_movement_constants():
+    """PlayerController movement constants plus PhysicsManager.BASE_GRAVITY."""
+    constants = parse_constants(PLAYER_CONTROLLER_PATH)
+    constants["BASE_GRAVITY"] = parse_constants(PHYSICS_MANAGER_PATH)["BASE_GRAVITY"]
+    return constants
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Physics Timeline — Dwell Time, Transitions and Deaths per Physics State
+
+PhysicsManager announces every state switch and AnalyticsManager records it
+as a physics_change event; LevelManager resets each level to Normal just
+before level_start. Replaying a session's events in order therefore gives
+the timeline of states it played each level in. PhysicsTimelines does that
+in one streaming pass and keeps, per level, only
+
+  • seconds spent in each state (dwell)
+  • the state-to-state transition counts
+  • deaths while each state was active
+
+so memory is O(levels × states²), plus one small open timeline for each
+session that is still mid-level.
+
+A timeline closes at level_complete, the next level_start or session_end.
+A session whose events stop mid-level (quit, crash) keeps its open
+timeline; its time up to the last event seen counts as dwell in reports.
+
+Partials merge like the rest of AnalyticsAggregate. When a partial's first
+event for a session isn't session_start, the session's earlier events are
+in another partial, so its state is unknown until the first physics change
+or level boundary. That stretch is kept as a head and settled against the
+open timeline of the partial merged before it. Merging in file order then
+matches one pass over the same events.
+"""
+
+import math
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+LEVEL_START_STATE = "Normal"    # LevelManager.on_level_start() resets to this
+
+# Events that end a session's current state (or say what it is)
+BOUNDARY_EVENTS = ("physics_change", "level_start", "level_complete",
+                   "session_start", "session_end")
+
+
+def _add(counter, key, amount):
+    counter[key] = counter.get(key, 0) + amount
+
+
+# ─── Per-Level Summary ───────────────────────────────────────────────────────
+
+class PhysicsStats:
+    """Dwell, transitions and deaths per physics state on one level."""
+
+    __slots__ = ("dwell", "deaths", "transitions")
+
+    def __init__(self):
+        self.dwell = {}         # State -> seconds active
+        self.deaths = {}        # State -> deaths while active
+        self.transitions = {}   # (from state, to state) -> count
+
+    def add_dwell(self, state, seconds):
+        if seconds > 0:     # Clock skew can put a later event first
+            _add(self.dwell, state, seconds)
+
+    def states(self):
+        """Every state seen on the level, sorted."""
+        seen = set(self.dwell) | set(self.deaths)
+        for pair in self.transitions:
+            seen.update(pair)
+        return sorted(seen)
+
+    def merge(self, other):
+        for state, seconds in other.dwell.items():
+            _add(self.dwell, state, seconds)
+        for state, count in other.deaths.items():
+            _add(self.deaths, state, count)
+        for pair, count in other.transitions.items():
+            _add(self.transitions, pair, count)
+        return self
+
+
+# ─── Timelines ───────────────────────────────────────────────────────────────
+
+class PhysicsTimelines:
+    """Streaming reconstruction of each session's physics-state timeline."""
+
+    def __init__(self):
+        self.levels = {}    # Level key -> PhysicsStats
+        self.open = {}      # Session number -> [level key, state, since, last event]
+        self.heads = {}     # Session number -> [deaths, last event, end] (see merge)
+
+    def level(self, key):
+        stats = self.levels.get(key)
+        if stats is None:
+            stats = self.levels[key] = PhysicsStats()
+        return stats
+
+    def add(self, session, first, event_type, key, data, timestamp):
+        """Fold one event in; first is True for the session's first event here."""
+        if not math.isfinite(timestamp):
+            return
+        if first and event_type != "session_start":
+            self.heads[session] = [0, None, None]
+
+        head = self.heads.get(session)
+        if head is not None and head[2] is None:    # State still unknown
+            if event_type not in BOUNDARY_EVENTS:
+                if event_type == "death":
+                    head[0] += 1
+                head[1] = timestamp
+                return
+            target = data.get("state") if event_type == "physics_change" else None
+            head[2] = (timestamp, key, target)
+
+        timeline = self.open.get(session)
+        if event_type == "physics_change":
+            state = data.get("state")
+            if not state:
+                return
+            if timeline is not None and timeline[0] == key:
+                if state != timeline[1]:
+                    stats = self.level(key)
+                    stats.add_dwell(timeline[1], timestamp - timeline[2])
+                    _add(stats.transitions, (timeline[1], state), 1)
+                    timeline[1] = state
+                    timeline[2] = timestamp
+                timeline[3] = timestamp
+            else:
+                self._close(session, timestamp)
+                self.open[session] = [key, state, timestamp, timestamp]
+        elif event_type == "level_start":
+            self._close(session, timestamp)
+            self.open[session] = [key, LEVEL_START_STATE, timestamp, timestamp]
+        elif event_type in BOUNDARY_EVENTS:
+            self._close(session, timestamp)
+        elif timeline is not None:
+            if event_type == "death":
+                _add(self.level(timeline[0]).deaths, timeline[1], 1)
+            timeline[3] = timestamp
+
+    def _close(self, session, timestamp):
+        timeline = self.open.pop(session, None)
+        if timeline is not None:
+            self.level(timeline[0]).add_dwell(timeline[1], timestamp - timeline[2])
+
+    def merge(self, other, session_map=None, known=0):
+        """Fold in a partial built from later events.
+
+        session_map renumbers other's sessions (see Interner.merge); sessions
+        numbered below known were already ours before the merge.
+        """
+        def ours(session):
+            return session_map[session] if session_map is not None else session
+
+        for key, stats in other.levels.items():
+            self.level(key).merge(stats)
+
+        for other_session, (deaths, last, end) in other.heads.items():
+            session = ours(other_session)
+            if session >= known:
+                self.heads[session] = [deaths, last, end]
+                continue
+            timeline = self.open.get(session)
+            if timeline is None:
+                continue    # One pass drops events with no known state too
+            stats = self.level(timeline[0])
+            if deaths:
+                _add(stats.deaths, timeline[1], deaths)
+            if end is None:
+                if last is not None:
+                    timeline[3] = max(timeline[3], last)
+                continue
+            # Close ours where other's starts; for a change to the same state
+            # the two halves add up to the one pass's single stretch
+            timestamp, key, target = end
+            if target not in (None, timeline[1]) and key == timeline[0]:
+                _add(stats.transitions, (timeline[1], target), 1)
+            self._close(session, timestamp)
+
+        for other_session, timeline in other.open.items():
+            self.open[ours(other_session)] = list(timeline)
+        return self
+
+    def level_stats(self):
+        """{level key: PhysicsStats}, counting open timelines up to their last event."""
+        levels = {key: PhysicsStats().merge(stats) for key, stats in self.levels.items()}
+        for key, state, since, last in self.open.values():
+            stats = levels.get(key)
+            if stats is None:
+                stats = levels[key] = PhysicsStats()
+            stats.add_dwell(state, last - since)
+        return levels
+
+    def __bool__(self):
+        return bool(self.levels or self.open)
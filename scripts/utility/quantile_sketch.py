@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Quantile Sketch — Bounded-Memory, Mergeable Percentiles
+
+A log-bucketed histogram in the style of DDSketch: each value lands in the
+bucket ceil(log_gamma(x)), so any quantile read back is within RELATIVE_ACCURACY
+of the true value at that rank. Memory depends on the value range (a few
+hundred buckets for death counts or clear times), not on how many values were
+added, and merging two sketches just adds bucket counts, so results do not
+depend on how the input was split across files or workers.
+
+count, sum, min and max are kept exactly, so the mean matches a plain average.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # add_many() falls back to add() per value
+    np = None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+RELATIVE_ACCURACY = 0.01   # Quantiles within ±1% of the exact value
+MAX_BUCKETS = 2048         # Lowest buckets collapse together beyond this
+MIN_INDEXABLE = 1e-9       # Smaller values (and negatives) count as zero
+
+
+# ─── Sketch ──────────────────────────────────────────────────────────────────
+
+class QuantileSketch:
+    """Mergeable quantile sketch over non-negative values."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_buckets=MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}       # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def add(self, value, weight=1):
+        """Add a value (weight times)."""
+        value = float(value)
+        if value > MIN_INDEXABLE:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + weight
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zero_count += weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values):
+        """Add every value of a sequence; vectorized when NumPy is available."""
+        if np is None:
+            for value in values:
+                self.add(value)
+            return
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        positive = values[values > MIN_INDEXABLE]
+        indices = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+        for index, count in zip(*(a.tolist() for a in np.unique(indices, return_counts=True))):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += int(values.size - positive.size)
+        self.count += int(values.size)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        """Fold another sketch (same accuracy) into this one; returns self."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _collapse(self):
+        """Fold the lowest buckets into one so the largest values keep accuracy."""
+        indices = sorted(self.buckets)
+        excess = len(indices) - self.max_buckets
+        target = indices[excess]
+        for index in indices[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+    def quantile(self, q):
+        """Value at quantile q (0..1), or None if the sketch is empty.
+
+        Uses the lower nearest rank, floor(q * (count - 1)), of the sorted
+        values; the answer is within relative_accuracy of that value.
+        """
+        if not self.count:
+            return None
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}")
+        rank = math.floor(q * (self.count - 1))
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs):
+        return [self.quantile(q) for q in qs]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Report Format — Structured Issues and JSON/NDJSON Output for the Tools
+
+The level balance analyzer and the analytics balance advisor share one
+issue shape:
+
+    {"severity": "critical", "code": "exit-unreachable",
+     "message": "Exit not reachable from spawn (...)", ...details}
+
+severity is one of SEVERITIES, most severe first, and code is a stable
+identifier dashboards can group by; any extra keys are details such as the
+JSON path of a schema error. format_issue() renders the familiar text line
+("❌ CRITICAL: ...", "⚠️  ...") for the terminal report.
+
+--format json prints one document once the run is done; --format ndjson
+prints one record per line as results complete, each with a "type" key
+("level", "curve", "summary", ...), so parallel and watch runs can be
+consumed while they are still going.
+"""
+
+import json
+import sys
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+FORMATS = ("text", "json", "ndjson")
+
+SEVERITIES = ("critical", "error", "warning", "info")
+
+# Text report prefix per severity
+SEVERITY_PREFIX = {
+    "critical": "❌ CRITICAL: ",
+    "error": "❌ ",
+    "warning": "⚠️  ",
+    "info": "ℹ️  ",
+}
+
+REPORT_VERSION = 1
+
+
+# ─── Issues ──────────────────────────────────────────────────────────────────
+
+def issue(severity, code, message, **details):
+    """One issue record."""
+    if severity not in SEVERITY_PREFIX:
+        raise ValueError(f"Unknown severity '{severity}'")
+    record = {"severity": severity, "code": code, "message": message}
+    record.update(details)
+    return record
+
+
+def format_issue(record):
+    """The text-report line for an issue."""
+    return f"{SEVERITY_PREFIX[record['severity']]}{record['message']}"
+
+
+def severity_counts(issues):
+    """{severity: count} over every severity, zeros included."""
+    counts = dict.fromkeys(SEVERITIES, 0)
+    for record in issues:
+        counts[record["severity"]] += 1
+    return counts
+
+
+def worst_severity(issues):
+    """Most severe severity among issues, or None when there are none."""
+    ranks = [SEVERITIES.index(record["severity"]) for record in issues]
+    return SEVERITIES[min(ranks)] if ranks else None
+
+
+# ─── Output ──────────────────────────────────────────────────────────────────
+
+def write_json(document, stream=None):
+    """Print a whole report as one JSON document."""
+    stream = stream or sys.stdout
+    json.dump(document, stream, indent=2, ensure_ascii=False)
+    stream.write("\n")
+
+
+def emit(record_type, record, stream=None):
+    """Print one NDJSON record and flush, so readers see it immediately."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps({"type": record_type, **record}, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def document(tool, **fields):
+    """Top-level JSON document for a tool's report."""
+    return {"tool": tool, "version": REPORT_VERSION, **fields}
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Session Bitmap — Interned Session IDs and Compressed Bitmaps of Them
+
+The analytics tools answer questions like "which sessions started W1-L1,
+cleared W1-L8 and came back a week later" by intersecting sets of sessions.
+Keeping those sets as Python sets of 32-character hex IDs costs around a
+hundred bytes per member; here IDs are interned once to dense integers
+(Interner) and each set is a Bitmap of those integers.
+
+Bitmaps are roaring-style: integers are split into 65536-wide chunks by
+their high bits, and each chunk is stored the cheaper way for its density:
+
+  • sparse chunks (≤ 4096 members) as a sorted array("H") of low bits
+  • dense chunks as an 8 KiB bytearray with one bit per possible member
+
+Set operations work chunk by chunk; dense chunks are combined as Python
+integers, so an intersection of millions of sessions is a handful of
+C-level AND operations rather than millions of hash lookups.
+"""
+
+import bisect
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Bitmaps are built element by element instead
+    np = None
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+LOW_MASK = CHUNK_SIZE - 1
+DENSE_BYTES = CHUNK_SIZE // 8
+SPARSE_LIMIT = 4096     # Above this many members a chunk's bitset is smaller
+
+INDEX_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+
+# ─── Interning ───────────────────────────────────────────────────────────────
+
+class Interner:
+    """Dense integer IDs (0, 1, 2, ...) for strings, in first-seen order."""
+
+    def __init__(self, ids=()):
+        self.ids = []
+        self.index = {}
+        for value in ids:
+            self.intern(value)
+
+    def intern(self, value):
+        number = self.index.get(value)
+        if number is None:
+            number = self.index[value] = len(self.ids)
+            self.ids.append(value)
+        return number
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, value):
+        return value in self.index
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def merge(self, other):
+        """Intern other's strings; return array mapping other's IDs to ours."""
+        return array(INDEX_TYPECODE, (self.intern(value) for value in other.ids))
+
+
+# ─── Chunk Helpers ───────────────────────────────────────────────────────────
+
+def _popcount(number):
+    return bin(number).count("1")
+
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count   # noqa: F811 (Python 3.10+)
+
+
+def _as_int(chunk):
+    """A chunk as a Python integer bitset."""
+    if isinstance(chunk, bytearray):
+        return int.from_bytes(chunk, "little")
+    number = 0
+    for low in chunk:
+        number |= 1 << low
+    return number
+
+
+def _int_members(number):
+    """Sorted low bits set in an integer bitset."""
+    members = array("H")
+    data = number.to_bytes(DENSE_BYTES, "little")
+    for i, byte in enumerate(data):
+        if byte:
+            base = i << 3
+            for bit in range(8):
+                if byte >> bit & 1:
+                    members.append(base + bit)
+    return members
+
+
+def _from_int(number):
+    """The cheaper chunk representation of an integer bitset, or None if empty."""
+    if not number:
+        return None
+    if _popcount(number) <= SPARSE_LIMIT:
+        return _int_members(number)
+    return bytearray(number.to_bytes(DENSE_BYTES, "little"))
+
+
+def _chunk_len(chunk):
+    if isinstance(chunk, bytearray):
+        return _popcount(int.from_bytes(chunk, "little"))
+    return len(chunk)
+
+
+def _chunk_members(chunk):
+    if isinstance(chunk, bytearray):
+        return _int_members(int.from_bytes(chunk, "little"))
+    return chunk
+
+
+def _sparse_and(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    other = set(b)
+    result = array("H", (v for v in a if v in other))
+    return result or None
+
+
+# ─── Bitmap ──────────────────────────────────────────────────────────────────
+
+class Bitmap:
+    """A compressed set of non-negative integers."""
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, values=()):
+        self.chunks = {}    # high bits -> array("H") or bytearray
+        self.update(values)
+
+    # ─── Building ────────────────────────────────────────────────────────
+
+    def add(self, value):
+        high = value >> CHUNK_BITS
+        low = value & LOW_MASK
+        chunk = self.chunks.get(high)
+        if chunk is None:
+            self.chunks[high] = array("H", (low,))
+        elif isinstance(chunk, bytearray):
+            chunk[low >> 3] |= 1 << (low & 7)
+        elif not chunk or low > chunk[-1]:
+            chunk.append(low)   # IDs mostly arrive in increasing order
+            if len(chunk) > SPARSE_LIMIT:
+                self.chunks[high] = bytearray(_as_int(chunk).to_bytes(DENSE_BYTES, "little"))
+        else:
+            i = bisect.bisect_left(chunk, low)
+            if i == len(chunk) or chunk[i] != low:
+                chunk.insert(i, low)
+                if len(chunk) > SPARSE_LIMIT:
+                    self.chunks[high] = bytearray(
+                        _as_int(chunk).to_bytes(DENSE_BYTES, "little"))
+
+    def update(self, values):
+        """Add many values; NumPy arrays are bulk-loaded when NumPy is present."""
+        if np is not None and isinstance(values, np.ndarray):
+            self._update_numpy(values)
+            return
+        for value in values:
+            self.add(value)
+
+    def _update_numpy(self, values):
+        if not len(values):
+            return
+        values = np.sort(values.astype(np.int64))
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+        highs = values >> CHUNK_BITS
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        for part in np.split(values, bounds):
+            high = int(part[0] >> CHUNK_BITS)
+            lows = (part & LOW_MASK).astype("<u2")
+            if high in self.chunks:
+                for low in lows.tolist():
+                    self.add((high << CHUNK_BITS) | low)
+            elif len(lows) <= SPARSE_LIMIT:
+                self.chunks[high] = array("H", lows.tolist())
+            else:
+                bits = np.zeros(CHUNK_SIZE, dtype=bool)
+                bits[lows] = True
+                self.chunks[high] = bytearray(np.packbits(bits, bitorder="little").tobytes())
+
+    # ─── Queries ─────────────────────────────────────────────────────────
+
+    def __len__(self):
+        return sum(_chunk_len(chunk) for chunk in self.chunks.values())
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+    def __contains__(self, value):
+        chunk = self.chunks.get(value >> CHUNK_BITS)
+        if chunk is None:
+            return False
+        low = value & LOW_MASK
+        if isinstance(chunk, bytearray):
+            return bool(chunk[low >> 3] >> (low & 7) & 1)
+        i = bisect.bisect_left(chunk, low)
+        return i < len(chunk) and chunk[i] == low
+
+    def __iter__(self):
+        for high in sorted(self.chunks):
+            base = high << CHUNK_BITS
+            for low in _chunk_members(self.chunks[high]):
+                yield base | low
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and list(self) == list(other)
+
+    def __repr__(self):
+        return f"Bitmap({len(self)} members, {len(self.chunks)} chunks)"
+
+    # ─── Set Operations ──────────────────────────────────────────────────
+
+    def __and__(self, other):
+        result = Bitmap()
+        for high in self.chunks.keys() & other.chunks.keys():
+            a, b = self.chunks[high], other.chunks[high]
+            if isinstance(a, array) and isinstance(b, array):
+                chunk = _sparse_and(a, b)
+            elif isinstance(a, array) or isinstance(b, array):
+                sparse, dense = (a, b) if isinstance(a, array) else (b, a)
+                chunk = array("H", (v for v in sparse if dense[v >> 3] >> (v & 7) & 1)) or None
+            else:
+                chunk = _from_int(_as_int(a) & _as_int(b))
+            if chunk is not None:
+                result.chunks[high] = chunk
+        return result
+
+    def __or__(self, other):
+        result = Bitmap()
+        for high in self.chunks.keys() | other.chunks.keys():
+            a, b = self.chunks.get(high), other.chunks.get(high)
+            if a is None or b is None:
+                chunk = a if b is None else b
+                result.chunks[high] = chunk[:] if isinstance(chunk, array) else bytearray(chunk)
+            else:
+                result.chunks[high] = _from_int(_as_int(a) | _as_int(b))
+        return result
+
+    def __sub__(self, other):
+        result = Bitmap()
+        for high, a in self.chunks.items():
+            b = other.chunks.get(high)
+            if b is None:
+                result.chunks[high] = a[:] if isinstance(a, array) else bytearray(a)
+                continue
+            chunk = _from_int(_as_int(a) & ~_as_int(b) & ((1 << CHUNK_SIZE) - 1))
+            if chunk is not None:
+                result.chunks[high] = chunk
+        return result
+
+    def __ior__(self, other):
+        merged = self | other
+        self.chunks = merged.chunks
+        return self
+
+    def remap(self, mapping):
+        """Bitmap of mapping[v] for every member v (after merging Interners)."""
+        if np is not None and len(self) > SPARSE_LIMIT:
+            members = np.fromiter(self, dtype=np.int64)
+            table = np.frombuffer(mapping, dtype=np.dtype(mapping.typecode))
+            return Bitmap(table[members].astype(np.int64))
+        return Bitmap(mapping[v] for v in self)
+
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data — Seeded Level and Analytics Event Generators
+
+Inputs for benchmarking and demoing the Python tools at realistic scale:
+
+  • generate_level() builds a playable-looking level with any number of
+    platforms, hazards, physics triggers and checkpoints.
+  • generate_events() streams analytics events for M play sessions in the
+    format the balance advisor reads. Each session starts at W1-L1 and plays
+    forward: level starts, deaths positioned around the level's real hazards
+    (or below its floor for falls), physics changes for the triggers the
+    player passes, clears with death counts and times, and quitting that
+    grows more likely the more a level kills the player. Some sessions are a
+    returning player's (same player_id) a few days after their last one, so
+    day-N retention has something to measure.
+
+The same seed always gives the same output. Events are yielded one at a
+time, so millions of them never sit in memory at once.
+
+Usage:
+    python3 synthetic_data.py events.ndjson --sessions 5000 --seed 7
+    python3 synthetic_data.py events.json --sessions 50     # JSON array
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+import physics_state_catalog
+from death_heatmap import LEVELS_DIR, load_level
+
+# ─── Configuration ───────────────────────────────────────────────────────────
+
+DEFAULT_SEED = 1234
+
+PHYSICS_STATES = [s for s in physics_state_catalog.load_physics_states() if s != "Normal"]
+
+WORLDS = 3
+LEVELS_PER_WORLD = 8
+
+EPOCH = 1_767_225_600.0     # 2026-01-01 UTC; sessions start within 30 days of it
+SESSION_SPREAD = 30 * 86400
+DAY = 86400
+
+# Returning players (drawn from a separate stream, so sessions play the same)
+RETURN_SHARE = 0.35         # Share of sessions that belong to an earlier player
+RETURN_GAP_DAYS = 2.0       # Mean days between a player's sessions
+
+# Player behaviour
+SKILL_SIGMA = 0.5           # Log-normal spread of player skill around 1.0
+BASE_DEATH_RATE = 0.4       # Expected deaths per hazard for an average player
+FALL_SHARE = 0.25           # Share of deaths that are falls rather than hazards
+DEATH_JITTER = 24.0         # World units around a hazard's centre
+QUIT_PER_DEATH = 0.015      # Chance to give up on a level after each death
+SESSION_QUIT = 0.08         # Chance to stop playing after each cleared level
+SECONDS_PER_1000PX = 9.0    # Clear time per 1000 px of level width...
+SECONDS_PER_DEATH = 6.0     # ...plus this per death (respawn and retry)
+
+
+# ─── Levels ──────────────────────────────────────────────────────────────────
+
+def generate_level(entity_count, seed=DEFAULT_SEED, platforms=None, hazards=None,
+                   triggers=None, checkpoints=None):
+    """Build a playable-looking level dict with roughly entity_count entities.
+
+    Half the budget goes to platforms laid out left to right with jumpable
+    gaps; the rest is split between hazards, physics triggers and checkpoints
+    scattered along the same path. Any count can be given explicitly instead.
+    """
+    rng = random.Random(seed)
+    n_platforms = max(2, entity_count // 2) if platforms is None else max(1, platforms)
+    n_hazards = entity_count * 3 // 10 if hazards is None else hazards
+    n_triggers = entity_count // 10 if triggers is None else triggers
+    if checkpoints is None:
+        n_checkpoints = max(0, entity_count - n_platforms - n_hazards - n_triggers)
+    else:
+        n_checkpoints = checkpoints
+
+    platform_list = []
+    x = 0
+    y = 600  # The first platform sits under player_spawn like the shipped levels
+    for i in range(n_platforms):
+        width = 400 if i == 0 else rng.randint(100, 400)
+        if i > 0:
+            y = min(600, max(200, y + rng.choice([-100, 0, 0, 100])))
+        platform_list.append({"position": [x, y], "size": [width, 64], "type": "normal"})
+        x += width + rng.randint(50, 200)
+    level_width = x
+
+    hazard_list = [
+        {"position": [rng.randint(200, level_width), rng.randint(150, 650)],
+         "type": "spike"}
+        for _ in range(n_hazards)
+    ]
+    trigger_list = [
+        {"position": [rng.randint(200, level_width), 300], "size": [60, 400],
+         "state": rng.choice(PHYSICS_STATES), "trigger_type": "enter", "delay": 0.0}
+        for _ in range(n_triggers)
+    ]
+    checkpoint_list = [
+        {"position": [rng.randint(200, level_width), rng.randint(150, 550)]}
+        for _ in range(n_checkpoints)
+    ]
+
+    return {
+        "level_id": f"synthetic_{entity_count}_{seed}",
+        "title": f"Synthetic {entity_count}",
+        "player_spawn": [100, 500],
+        "platforms": platform_list,
+        "hazards": hazard_list,
+        "physics_triggers": trigger_list,
+        "checkpoints": checkpoint_list,
+        "exit": {"position": [level_width - 100, 400]},
+    }
+
+
+# ─── Events ──────────────────────────────────────────────────────────────────
+
+class _LevelProfile:
+    """What the event generator needs to know about one level."""
+
+    def __init__(self, world, level, data):
+        self.world = world
+        self.level = level
+        data = data or {}
+        self.hazards = [h["position"] for h in data.get("hazards", [])
+                        if isinstance(h.get("position"), list)]
+        platforms = [p for p in data.get("platforms", []) if isinstance(p.get("position"), list)]
+        xs = [p["position"][0] for p in platforms] or [0, 1000]
+        self.x0, self.x1 = min(xs), max(xs)
+        self.floor_y = max((p["position"][1] for p in platforms), default=600) + 200
+        triggers = sorted((t for t in data.get("physics_triggers", [])
+                           if isinstance(t.get("position"), list)),
+                          key=lambda t: t["position"][0])
+        self.states = [t.get("state", "Normal") for t in triggers]
+        self.expected_deaths = BASE_DEATH_RATE * (len(self.hazards) + len(self.states) / 2 + 1)
+        self.width = max(1000, self.x1 - self.x0)
+
+
+def level_profiles(levels_dir=LEVELS_DIR):
+    """Profiles for W1-L1 .. W3-L8 in play order, from the shipped levels."""
+    profiles = []
+    for world in range(1, WORLDS + 1):
+        for level in range(1, LEVELS_PER_WORLD + 1):
+            key = f"W{world}-L{level}"
+            profiles.append(_LevelProfile(world, level, load_level(key, levels_dir)))
+    return profiles
+
+
+def _death_position(rng, profile):
+    if profile.hazards and rng.random() >= FALL_SHARE:
+        hx, hy = rng.choice(profile.hazards)
+        return [round(rng.gauss(hx, DEATH_JITTER), 1), round(rng.gauss(hy, DEATH_JITTER), 1)]
+    return [round(rng.uniform(profile.x0, profile.x1), 1), profile.floor_y]
+
+
+def generate_events(sessions, seed=DEFAULT_SEED, profiles=None):
+    """Yield analytics events for `sessions` seeded play sessions."""
+    rng = random.Random(seed)
+    returns = random.Random(f"{seed}-players")
+    profiles = profiles or level_profiles()
+    last_start = []     # Player number -> start of their latest session
+
+    for s in range(sessions):
+        session_id = f"synthetic-{seed}-{s:06d}"
+        skill = math.exp(rng.gauss(0.0, SKILL_SIGMA))
+        clock = started = EPOCH + rng.uniform(0, SESSION_SPREAD)
+        if last_start and returns.random() < RETURN_SHARE:
+            player = returns.randrange(len(last_start))
+            clock = started = last_start[player] + returns.expovariate(1 / RETURN_GAP_DAYS) * DAY
+        else:
+            player = len(last_start)
+            last_start.append(started)
+        last_start[player] = started
+        player_id = f"synthetic-{seed}-p{player:06d}"
+
+        def event(name, data, dt=0.0):
+            nonlocal clock
+            clock += dt
+            return {"event": name, "session_id": session_id, "player_id": player_id,
+                    "timestamp": round(clock, 3), "data": data}
+
+        yield event("session_start", {"platform": "Synthetic"})
+        for profile in profiles:
+            where = {"world": profile.world, "level": profile.level}
+            yield event("level_start", dict(where), rng.uniform(2, 10))
+
+            # Deaths before the clear: geometric with a skill-scaled mean
+            mean = profile.expected_deaths / skill
+            p_death = mean / (1.0 + mean)
+            deaths = 0
+            quit_level = False
+            passed = 0
+            stages = len(profile.states) + 1   # Triggers split the level into stages
+            while rng.random() < p_death:
+                deaths += 1
+                progress = rng.random()
+                while passed < len(profile.states) and progress > (passed + 1) / stages:
+                    yield event("physics_change", {"state": profile.states[passed], **where},
+                                rng.uniform(1, 4))
+                    passed += 1
+                yield event("death", {"position": _death_position(rng, profile),
+                                      "death_number": deaths, **where},
+                            rng.uniform(2, SECONDS_PER_DEATH * 2))
+                if rng.random() < QUIT_PER_DEATH * deaths:
+                    quit_level = True
+                    break
+            if quit_level:
+                break
+
+            for state in profile.states[passed:]:
+                yield event("physics_change", {"state": state, **where}, rng.uniform(1, 4))
+            seconds = (profile.width / 1000 * SECONDS_PER_1000PX / min(skill, 2.0)
+                       + deaths * SECONDS_PER_DEATH) * rng.uniform(0.8, 1.25)
+            yield event("level_complete", {"deaths": deaths, "time_seconds": round(seconds, 2),
+                                           **where}, rng.uniform(1, 5))
+            if rng.random() < SESSION_QUIT:
+                break
+        clock += rng.uniform(1, 30)
+        yield event("session_end", {"duration_seconds": round(clock - started, 1)})
+
+
+def write_events(path, events):
+    """Write events as NDJSON (.ndjson/.jsonl) or a JSON array; return the count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+                count += 1
+        else:
+            f.write("[")
+            for event in events:
+                f.write(("\n" if not count else ",\n") + json.dumps(event))
+                count += 1
+            f.write("\n]\n")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic analytics cache.")
+    parser.add_argument("output", help="cache path (.ndjson/.jsonl for NDJSON, else a JSON array)")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+    if args.sessions < 0:
+        parser.error("--sessions must be >= 0")
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = write_events(args.output, generate_events(args.sessions, args.seed))
+    print(f"Wrote {count} events for {args.sessions} sessions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())